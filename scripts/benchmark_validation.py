@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Vazão da Validação Gemini
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este script mede o GeminiValidator.validate_batch sobre os contextos reais de
+Os Lusíadas (os mesmos enviados por /api/analysis/analyze-contexts):
+
+- Grade de configurações (concorrência x contextos por prompt)
+- Vazão (contextos/s), chamadas HTTP e latência por chamada (p50/p95/p99)
+- Cobertura (contextos efetivamente validados)
+
+Por padrão sobe o servidor simulado (scripts/gemini_mock_server.py) no mesmo
+processo; com --no-mock usa GEMINI_BASE_URL/GEMINI_API_KEY do ambiente.
+
+O texto do poema é obrigatório (--text): data/raw/os_lusiadas.txt não contém
+Os Lusíadas, e um texto com menos de MIN_CONTEXTS contextos é recusado.
+
+Uso:
+    python scripts/benchmark_validation.py --text lusiadas.txt --concurrency 1,4,8 --batch-sizes 1,10,20
+    python scripts/benchmark_validation.py --text lusiadas.txt --latency 0.8 --jitter 0.4 --rate-429 0.05 --rps 0
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPTS_DIR)
+BACKEND_SRC = os.path.join(PROJECT_ROOT, 'sonhos-lusiadas-backend', 'src')
+# Menos contextos que isso indica que o texto não é o poema completo
+MIN_CONTEXTS = 50
+
+sys.path.insert(0, BACKEND_SRC)
+sys.path.insert(0, SCRIPTS_DIR)
+
+from gemini_mock_server import add_mock_arguments, settings_from_args, start_mock_server  # noqa: E402
+
+
+def parse_int_list(value: str) -> List[int]:
+    """Converte '1,4,8' em [1, 4, 8]."""
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil por vizinho mais próximo (0 para lista vazia)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def load_contexts(text_path: str, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Extrai os contextos classificados do poema.
+
+    Args:
+        text_path: Arquivo de texto de Os Lusíadas
+        limit: Número máximo de contextos (None para todos)
+
+    Returns:
+        Lista de contextos no formato do analisador tradicional
+
+    Raises:
+        SystemExit: Texto com menos de MIN_CONTEXTS contextos
+    """
+    from routes.analysis import remove_gutenberg_boilerplate
+    from traditional_nlp import create_traditional_analyzer
+
+    with open(text_path, 'r', encoding='utf-8') as f:
+        text = remove_gutenberg_boilerplate(f.read())
+    contexts = create_traditional_analyzer().analyze_dream_patterns(text).get('classified_contexts', [])
+    if len(contexts) < MIN_CONTEXTS:
+        raise SystemExit(f"Apenas {len(contexts)} contextos em {text_path} (mínimo {MIN_CONTEXTS}); "
+                         f"use o texto completo de Os Lusíadas em --text.")
+    return contexts[:limit] if limit else contexts
+
+
+def run_config(contexts: List[Dict], concurrency: int, batch_size: int,
+               rps: float, burst: int, budget: float) -> Dict:
+    """
+    Executa uma configuração com um validador novo (sem cache).
+
+    Args:
+        contexts: Contextos a validar
+        concurrency: GEMINI_MAX_CONCURRENCY
+        batch_size: GEMINI_BATCH_SIZE
+        rps: GEMINI_RATE_LIMIT_RPS (0 desativa)
+        burst: GEMINI_RATE_LIMIT_BURST
+        budget: GEMINI_VALIDATION_BUDGET_SECONDS (0 desativa)
+
+    Returns:
+        Métricas da execução
+    """
+    from gemini_validator import GeminiValidator
+
+    os.environ.update({
+        'GEMINI_MAX_CONCURRENCY': str(concurrency),
+        'GEMINI_BATCH_SIZE': str(batch_size),
+        'GEMINI_RATE_LIMIT_RPS': str(rps),
+        'GEMINI_RATE_LIMIT_BURST': str(burst),
+        'GEMINI_VALIDATION_BUDGET_SECONDS': str(budget),
+        'VALIDATION_CACHE_ENABLED': 'False',
+    })
+    validator = GeminiValidator()
+    if not validator.available:
+        raise SystemExit('GEMINI_API_KEY não definida (use o servidor simulado ou defina a chave).')
+
+    # Latência de cada chamada HTTP (incluindo novas tentativas)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    def record(response, *args, **kwargs):
+        with lock:
+            latencies.append(response.elapsed.total_seconds())
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    validator.session.hooks['response'].append(record)
+
+    batch = [dict(context) for context in contexts]
+    deadline = time.time() + budget if budget > 0 else None
+    start = time.perf_counter()
+    validated = validator.validate_batch(batch, deadline=deadline)
+    elapsed = time.perf_counter() - start
+    summary = validator.get_validation_summary(validated)
+    validator.session.close()
+
+    return {
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'contexts': len(batch),
+        'seconds': elapsed,
+        'throughput': len(batch) / elapsed if elapsed > 0 else 0.0,
+        'calls': len(latencies),
+        'statuses': statuses,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'coverage': summary.get('coverage', 0.0),
+    }
+
+
+def print_results(results: List[Dict]) -> None:
+    """Imprime a tabela de resultados."""
+    header = (f"{'conc':>4} {'lote':>4} {'ctx':>5} {'tempo(s)':>9} {'ctx/s':>8} {'chamadas':>8} "
+              f"{'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8} {'cobertura':>9}  status")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        statuses = ' '.join(f"{code}:{count}" for code, count in sorted(r['statuses'].items()))
+        print(f"{r['concurrency']:>4} {r['batch_size']:>4} {r['contexts']:>5} {r['seconds']:>9.2f} "
+              f"{r['throughput']:>8.1f} {r['calls']:>8} {r['p50'] * 1000:>8.0f} {r['p95'] * 1000:>8.0f} "
+              f"{r['p99'] * 1000:>8.0f} {r['coverage']:>9.1%}  {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede a vazão do GeminiValidator.validate_batch.')
+    parser.add_argument('--text', required=True, help='Texto completo de Os Lusíadas (UTF-8)')
+    parser.add_argument('--limit', type=int, default=None, help='Número máximo de contextos')
+    parser.add_argument('--concurrency', type=parse_int_list, default=[1, 4, 8],
+                        help='Lista de GEMINI_MAX_CONCURRENCY (ex.: 1,4,8)')
+    parser.add_argument('--batch-sizes', type=parse_int_list, default=[1, 10, 20],
+                        help='Lista de GEMINI_BATCH_SIZE (ex.: 1,10,20)')
+    parser.add_argument('--rps', type=float, default=0.0, help='GEMINI_RATE_LIMIT_RPS (0 desativa)')
+    parser.add_argument('--burst', type=int, default=10, help='GEMINI_RATE_LIMIT_BURST')
+    parser.add_argument('--budget', type=float, default=0.0,
+                        help='GEMINI_VALIDATION_BUDGET_SECONDS (0 desativa)')
+    parser.add_argument('--no-mock', action='store_true',
+                        help='Não sobe o servidor simulado (usa GEMINI_BASE_URL do ambiente)')
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if not args.no_mock:
+        server, base_url = start_mock_server(settings=settings_from_args(args))
+        os.environ['GEMINI_BASE_URL'] = base_url
+        os.environ.setdefault('GEMINI_API_KEY', 'mock')
+        print(f"Servidor simulado em {base_url} (latência {args.latency}s ± {args.jitter}s, "
+              f"429 {args.rate_429:.0%}, 500 {args.error_rate:.0%})")
+
+    contexts = load_contexts(args.text, args.limit)
+    print(f"{len(contexts)} contextos carregados de {args.text}\n")
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            for batch_size in args.batch_sizes:
+                results.append(run_config(contexts, concurrency, batch_size,
+                                          args.rps, args.burst, args.budget))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
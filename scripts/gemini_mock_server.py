@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Servidor Local de Simulação do Gemini
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este script simula o endpoint generateContent da API do Gemini para testes de
+carga do GeminiValidator sem consumir cota:
+
+- Latência configurável (média + jitter uniforme)
+- Taxa de erros 5xx e de respostas 429 (com Retry-After)
+- Respostas nos formatos do validador (contexto único e lote indexado)
+- Contadores em GET /stats (zerados com POST /stats/reset)
+
+Uso:
+    python scripts/gemini_mock_server.py --port 8765 --latency 0.4 --jitter 0.2 --rate-429 0.05
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta GEMINI_API_KEY=mock python src/main.py
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Palavras-chave usadas para escolher uma categoria plausível para cada contexto
+CATEGORY_KEYWORDS = [
+    ('profético', ('profet', 'futuro', 'agouro', 'pressag', 'vatic', 'anunci')),
+    ('divino', ('deus', 'deuses', 'divin', 'júpiter', 'vénus', 'vênus', 'céu')),
+    ('ilusório', ('ilus', 'engan', 'fingi', 'quimera', 'vão', 'vã')),
+    ('alegórico', ('figura', 'imagem', 'símbolo', 'sombra')),
+]
+
+_BATCH_ITEM_RE = re.compile(r'^\[(\d+)\] CONTEXTO: (".*")$', re.MULTILINE)
+_SINGLE_CONTEXT_RE = re.compile(r'CONTEXTO: "(.*?)"\s*\n\s*CLASSIFICAÇÃO ATUAL', re.DOTALL)
+
+
+class MockSettings:
+    """Parâmetros de comportamento do servidor simulado."""
+
+    def __init__(self, latency: float = 0.3, jitter: float = 0.1, error_rate: float = 0.0,
+                 rate_429: float = 0.0, retry_after: float = 1.0, malformed_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency: Latência média por requisição (segundos)
+            jitter: Variação uniforme da latência (± segundos)
+            error_rate: Fração de respostas 500
+            rate_429: Fração de respostas 429
+            retry_after: Valor do cabeçalho Retry-After nas respostas 429
+            malformed_rate: Fração de itens inválidos nas respostas em lote
+            seed: Semente do gerador aleatório (resultados reprodutíveis)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.malformed_rate = malformed_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zera os contadores."""
+        with self.lock:
+            self.stats = {'requests': 0, 'ok': 0, 'errors_500': 0, 'errors_429': 0,
+                          'batch_requests': 0, 'items': 0}
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[key] += amount
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+
+def classify(context: str) -> Tuple[str, float]:
+    """Escolhe categoria e confiança a partir de palavras-chave do contexto."""
+    lowered = context.lower()
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return category, 0.85
+    return 'onírico', 0.8
+
+
+def build_answer(prompt: str, settings: MockSettings) -> Tuple[str, int]:
+    """
+    Monta o texto de resposta no formato esperado pelo validador.
+
+    Args:
+        prompt: Prompt recebido
+        settings: Parâmetros do servidor
+
+    Returns:
+        Tupla (texto da resposta, número de contextos respondidos)
+    """
+    items = _BATCH_ITEM_RE.findall(prompt)
+    if items:
+        answers: List[Dict[str, Any]] = []
+        for index, raw_context in items:
+            if settings.roll() < settings.malformed_rate:
+                answers.append({'index': int(index), 'classification': 'desconhecida'})
+                continue
+            try:
+                context = json.loads(raw_context)
+            except json.JSONDecodeError:
+                context = raw_context
+            category, confidence = classify(context)
+            answers.append({
+                'index': int(index),
+                'classification': category,
+                'confidence': confidence,
+                'reasoning': f"Simulação: termos associados a '{category}'.",
+                'agreement': True
+            })
+        return '```json\n' + json.dumps(answers, ensure_ascii=False, indent=2) + '\n```', len(items)
+
+    match = _SINGLE_CONTEXT_RE.search(prompt)
+    category, confidence = classify(match.group(1) if match else '')
+    return json.dumps({
+        'classification': category,
+        'confidence': confidence,
+        'reasoning': f"Simulação: termos associados a '{category}'.",
+        'agreement': True
+    }, ensure_ascii=False), 1
+
+
+def make_handler(settings: MockSettings):
+    """Cria a classe de handler HTTP ligada aos parâmetros do servidor."""
+
+    class GeminiMockHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Cliente desistiu (timeout do validador)
+                pass
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/stats':
+                with settings.lock:
+                    return self.send_json(200, dict(settings.stats))
+            return self.send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            raw = self.rfile.read(length)
+            if self.path.rstrip('/') == '/stats/reset':
+                settings.reset_stats()
+                return self.send_json(200, {'reset': True})
+            if not self.path.endswith(':generateContent'):
+                return self.send_json(404, {'error': 'not found'})
+
+            settings.count('requests')
+            time.sleep(settings.delay())
+
+            roll = settings.roll()
+            if roll < settings.rate_429:
+                settings.count('errors_429')
+                return self.send_json(429, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED'}},
+                                      {'Retry-After': f"{settings.retry_after:g}"})
+            if roll < settings.rate_429 + settings.error_rate:
+                settings.count('errors_500')
+                return self.send_json(500, {'error': {'code': 500, 'status': 'INTERNAL'}})
+
+            try:
+                request_body = json.loads(raw)
+                prompt = request_body['contents'][0]['parts'][0]['text']
+            except (ValueError, KeyError, IndexError, TypeError):
+                return self.send_json(400, {'error': {'code': 400, 'status': 'INVALID_ARGUMENT'}})
+
+            text, items = build_answer(prompt, settings)
+            settings.count('ok')
+            settings.count('items', items)
+            if items > 1 or _BATCH_ITEM_RE.search(prompt):
+                settings.count('batch_requests')
+            return self.send_json(200, {
+                'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}, 'finishReason': 'STOP'}]
+            })
+
+    return GeminiMockHandler
+
+
+def start_mock_server(host: str = '127.0.0.1', port: int = 0,
+                      settings: Optional[MockSettings] = None) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Inicia o servidor simulado em uma thread daemon.
+
+    Args:
+        host: Interface de escuta
+        port: Porta (0 escolhe uma livre)
+        settings: Parâmetros do servidor
+
+    Returns:
+        Tupla (servidor, base URL para GEMINI_BASE_URL)
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(settings or MockSettings()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='gemini-mock', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/v1beta"
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adiciona os parâmetros do servidor simulado a um parser."""
+    parser.add_argument('--latency', type=float, default=0.3, help='Latência média (s)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Variação uniforme da latência (± s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fração de respostas 500')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fração de respostas 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After das respostas 429 (s)')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fração de itens inválidos em lotes')
+    parser.add_argument('--seed', type=int, default=None, help='Semente aleatória')
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    """Cria MockSettings a partir dos argumentos de add_mock_arguments."""
+    return MockSettings(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        rate_429=args.rate_429, retry_after=args.retry_after,
+                        malformed_rate=args.malformed_rate, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que simula o generateContent do Gemini.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    settings = settings_from_args(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(settings))
+    server.daemon_threads = True
+    print(f"Servidor Gemini simulado em http://{args.host}:{args.port}/v1beta")
+    print(f"Use: GEMINI_BASE_URL=http://{args.host}:{args.port}/v1beta GEMINI_API_KEY=mock")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
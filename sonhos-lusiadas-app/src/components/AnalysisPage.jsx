@@ -122,17 +122,10 @@ const AnalysisPage = () => {
     const totalDuration = steps.reduce((sum, step) => sum + step.duration, 0)
     
     try {
-      // Obter texto para análise
-      let textToAnalyze = ''
-      if (file) {
-        // Se há arquivo, ler o conteúdo
-        const fileContent = await readFileContent(file)
-        textToAnalyze = fileContent
-      } else if (textInput.trim()) {
-        textToAnalyze = textInput.trim()
-      }
+      // Registrar o documento no servidor (o texto não é reenviado na análise)
+      const documentId = await resolveDocumentId()
 
-      if (!textToAnalyze) {
+      if (!documentId) {
         throw new Error('Nenhum texto para analisar')
       }
 
@@ -172,9 +165,9 @@ const AnalysisPage = () => {
 
       // Chamar análise real do backend em paralelo
       console.log('Chamando análise completa do backend...')
-      console.log('Texto para análise:', textToAnalyze.substring(0, 100) + '...')
+      console.log('Documento para análise:', documentId)
       
-      const realApiResponse = await apiService.completeAnalysis(textToAnalyze, 'estrito')
+      const realApiResponse = await apiService.completeAnalysisByDocument(documentId, 'estrito')
       console.log('Resposta do backend:', realApiResponse)
       
       // Verificar se a resposta contém dados reais
@@ -281,53 +274,24 @@ const AnalysisPage = () => {
     }
   }
 
-  const readFileContent = (file) => {
-    return new Promise((resolve, reject) => {
-      const reader = new FileReader()
-      
-      if (file.type === 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' || 
-          file.type === 'application/msword' ||
-          file.name.endsWith('.docx') || 
-          file.name.endsWith('.doc')) {
-        // Para arquivos Word (.doc e .docx), enviar para o backend processar
-        console.log('Arquivo Word detectado, enviando para backend...')
-        const formData = new FormData()
-        formData.append('file', file)
-        
-        fetch('http://localhost:5000/api/analysis/upload', {
-          method: 'POST',
-          body: formData
-        })
-        .then(response => response.json())
-        .then(data => {
-          console.log('Arquivo DOCX processado pelo backend:', data)
-          // Simular leitura do conteúdo processado
-          resolve(data.content || 'Conteúdo não disponível')
-        })
-        .catch(error => {
-          console.error('Erro ao processar DOCX:', error)
-          reject(error)
-        })
-      } else {
-        // Para arquivos de texto, ler normalmente
-        reader.onload = (e) => {
-          const content = e.target.result
-          console.log('Arquivo de texto lido:', {
-            name: file.name,
-            size: file.size,
-            type: file.type,
-            contentLength: content.length,
-            contentPreview: content.substring(0, 200)
-          })
-          resolve(content)
-        }
-        reader.onerror = (e) => {
-          console.error('Erro ao ler arquivo:', e)
-          reject(e)
-        }
-        reader.readAsText(file, 'UTF-8')
-      }
-    })
+  // Envia o arquivo (ou o texto digitado) ao armazenamento de documentos do
+  // servidor e retorna o document_id usado pela análise
+  const resolveDocumentId = async () => {
+    if (file) {
+      const data = await apiService.uploadFile(file)
+      console.log('Arquivo armazenado pelo backend:', {
+        name: file.name,
+        documentId: data.document_id,
+        contentLength: data.content_length,
+        deduplicated: data.deduplicated
+      })
+      return data.document_id
+    }
+    if (textInput.trim()) {
+      const data = await apiService.createDocument(textInput.trim())
+      return data.document_id
+    }
+    return null
   }
 
   const generateInsights = (expandedTerms, contextClassification, validationMetrics, dreamContexts) => {
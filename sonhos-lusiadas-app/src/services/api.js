@@ -15,18 +15,22 @@ class ApiService {
     }
   }
 
-  async uploadFile(file) {
+  // Retorna o document_id do arquivo armazenado; o texto extraído só vem
+  // na resposta com includeContent
+  async uploadFile(file, { includeContent = false } = {}) {
     try {
       const formData = new FormData()
       formData.append('file', file)
       
-      const response = await fetch(`${API_BASE_URL}/upload`, {
+      const query = includeContent ? '?include_content=1' : ''
+      const response = await fetch(`${API_BASE_URL}/upload${query}`, {
         method: 'POST',
         body: formData
       })
       
       if (!response.ok) {
-        throw new Error(`Erro no upload: ${response.statusText}`)
+        const data = await response.json().catch(() => ({}))
+        throw new Error(data.error || `Erro no upload: ${response.statusText}`)
       }
 
       return await response.json()
@@ -36,6 +40,50 @@ class ApiService {
     }
   }
 
+  async createDocument(text) {
+    try {
+      const response = await fetch(`${API_BASE_URL}/documents`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ text })
+      })
+
+      if (!response.ok) {
+        throw new Error(`Erro ao registrar documento: ${response.statusText}`)
+      }
+
+      return await response.json()
+    } catch (error) {
+      console.error('Erro ao registrar documento:', error)
+      throw error
+    }
+  }
+
+  // Analisa um documento já armazenado no servidor (upload ou createDocument),
+  // sem reenviar o texto completo
+  async completeAnalysisByDocument(documentId, mode = 'estrito') {
+    try {
+      const response = await fetch(`${API_BASE_URL}/complete-analysis`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ document_id: documentId, mode })
+      })
+
+      if (!response.ok) {
+        throw new Error(`Erro na análise: ${response.statusText}`)
+      }
+
+      return await response.json()
+    } catch (error) {
+      console.error('Erro na análise completa:', error)
+      throw error
+    }
+  }
+
   async completeAnalysis(text, mode = 'estrito') {
     try {
       const response = await fetch(`${API_BASE_URL}/complete-analysis`, {
@@ -141,17 +189,19 @@ class ApiService {
     }
   }
 
+  // analysisData pode ser o resultado da análise ou { documentId, mode } para
+  // que o servidor use a análise do documento armazenado
   async exportDetailedReport(analysisData, format = 'csv') {
     try {
+      const payload = analysisData && analysisData.documentId
+        ? { format, document_id: analysisData.documentId, mode: analysisData.mode }
+        : { format, analysis_data: analysisData }
       const response = await fetch(`${API_BASE_URL}/export-detailed-report`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ 
-          format, 
-          analysis_data: analysisData 
-        })
+        body: JSON.stringify(payload)
       })
       
       if (!response.ok) {
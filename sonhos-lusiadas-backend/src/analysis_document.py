@@ -0,0 +1,147 @@
+"""
+Módulo de Documento de Análise
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo define o AnalysisDocument: o texto processado pelo pipeline spaCy
+uma única vez, com os derivados usados pelas etapas do analisador
+(lemas, POS tags e sentenças) calculados sob demanda e mantidos em cache.
+
+Vários textos (ex.: os dez cantos) podem ser processados em lote com
+nlp.pipe, em múltiplos processos e apenas com os componentes exigidos
+pelas etapas pedidas.
+"""
+
+import logging
+from functools import cached_property
+from typing import Iterable, List, Sequence, Tuple
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Componentes do pipeline exigidos por cada etapa do analisador. A segmentação
+# de sentenças usa o sentencizer (regras) em vez do parser de dependências.
+STAGE_COMPONENTS = {
+    'lemmas': ('tok2vec', 'tagger', 'morphologizer', 'attribute_ruler', 'lemmatizer'),
+    'pos': ('tok2vec', 'tagger', 'morphologizer', 'attribute_ruler'),
+    'sentences': ('sentencizer',),
+}
+ALL_STAGES = ('lemmas', 'pos', 'sentences')
+
+
+def disabled_components(nlp, stages: Iterable[str]) -> List[str]:
+    """
+    Lista os componentes do pipeline que as etapas pedidas não usam.
+
+    Args:
+        nlp: Pipeline spaCy
+        stages: Etapas necessárias (chaves de STAGE_COMPONENTS)
+
+    Returns:
+        Nomes dos componentes a desativar
+    """
+    required = set()
+    for stage in stages:
+        if stage not in STAGE_COMPONENTS:
+            raise ValueError(f"Etapa desconhecida: {stage}")
+        required.update(STAGE_COMPONENTS[stage])
+    return [name for name in nlp.pipe_names if name not in required]
+
+
+class AnalysisDocument:
+    """Texto analisado uma única vez pelo spaCy, compartilhado entre etapas."""
+
+    def __init__(self, text: str, doc):
+        """
+        Args:
+            text: Texto original
+            doc: Doc do spaCy correspondente ao texto
+        """
+        self.text = text
+        self.doc = doc
+
+    @classmethod
+    def parse(cls, text: str, nlp) -> 'AnalysisDocument':
+        """
+        Processa o texto com o pipeline informado.
+
+        Args:
+            text: Texto para processar
+            nlp: Pipeline spaCy
+
+        Returns:
+            Documento de análise
+        """
+        return cls(text, nlp(text))
+
+    @classmethod
+    def parse_many(cls, texts: Sequence[str], nlp, stages: Iterable[str] = ALL_STAGES,
+                   n_process: int = 1, batch_size: int = 1) -> List['AnalysisDocument']:
+        """
+        Processa vários textos em lote, apenas com os componentes necessários.
+
+        Args:
+            texts: Textos para processar
+            nlp: Pipeline spaCy
+            stages: Etapas que usarão os documentos
+            n_process: Número de processos do nlp.pipe
+            batch_size: Textos por lote enviado a cada processo
+
+        Returns:
+            Documentos de análise, na mesma ordem dos textos
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        disable = disabled_components(nlp, stages)
+        n_process = max(1, min(n_process, len(texts)))
+        try:
+            docs = list(nlp.pipe(texts, batch_size=batch_size,
+                                 n_process=n_process, disable=disable))
+        except Exception as e:
+            if n_process == 1:
+                raise
+            # Multiprocessamento indisponível no ambiente: processa no processo atual
+            logger.warning(f"nlp.pipe com {n_process} processos falhou ({e}); usando 1 processo.")
+            docs = list(nlp.pipe(texts, batch_size=batch_size, disable=disable))
+        return [cls(text, doc) for text, doc in zip(texts, docs)]
+
+    def __getstate__(self):
+        """
+        Serializa o documento sem o Doc do spaCy (ex.: envio a outro processo).
+
+        Os derivados são calculados antes, de modo que o documento recebido
+        continua utilizável pelas etapas sem o pipeline.
+        """
+        if self.doc is not None:
+            for name in ('lemmas', 'pos_tags', 'sentences'):
+                getattr(self, name)
+        state = dict(self.__dict__)
+        state['doc'] = None
+        return state
+
+    @cached_property
+    def lemmas(self) -> List[str]:
+        """Lemas (ou formas) em minúsculas, sem espaços, pontuação ou stopwords."""
+        tokens = []
+        for token in self.doc:
+            if not token.is_space and not token.is_punct and not token.is_stop:
+                if hasattr(token, 'lemma_') and token.lemma_:
+                    tokens.append(token.lemma_.lower())
+                else:
+                    tokens.append(token.text.lower())
+        return tokens
+
+    @cached_property
+    def pos_tags(self) -> List[Tuple[str, str]]:
+        """Pares (token em minúsculas, POS tag), sem espaços e pontuação."""
+        return [
+            (token.text.lower(), token.pos_)
+            for token in self.doc
+            if not token.is_space and not token.is_punct
+        ]
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Texto de cada sentença do documento."""
+        return [sent.text for sent in self.doc.sents]
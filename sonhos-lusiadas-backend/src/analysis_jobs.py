@@ -0,0 +1,197 @@
+"""
+Módulo de Jobs de Análise
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo executa análises longas fora da thread da requisição HTTP:
+
+- Cada job recebe um id e roda em um executor em segundo plano
+- O progresso é acompanhado por unidade de trabalho (ex.: por canto), com a
+  etapa em que cada unidade está
+- O resultado serializado fica disponível até expirar (TTL)
+"""
+
+import os
+import time
+import uuid
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_TTL_SECONDS = 3600
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class AnalysisJob:
+    """Estado de um job de análise (status, progresso por unidade e resultado)."""
+
+    def __init__(self, meta: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            meta: Informações descritivas do job (ex.: modo, tamanho do texto)
+        """
+        self.id = uuid.uuid4().hex
+        self.status = JOB_QUEUED
+        self.meta = dict(meta or {})
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.units: 'OrderedDict[str, int]' = OrderedDict()
+        self.stages: Dict[str, str] = {}
+        self.result: Optional[bytes] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def set_units(self, names: Iterable[str]) -> None:
+        """Define as unidades de trabalho acompanhadas (todas em 0%)."""
+        with self._lock:
+            self.units = OrderedDict((name, 0) for name in names)
+            self.stages = {}
+
+    def update(self, name: str, percent: int, stage: Optional[str] = None) -> None:
+        """Atualiza o progresso (0-100) e, opcionalmente, a etapa de uma unidade de trabalho."""
+        with self._lock:
+            # O progresso de uma unidade não regride (etapas podem ser notificadas fora de ordem)
+            self.units[name] = max(self.units.get(name, 0), min(100, int(percent)))
+            if stage is not None and self.units[name] == int(percent):
+                self.stages[name] = stage
+
+    @property
+    def progress(self) -> float:
+        """Progresso geral em percentual (média das unidades)."""
+        with self._lock:
+            if self.status == JOB_DONE:
+                return 100.0
+            if not self.units:
+                return 0.0
+            return round(sum(self.units.values()) / len(self.units), 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Retorna o estado do job (sem o resultado) para a API.
+
+        Returns:
+            Dicionário serializável em JSON
+        """
+        progress = self.progress
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'progress': progress,
+                'units': dict(self.units),
+                'stages': dict(self.stages),
+                'meta': dict(self.meta),
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'error': self.error
+            }
+
+
+class JobManager:
+    """Executa jobs em segundo plano e retém os resultados por um TTL."""
+
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS,
+                 ttl_seconds: float = DEFAULT_JOB_TTL_SECONDS):
+        """
+        Args:
+            max_workers: Número de jobs executados simultaneamente
+            ttl_seconds: Tempo de retenção de jobs finalizados
+        """
+        self.max_workers = max_workers
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., bytes], *args: Any,
+               meta: Optional[Dict[str, Any]] = None) -> AnalysisJob:
+        """
+        Cria um job e o agenda no executor.
+
+        Args:
+            fn: Função executada como fn(job, *args); retorna o resultado serializado
+            *args: Argumentos adicionais da função
+            meta: Informações descritivas do job
+
+        Returns:
+            Job criado (status 'queued')
+        """
+        self._purge_expired()
+        job = AnalysisJob(meta)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Retorna o job pelo id (None se inexistente ou expirado)."""
+        self._purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna a contagem de jobs retidos por status."""
+        self._purge_expired()
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'workers': self.max_workers, 'ttl_seconds': self.ttl_seconds, 'jobs': counts}
+
+    def _run(self, job: AnalysisJob, fn: Callable[..., bytes], args: tuple) -> None:
+        """Executa o job, registrando resultado ou erro."""
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(job, *args)
+            job.status = JOB_DONE
+        except Exception as e:
+            logger.error(f"Erro no job {job.id}: {e}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _purge_expired(self) -> None:
+        """Remove jobs finalizados há mais tempo que o TTL."""
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and now - job.finished_at > self.ttl_seconds]
+            for job_id in expired:
+                del self._jobs[job_id]
+        if expired:
+            logger.info(f"{len(expired)} job(s) expirado(s) removido(s).")
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Retorna o gerenciador de jobs do processo (criado sob demanda).
+
+    Configuração via JOB_WORKERS e JOB_TTL_SECONDS.
+    """
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager(
+                    max_workers=int(os.getenv('JOB_WORKERS', DEFAULT_JOB_WORKERS)),
+                    ttl_seconds=float(os.getenv('JOB_TTL_SECONDS', DEFAULT_JOB_TTL_SECONDS))
+                )
+    return _job_manager
@@ -0,0 +1,494 @@
+"""
+Módulo de Classificação de Contextos
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo define os backends que classificam os contextos encontrados pela
+busca (ContextAnalyzer) nos tipos de sonho:
+
+- Interface comum (ClassifierBackend) com escrita vetorizada no DataFrame
+- Backend local baseado em regras (padrão), vetorizado com pandas
+- Backend remoto assíncrono (OpenAI): lotes em pipeline, concorrência limitada
+  e limite de taxa adaptativo (reduz em 429, recupera aos poucos)
+"""
+
+import os
+import re
+import json
+import random
+import asyncio
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Contextos sem nenhum padrão de categoria (backends de classificação)
+UNCLASSIFIED = 'não_classificado'
+UNCLASSIFIED_CONFIDENCE = 0.0
+
+# Padrões de classificação por categoria (a ordem desempata: a primeira com maior score vence)
+CLASSIFICATION_PATTERNS = {
+    'divino': [
+        r'\b(glória|divino|celestial|sobrenatural|milagre|sagrado|santo)\b',
+        r'\b(deus|deuses|divindade|oráculo)\b',
+        r'\b(revelação|aparição|manifestação)\b'
+    ],
+    'profético': [
+        r'\b(visão|profecia|presságio|augúrio|vaticínio)\b',
+        r'\b(futuro|porvir|predição|oráculo)\b',
+        r'\b(anunciar|prever|pressagiar)\b'
+    ],
+    'alegórico': [
+        r'\b(símbolo|metáfora|alegoria|figura)\b',
+        r'\b(representar|significar|simbolizar)\b',
+        r'\b(como|qual|assim como)\b'
+    ],
+    'ilusório': [
+        r'\b(ilusão|quimera|miragem|falsa|falso)\b',
+        r'\b(enganar|enganoso|fictício)\b',
+        r'\b(aparência|semblante|aspecto)\b'
+    ],
+    'onírico': [
+        r'\b(sonho|sonhar|dormir|pesadelo)\b',
+        r'\b(adormecer|despertar|sonolento)\b',
+        r'\b(repouso|descanso|soneca)\b'
+    ]
+}
+CLASSIFICATIONS = tuple(CLASSIFICATION_PATTERNS)
+
+# Termos que aumentam a confiança da classificação por regras
+CONFIDENCE_TERMS = ['sonho', 'visão', 'profecia', 'revelação', 'glória']
+
+_COMPILED_PATTERNS = {
+    category: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for category, patterns in CLASSIFICATION_PATTERNS.items()
+}
+
+# Nomes alternativos devolvidos pelo modelo remoto
+CLASSIFICATION_ALIASES = {'ilusão': 'ilusório', 'ilusorio': 'ilusório', 'onirico': 'onírico',
+                          'profetico': 'profético', 'alegorico': 'alegórico'}
+
+DEFAULT_BACKEND = 'rules'
+DEFAULT_REMOTE_MODEL = 'gpt-4'
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT_RPS = 2.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_TIMEOUT_SECONDS = 60.0
+# Limite de taxa adaptativo: fração mínima da taxa configurada e recuperação por sucesso
+MIN_RATE_FRACTION = 0.1
+RATE_RECOVERY_FRACTION = 0.1
+
+
+def pattern_scores(text: str) -> Dict[str, int]:
+    """Número de ocorrências dos padrões de cada categoria no texto."""
+    return {
+        category: sum(len(pattern.findall(text)) for pattern in patterns)
+        for category, patterns in _COMPILED_PATTERNS.items()
+    }
+
+
+def classify_by_patterns(text: str) -> str:
+    """
+    Classifica um contexto pela contagem de padrões de cada categoria.
+
+    Sem nenhuma ocorrência, devolve a primeira categoria (comportamento legado
+    do TraditionalNLPAnalyzer); os backends usam UNCLASSIFIED nesse caso.
+
+    Args:
+        text: Texto do contexto
+
+    Returns:
+        Categoria com maior número de ocorrências
+    """
+    scores = pattern_scores(text)
+    return max(scores, key=scores.get)
+
+
+def pattern_confidence(text: str) -> float:
+    """
+    Calcula a confiança da classificação por regras.
+
+    Args:
+        text: Texto do contexto
+
+    Returns:
+        Score de confiança (0.0 a 0.95)
+    """
+    base_confidence = 0.5
+
+    # Bonus por comprimento do contexto
+    length_bonus = min(0.3, len(text) / 200)
+
+    # Bonus por termos específicos
+    lowered = text.lower()
+    term_bonus = 0.0
+    for term in CONFIDENCE_TERMS:
+        if term in lowered:
+            term_bonus += 0.1
+
+    # Penalty por contexto muito curto
+    length_penalty = 0.2 if len(text) < 30 else 0.0
+
+    confidence = min(0.95, base_confidence + length_bonus + term_bonus - length_penalty)
+    return round(confidence, 2)
+
+
+def normalize_classification(value) -> Optional[str]:
+    """Converte a categoria devolvida pelo modelo para o nome canônico (None se inválida)."""
+    if not isinstance(value, str):
+        return None
+    category = value.strip().lower()
+    category = CLASSIFICATION_ALIASES.get(category, category)
+    return category if category in CLASSIFICATIONS else None
+
+
+def run_coroutine(coroutine):
+    """Executa uma corrotina a partir de código síncrono (mesmo com um loop ativo na thread)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class ClassifierBackend:
+    """Interface dos classificadores de contexto."""
+
+    name = 'base'
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def classify(self, items: List[Dict]) -> List[Tuple[str, float]]:
+        """
+        Classifica contextos.
+
+        Args:
+            items: Dicionários com 'word' e 'context'
+
+        Returns:
+            Lista (classificação, confiança) na ordem de entrada
+        """
+        raise NotImplementedError
+
+    def classify_frame(self, contexts_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Classifica as linhas de um DataFrame de contextos.
+
+        Args:
+            contexts_df: DataFrame com colunas 'word' e 'context'
+
+        Returns:
+            DataFrame com 'classification' e 'confidence' e o mesmo índice
+        """
+        items = contexts_df[['word', 'context']].to_dict('records')
+        return pd.DataFrame(self.classify(items), index=contexts_df.index,
+                            columns=['classification', 'confidence'])
+
+
+class RuleBasedClassifier(ClassifierBackend):
+    """Classificador local por padrões linguísticos (sem chamadas externas)."""
+
+    name = 'rules'
+
+    def classify(self, items: List[Dict]) -> List[Tuple[str, float]]:
+        results = []
+        for text in (str(item.get('context') or '').lower() for item in items):
+            scores = pattern_scores(text)
+            if not any(scores.values()):
+                # Nenhum padrão: o desempate pela primeira categoria não é uma classificação
+                results.append((UNCLASSIFIED, UNCLASSIFIED_CONFIDENCE))
+            else:
+                results.append((max(scores, key=scores.get), pattern_confidence(text)))
+        return results
+
+    def classify_frame(self, contexts_df: pd.DataFrame) -> pd.DataFrame:
+        """Mesmas regras de classify, calculadas por coluna sobre todas as linhas."""
+        texts = contexts_df['context'].fillna('').astype(str).str.lower()
+
+        scores = pd.DataFrame({
+            category: sum(texts.str.count(pattern.pattern, flags=re.IGNORECASE) for pattern in patterns)
+            for category, patterns in _COMPILED_PATTERNS.items()
+        }, index=contexts_df.index)
+        # idxmax devolve a primeira coluna no empate, como max() sobre o dicionário
+        matched = scores.max(axis=1) > 0
+        classification = scores.idxmax(axis=1).where(matched, UNCLASSIFIED)
+
+        lengths = texts.str.len()
+        term_bonus = sum(texts.str.contains(term, regex=False).astype(int) for term in CONFIDENCE_TERMS) * 0.1
+        confidence = (0.5 + (lengths / 200).clip(upper=0.3) + term_bonus - (lengths < 30) * 0.2)
+        confidence = confidence.clip(upper=0.95).round(2).where(matched, UNCLASSIFIED_CONFIDENCE)
+
+        return pd.DataFrame({'classification': classification, 'confidence': confidence},
+                            index=contexts_df.index)
+
+
+class AdaptiveRateLimiter:
+    """Limite de taxa assíncrono com ajuste AIMD (reduz à metade em 429, recupera aditivamente)."""
+
+    def __init__(self, rate: float, min_rate: Optional[float] = None):
+        """
+        Args:
+            rate: Requisições por segundo (teto; 0 desativa)
+            min_rate: Taxa mínima após reduções
+        """
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate * MIN_RATE_FRACTION
+        self.rate = rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Aguarda o próximo intervalo livre."""
+        if self.max_rate <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def on_success(self) -> None:
+        """Recupera a taxa aos poucos até o teto."""
+        if self.max_rate > 0:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_FRACTION)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Reduz a taxa à metade e, com Retry-After, adia os próximos intervalos."""
+        if self.max_rate <= 0:
+            return
+        self.rate = max(self.min_rate, self.rate / 2)
+        if retry_after:
+            self._next_slot = max(self._next_slot, asyncio.get_running_loop().time() + retry_after)
+
+
+class OpenAIClassifier(ClassifierBackend):
+    """Classificador remoto (OpenAI) com lotes assíncronos em pipeline."""
+
+    name = 'openai'
+
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_REMOTE_MODEL,
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 rate_limit_rps: float = DEFAULT_RATE_LIMIT_RPS, max_retries: int = DEFAULT_MAX_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS, fallback: Optional[ClassifierBackend] = None):
+        """
+        Args:
+            api_key: Chave da API (padrão: OPENAI_API_KEY)
+            model: Modelo de chat
+            batch_size: Contextos por prompt
+            max_concurrency: Lotes em andamento ao mesmo tempo
+            rate_limit_rps: Teto de requisições por segundo (0 desativa)
+            max_retries: Novas tentativas por lote (429, 5xx, timeout)
+            timeout: Timeout por requisição (segundos)
+            fallback: Backend usado para lotes que falharem (padrão: regras)
+        """
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limit_rps = rate_limit_rps
+        self.max_retries = max(0, max_retries)
+        self.timeout = timeout
+        self.fallback = fallback or RuleBasedClassifier()
+
+    @property
+    def available(self) -> bool:
+        return OPENAI_AVAILABLE and bool(self.api_key)
+
+    def classify(self, items: List[Dict]) -> List[Tuple[str, float]]:
+        if not items:
+            return []
+        if not self.available:
+            return self.fallback.classify(items)
+        return run_coroutine(self._classify_all(items))
+
+    async def _classify_all(self, items: List[Dict]) -> List[Tuple[str, float]]:
+        """Agenda todos os lotes; o semáforo e o limite de taxa controlam o ritmo."""
+        client = openai.AsyncOpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+        limiter = AdaptiveRateLimiter(self.rate_limit_rps)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        try:
+            results = await asyncio.gather(*(
+                self._classify_batch(client, limiter, semaphore, batch) for batch in batches
+            ))
+        finally:
+            await client.close()
+        return [classification for batch in results for classification in batch]
+
+    async def _classify_batch(self, client, limiter: AdaptiveRateLimiter,
+                              semaphore: asyncio.Semaphore, batch: List[Dict]) -> List[Tuple[str, float]]:
+        """
+        Classifica um lote, com novas tentativas e fallback local.
+
+        Args:
+            client: Cliente assíncrono da OpenAI
+            limiter: Limite de taxa compartilhado
+            semaphore: Limite de lotes simultâneos
+            batch: Contextos do lote
+
+        Returns:
+            Lista (classificação, confiança) do lote
+        """
+        prompt = self._create_prompt(batch)
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await limiter.acquire()
+                try:
+                    response = await client.chat.completions.create(
+                        model=self.model,
+                        max_tokens=min(4096, 200 + 40 * len(batch)),
+                        temperature=0.3,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                except openai.RateLimitError as e:
+                    limiter.on_throttle(self._retry_after(e))
+                    error = e
+                except (openai.APIConnectionError, openai.InternalServerError) as e:
+                    # Inclui timeouts (APITimeoutError é uma APIConnectionError)
+                    error = e
+                except openai.APIError as e:
+                    logger.error(f"Erro não recuperável na classificação remota: {e}")
+                    break
+                else:
+                    limiter.on_success()
+                    return self._merge_with_fallback(
+                        batch, self._parse_response(response.choices[0].message.content or '', len(batch))
+                    )
+                if attempt < self.max_retries:
+                    await asyncio.sleep(random.uniform(0, min(30.0, 2 ** attempt)))
+            else:
+                logger.warning(f"Classificação remota falhou após {self.max_retries + 1} tentativas: {error}")
+        return self.fallback.classify(batch)
+
+    @staticmethod
+    def _retry_after(error) -> Optional[float]:
+        """Lê o cabeçalho Retry-After de uma resposta 429."""
+        response = getattr(error, 'response', None)
+        try:
+            return float(response.headers.get('retry-after'))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def _create_prompt(self, batch: List[Dict]) -> str:
+        """Cria o prompt de um lote com contextos numerados."""
+        contexts_text = [
+            f"[{index}] Palavra: {item.get('word', '')}\nContexto: {item.get('context', '')}"
+            for index, item in enumerate(batch)
+        ]
+        return f"""
+        Classifique os seguintes contextos de palavras relacionadas a "sonho" em Os Lusíadas:
+
+        {chr(10).join(contexts_text)}
+
+        Para cada contexto, identifique o tipo de sonho:
+        1. "onírico" - sonhos, pesadelos, devaneios
+        2. "profético" - visões, presságios, augúrios
+        3. "alegórico" - símbolos, metáforas, alegorias
+        4. "divino" - revelações, aparições divinas
+        5. "ilusório" - quimeras, miragens, falsas aparências
+
+        Retorne JSON com formato (um objeto por contexto, com o número entre colchetes):
+        [{{"index": 0, "type": "tipo", "confidence": 0.95}}, ...]
+        """
+
+    def _parse_response(self, text: str, count: int) -> Dict[int, Tuple[str, float]]:
+        """
+        Extrai as classificações válidas da resposta.
+
+        Args:
+            text: Conteúdo da resposta
+            count: Número de contextos do lote
+
+        Returns:
+            Dicionário índice -> (classificação, confiança)
+        """
+        match = re.search(r'\[.*\]', text, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            entries = json.loads(match.group())
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro ao processar classificação: {e}")
+            return {}
+
+        parsed = {}
+        for position, entry in enumerate(entries if isinstance(entries, list) else []):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get('index', position)
+            category = normalize_classification(entry.get('type'))
+            if not isinstance(index, int) or not 0 <= index < count or category is None:
+                continue
+            try:
+                confidence = min(1.0, max(0.0, float(entry.get('confidence', 0.0))))
+            except (TypeError, ValueError):
+                confidence = 0.0
+            parsed.setdefault(index, (category, confidence))
+        return parsed
+
+    def _merge_with_fallback(self, batch: List[Dict],
+                             parsed: Dict[int, Tuple[str, float]]) -> List[Tuple[str, float]]:
+        """Completa com o backend local os itens que o modelo não classificou."""
+        missing = [index for index in range(len(batch)) if index not in parsed]
+        if missing:
+            fallback = self.fallback.classify([batch[index] for index in missing])
+            parsed.update(zip(missing, fallback))
+        return [parsed[index] for index in range(len(batch))]
+
+
+_classifiers: Dict[str, ClassifierBackend] = {}
+_classifiers_lock = threading.Lock()
+
+
+def get_context_classifier(name: Optional[str] = None) -> ClassifierBackend:
+    """
+    Retorna o backend de classificação do processo.
+
+    Configuração via CONTEXT_CLASSIFIER_BACKEND (rules | openai), OPENAI_API_KEY,
+    CLASSIFIER_OPENAI_MODEL, CLASSIFIER_BATCH_SIZE, CLASSIFIER_MAX_CONCURRENCY,
+    CLASSIFIER_RATE_LIMIT_RPS, CLASSIFIER_MAX_RETRIES e CLASSIFIER_TIMEOUT_SECONDS.
+    Sem chave da OpenAI, o backend remoto cai para as regras locais.
+
+    Args:
+        name: Nome do backend (padrão: CONTEXT_CLASSIFIER_BACKEND)
+    """
+    name = (name or os.getenv('CONTEXT_CLASSIFIER_BACKEND', DEFAULT_BACKEND)).lower()
+    classifier = _classifiers.get(name)
+    if classifier is None:
+        with _classifiers_lock:
+            classifier = _classifiers.get(name)
+            if classifier is None:
+                if name == OpenAIClassifier.name:
+                    classifier = OpenAIClassifier(
+                        model=os.getenv('CLASSIFIER_OPENAI_MODEL', DEFAULT_REMOTE_MODEL),
+                        batch_size=int(os.getenv('CLASSIFIER_BATCH_SIZE', DEFAULT_BATCH_SIZE)),
+                        max_concurrency=int(os.getenv('CLASSIFIER_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)),
+                        rate_limit_rps=float(os.getenv('CLASSIFIER_RATE_LIMIT_RPS', DEFAULT_RATE_LIMIT_RPS)),
+                        max_retries=int(os.getenv('CLASSIFIER_MAX_RETRIES', DEFAULT_MAX_RETRIES)),
+                        timeout=float(os.getenv('CLASSIFIER_TIMEOUT_SECONDS', DEFAULT_TIMEOUT_SECONDS))
+                    )
+                    if not classifier.available:
+                        logger.warning("OPENAI_API_KEY não encontrada. Classificação remota usará as regras locais.")
+                else:
+                    if name != RuleBasedClassifier.name:
+                        logger.warning(f"Backend de classificação desconhecido '{name}'. Usando regras locais.")
+                    classifier = RuleBasedClassifier()
+                _classifiers[name] = classifier
+    return classifier
@@ -0,0 +1,200 @@
+"""
+Módulo de Coocorrência Esparsa
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo calcula a coocorrência entre termos de sono/sonho e as palavras
+do seu contexto usando matrizes esparsas:
+
+- Tokens são codificados em ids inteiros (vocabulário por texto)
+- Termos de sono são resolvidos por um índice de prefixos sobre o vocabulário
+- A matriz termo x palavra de contexto é montada de forma vetorizada (NumPy/SciPy)
+- Matrizes de cada canto podem ser somadas em totais do corpus (map-reduce)
+- O resultado é podado para os top-k vizinhos de cada termo
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    """Índice de prefixos: diz se algum termo do léxico é prefixo de um token."""
+
+    def __init__(self, terms: Iterable[str]):
+        """
+        Args:
+            terms: Termos do léxico (minúsculos)
+        """
+        self.terms = {term for term in terms if term}
+        self.lengths = sorted({len(term) for term in self.terms})
+
+    def matches(self, token: str) -> bool:
+        """Verifica se o token começa com algum termo do léxico."""
+        for length in self.lengths:
+            if length > len(token):
+                break
+            if token[:length] in self.terms:
+                return True
+        return False
+
+
+class CooccurrenceMatrix:
+    """Matriz esparsa de coocorrência (termo de sono x palavra de contexto)."""
+
+    def __init__(self, vocabulary: List[str], matrix: sparse.csr_matrix):
+        """
+        Args:
+            vocabulary: Palavras indexadas pelos ids das linhas/colunas
+            matrix: Matriz CSR (V x V); só linhas de termos de sono têm valores
+        """
+        self.vocabulary = vocabulary
+        self.matrix = matrix
+
+    @classmethod
+    def empty(cls) -> 'CooccurrenceMatrix':
+        """Cria matriz vazia (elemento neutro da soma)."""
+        return cls([], sparse.csr_matrix((0, 0), dtype=np.int64))
+
+    def __add__(self, other: 'CooccurrenceMatrix') -> 'CooccurrenceMatrix':
+        return CooccurrenceMatrix.merge([self, other])
+
+    @staticmethod
+    def merge(parts: Iterable['CooccurrenceMatrix']) -> 'CooccurrenceMatrix':
+        """
+        Soma matrizes com vocabulários distintos (etapa reduce).
+
+        Args:
+            parts: Matrizes parciais (ex.: uma por canto)
+
+        Returns:
+            Matriz com os totais do corpus
+        """
+        parts = [part for part in parts if part.vocabulary]
+        if not parts:
+            return CooccurrenceMatrix.empty()
+        if len(parts) == 1:
+            return parts[0]
+
+        vocabulary: List[str] = []
+        ids: Dict[str, int] = {}
+        rows, cols, data = [], [], []
+        for part in parts:
+            # Remapeia ids locais para o vocabulário unificado
+            remap = np.empty(len(part.vocabulary), dtype=np.int64)
+            for local_id, word in enumerate(part.vocabulary):
+                global_id = ids.get(word)
+                if global_id is None:
+                    global_id = len(vocabulary)
+                    ids[word] = global_id
+                    vocabulary.append(word)
+                remap[local_id] = global_id
+            coo = part.matrix.tocoo()
+            rows.append(remap[coo.row])
+            cols.append(remap[coo.col])
+            data.append(coo.data)
+
+        size = len(vocabulary)
+        matrix = sparse.coo_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(size, size)
+        ).tocsr()
+        return CooccurrenceMatrix(vocabulary, matrix)
+
+    def top_k(self, k: Optional[int] = 20) -> Dict[str, Dict[str, int]]:
+        """
+        Poda a matriz para os k vizinhos mais frequentes de cada termo.
+
+        Args:
+            k: Número máximo de vizinhos por termo (None = todos)
+
+        Returns:
+            Dicionário termo -> {vizinho: contagem}, em ordem decrescente
+        """
+        result: Dict[str, Dict[str, int]] = {}
+        matrix = self.matrix
+        row_nnz = np.diff(matrix.indptr)
+        for row in np.flatnonzero(row_nnz):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            cols = matrix.indices[start:end]
+            counts = matrix.data[start:end]
+            neighbours = [self.vocabulary[col] for col in cols]
+            # Ordena por contagem decrescente e, no empate, alfabeticamente
+            order = sorted(range(len(cols)), key=lambda i: (-counts[i], neighbours[i]))
+            if k is not None:
+                order = order[:k]
+            result[self.vocabulary[row]] = {neighbours[i]: int(counts[i]) for i in order}
+        return result
+
+
+class CooccurrenceEngine:
+    """Monta matrizes de coocorrência para um léxico de termos de sono."""
+
+    def __init__(self, sleep_terms: Dict[str, List[str]]):
+        """
+        Args:
+            sleep_terms: Dicionário com termos por categoria
+        """
+        self.prefix_index = PrefixIndex(
+            term for terms in sleep_terms.values() for term in terms
+        )
+
+    def build(self, tokens: List[str], window_size: int = 5) -> CooccurrenceMatrix:
+        """
+        Constrói a matriz de coocorrência de uma sequência de tokens (etapa map).
+
+        Args:
+            tokens: Tokens lematizados do texto
+            window_size: Tamanho da janela (tokens antes e depois)
+
+        Returns:
+            Matriz esparsa de coocorrência
+        """
+        if not tokens:
+            return CooccurrenceMatrix.empty()
+
+        # Codifica tokens em ids inteiros
+        vocabulary: List[str] = []
+        ids: Dict[str, int] = {}
+        encoded = np.empty(len(tokens), dtype=np.int64)
+        for i, token in enumerate(tokens):
+            token_id = ids.get(token)
+            if token_id is None:
+                token_id = len(vocabulary)
+                ids[token] = token_id
+                vocabulary.append(token)
+            encoded[i] = token_id
+
+        # Resolve termos de sono uma vez por palavra do vocabulário
+        is_sleep_word = np.fromiter(
+            (self.prefix_index.matches(word) for word in vocabulary),
+            dtype=bool, count=len(vocabulary)
+        )
+        centers = np.flatnonzero(is_sleep_word[encoded])
+        size = len(vocabulary)
+        if centers.size == 0:
+            return CooccurrenceMatrix(vocabulary, sparse.csr_matrix((size, size), dtype=np.int64))
+
+        # Um deslocamento por vez: todos os pares (centro, centro + d) de uma só vez
+        rows, cols = [], []
+        n = len(tokens)
+        for offset in range(-window_size, window_size + 1):
+            if offset == 0:
+                continue
+            neighbours = centers + offset
+            valid = (neighbours >= 0) & (neighbours < n)
+            rows.append(encoded[centers[valid]])
+            cols.append(encoded[neighbours[valid]])
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        matrix = sparse.coo_matrix(
+            (np.ones(rows.size, dtype=np.int64), (rows, cols)),
+            shape=(size, size)
+        ).tocsr()
+        return CooccurrenceMatrix(vocabulary, matrix)
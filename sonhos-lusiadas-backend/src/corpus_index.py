@@ -0,0 +1,665 @@
+"""
+Módulo de Índice Posicional do Corpus
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo constrói, uma única vez por documento, um índice invertido
+posicional das palavras do texto, guardado em arrays inteiros compactos:
+
+- Vocabulário ordenado (formas em minúsculas) e listas de ocorrências (CSR)
+- Posição de cada ocorrência: canto, estrofe, verso e offset no texto
+- Consultas por termo, prefixo ou lema (com ou sem acentos) e trechos KWIC
+- Persistência em disco (.npz por hash do texto) com despejo LRU
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+import logging
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from model_registry import get_model_registry
+from text_index import get_canto_index
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Versão do formato em disco (alterar invalida os índices gravados)
+INDEX_FORMAT_VERSION = 1
+DEFAULT_INDEX_DIR = os.path.join('cache', 'index')
+DEFAULT_DISK_MB = 256
+DEFAULT_MEMORY_ENTRIES = 8
+DEFAULT_KWIC_WINDOW = 60
+DEFAULT_SEARCH_LIMIT = 50
+
+SEARCH_MODES = ('term', 'prefix', 'lemma')
+# Canto, estrofe ou verso ausentes nos arrays de posição
+NO_POSITION = -1
+
+_WORD_RE = re.compile(r'\w+')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def fold_term(term: str) -> str:
+    """Minúsculas sem acentos (mesma normalização de normalize_text nas rotas)."""
+    decomposed = unicodedata.normalize('NFKD', term.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).strip()
+
+
+def text_key(text: str) -> str:
+    """Chave do índice de um texto (SHA-256 do conteúdo)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _optional(value: int) -> Optional[int]:
+    return None if value == NO_POSITION else value
+
+
+class CorpusIndex:
+    """Índice invertido posicional de um texto."""
+
+    def __init__(self, text: str, forms: List[str], postings_offsets: np.ndarray, postings: np.ndarray,
+                 starts: np.ndarray, ends: np.ndarray, cantos: np.ndarray, stanzas: np.ndarray,
+                 verses: np.ndarray, lemmas: Optional[List[str]] = None,
+                 lemma_ids: Optional[np.ndarray] = None, key: Optional[str] = None):
+        """
+        Args:
+            text: Texto indexado
+            forms: Vocabulário ordenado (formas em minúsculas)
+            postings_offsets: Início das ocorrências de cada forma em postings (tamanho V + 1)
+            postings: Ordinais das ocorrências, agrupados por forma e em ordem de posição
+            starts: Offset inicial de cada ocorrência
+            ends: Offset final de cada ocorrência
+            cantos: Canto de cada ocorrência (NO_POSITION se ausente)
+            stanzas: Estrofe de cada ocorrência (NO_POSITION se ausente)
+            verses: Verso de cada ocorrência (NO_POSITION se ausente)
+            lemmas: Lemas distintos (opcional; calculados sob demanda)
+            lemma_ids: Lema de cada forma (índice em lemmas)
+            key: Hash do texto (calculado se omitido)
+        """
+        self.text = text
+        self.key = key or text_key(text)
+        self.forms = forms
+        self.postings_offsets = postings_offsets
+        self.postings = postings
+        self.starts = starts
+        self.ends = ends
+        self.cantos = cantos
+        self.stanzas = stanzas
+        self.verses = verses
+        self.lemmas = lemmas
+        self.lemma_ids = lemma_ids
+        self.lemma_source: Optional[str] = None
+        # Alterado depois da última gravação em disco (ex.: lemas calculados)
+        self.dirty = False
+
+        self._form_ids = {form: form_id for form_id, form in enumerate(forms)}
+        self._folded_forms: Optional[List[str]] = None
+        self._folded_ids: Optional[Dict[str, List[int]]] = None
+        self._lemma_forms: Optional[Dict[str, List[int]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, text: str, key: Optional[str] = None) -> 'CorpusIndex':
+        """
+        Constrói o índice em uma passada pelo texto.
+
+        Args:
+            text: Texto a indexar
+            key: Hash do texto (calculado se omitido)
+
+        Returns:
+            Índice construído
+        """
+        starts, ends, words = [], [], []
+        for match in _WORD_RE.finditer(text):
+            starts.append(match.start())
+            ends.append(match.end())
+            words.append(match.group(0).lower())
+
+        forms = sorted(set(words))
+        form_ids = {form: form_id for form_id, form in enumerate(forms)}
+        token_forms = np.fromiter((form_ids[word] for word in words), dtype=np.int32, count=len(words))
+
+        # CSR: ordinais ordenados por forma (estável, mantém a ordem de posição)
+        postings = np.argsort(token_forms, kind='stable').astype(np.int32)
+        postings_offsets = np.zeros(len(forms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_forms, minlength=len(forms)), out=postings_offsets[1:])
+
+        # Canto, estrofe e verso com a mesma resolução do ContextAnalyzer
+        boundaries = get_canto_index(text)
+        locations = np.array(
+            [[NO_POSITION if value is None else value for value in boundaries.locate(start)] for start in starts],
+            dtype=np.int32
+        ).reshape(-1, 3)
+
+        return cls(text, forms, postings_offsets, postings,
+                   np.array(starts, dtype=np.int32), np.array(ends, dtype=np.int32),
+                   locations[:, 0].astype(np.int16), locations[:, 1].copy(), locations[:, 2].copy(),
+                   key=key)
+
+    @classmethod
+    def load(cls, path: str, text: str, key: Optional[str] = None) -> Optional['CorpusIndex']:
+        """
+        Carrega um índice gravado com save().
+
+        Args:
+            path: Arquivo .npz
+            text: Texto indexado (conferido pelo hash)
+            key: Hash do texto (calculado se omitido)
+
+        Returns:
+            Índice ou None (ausente, de outra versão ou de outro texto)
+        """
+        with np.load(path, allow_pickle=False) as data:
+            key = key or text_key(text)
+            meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+            if meta.get('version') != INDEX_FORMAT_VERSION or meta.get('key') != key:
+                return None
+            lemmas = lemma_ids = None
+            if 'lemmas' in data.files:
+                lemmas = cls._decode_words(data['lemmas'])
+                lemma_ids = data['lemma_ids']
+            index = cls(text, cls._decode_words(data['forms']), data['postings_offsets'], data['postings'],
+                        data['starts'], data['ends'], data['cantos'], data['stanzas'], data['verses'],
+                        lemmas, lemma_ids, key=key)
+        index.lemma_source = meta.get('lemma_source')
+        return index
+
+    def save(self, path: str) -> None:
+        """
+        Grava o índice (.npz sem compressão) de forma atômica.
+
+        Args:
+            path: Arquivo de destino
+        """
+        meta = {'version': INDEX_FORMAT_VERSION, 'key': self.key, 'tokens': len(self.starts),
+                'forms': len(self.forms), 'lemma_source': self.lemma_source}
+        arrays = {
+            'meta': np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+            'forms': self._encode_words(self.forms),
+            'postings_offsets': self.postings_offsets,
+            'postings': self.postings,
+            'starts': self.starts,
+            'ends': self.ends,
+            'cantos': self.cantos,
+            'stanzas': self.stanzas,
+            'verses': self.verses,
+        }
+        if self.lemma_ids is not None:
+            arrays['lemmas'] = self._encode_words(self.lemmas)
+            arrays['lemma_ids'] = self.lemma_ids
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @staticmethod
+    def _encode_words(words: List[str]) -> np.ndarray:
+        """Vocabulário como bytes UTF-8 separados por quebra de linha (formas não contêm \\n)."""
+        return np.frombuffer('\n'.join(words).encode('utf-8'), dtype=np.uint8)
+
+    @staticmethod
+    def _decode_words(data: np.ndarray) -> List[str]:
+        decoded = data.tobytes().decode('utf-8')
+        return decoded.split('\n') if decoded else []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def form_ids(self, query: str, mode: str = 'term', fold: bool = False) -> List[int]:
+        """
+        Formas do vocabulário que atendem à consulta.
+
+        Args:
+            query: Termo, prefixo ou palavra cujo lema será buscado
+            mode: 'term', 'prefix' ou 'lemma'
+            fold: Ignora acentos (termo e prefixo)
+
+        Returns:
+            Ids das formas, em ordem alfabética
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Modo de busca inválido: {mode}")
+        query = query.strip()
+        if not query:
+            return []
+
+        if mode == 'lemma':
+            return self._lemma_form_ids(query)
+
+        if fold:
+            forms = self._folded_vocabulary()
+            query = fold_term(query)
+        else:
+            forms = self.forms
+            query = query.lower()
+
+        if mode == 'term':
+            if fold:
+                return list(self._folded_ids.get(query, []))
+            form_id = self._form_ids.get(query)
+            return [] if form_id is None else [form_id]
+
+        # Prefixo: intervalo contíguo no vocabulário ordenado
+        first = bisect_left(forms, query)
+        matched = []
+        for position in range(first, len(forms)):
+            if not forms[position].startswith(query):
+                break
+            matched.append(position)
+        if fold:
+            return sorted(form_id for position in matched for form_id in self._folded_ids[forms[position]])
+        return matched
+
+    def occurrences(self, form_ids: List[int]) -> np.ndarray:
+        """
+        Ordinais das ocorrências das formas, em ordem de posição.
+
+        Args:
+            form_ids: Ids das formas
+
+        Returns:
+            Array de ordinais (índices em starts/ends)
+        """
+        if not form_ids:
+            return np.zeros(0, dtype=np.int32)
+        chunks = [self.postings[self.postings_offsets[form_id]:self.postings_offsets[form_id + 1]]
+                  for form_id in form_ids]
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.sort(np.concatenate(chunks))
+
+    def form_counts(self, form_ids: List[int]) -> Dict[str, int]:
+        """Frequência de cada forma (sem tocar nas listas de ocorrências)."""
+        return {
+            self.forms[form_id]: int(self.postings_offsets[form_id + 1] - self.postings_offsets[form_id])
+            for form_id in form_ids
+        }
+
+    def folded_counts(self, term: str) -> int:
+        """Ocorrências de um termo ignorando maiúsculas e acentos."""
+        return sum(self.form_counts(self.form_ids(term, 'term', fold=True)).values())
+
+    def spans(self, form_ids: List[int]) -> List[Tuple[int, int]]:
+        """Trechos (início, fim) das ocorrências das formas, em ordem de posição."""
+        ordinals = self.occurrences(form_ids)
+        return list(zip(self.starts[ordinals].tolist(), self.ends[ordinals].tolist()))
+
+    def location(self, ordinal: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """(canto, estrofe, verso) de uma ocorrência."""
+        return (_optional(int(self.cantos[ordinal])), _optional(int(self.stanzas[ordinal])),
+                _optional(int(self.verses[ordinal])))
+
+    def locate_offsets(self, offsets: List[int]) -> List[Tuple[Optional[int], Optional[int], Optional[int]]]:
+        """
+        (canto, estrofe, verso) de offsets do texto.
+
+        Offsets que não são início de palavra (sequência \\w) são resolvidos
+        pela tabela de fronteiras do texto.
+
+        Args:
+            offsets: Offsets no texto (em geral, inícios de palavras)
+
+        Returns:
+            Lista de (canto, estrofe, verso)
+        """
+        ordinals = np.searchsorted(self.starts, np.asarray(offsets, dtype=np.int64)).tolist()
+        token_count = len(self.starts)
+        locations = []
+        for offset, ordinal in zip(offsets, ordinals):
+            if ordinal < token_count and self.starts[ordinal] == offset:
+                locations.append(self.location(ordinal))
+            else:
+                locations.append(get_canto_index(self.text).locate(offset))
+        return locations
+
+    def kwic(self, ordinal: int, window: int = DEFAULT_KWIC_WINDOW) -> Dict[str, Any]:
+        """
+        Trecho KWIC (palavra-chave no contexto) de uma ocorrência.
+
+        Args:
+            ordinal: Ordinal da ocorrência
+            window: Caracteres de cada lado
+
+        Returns:
+            Dicionário com posição, localização e contexto esquerdo/direito
+        """
+        start, end = int(self.starts[ordinal]), int(self.ends[ordinal])
+        canto, stanza, verse = self.location(ordinal)
+        return {
+            'match': self.text[start:end],
+            'form': self.text[start:end].lower(),
+            'position': start,
+            'canto': canto,
+            'stanza': stanza,
+            'verse': verse,
+            'left': _SPACES_RE.sub(' ', self.text[max(0, start - window):start]).lstrip(),
+            'right': _SPACES_RE.sub(' ', self.text[end:end + window]).rstrip()
+        }
+
+    def search(self, query: str, mode: str = 'term', fold: bool = False,
+               window: int = DEFAULT_KWIC_WINDOW, limit: int = DEFAULT_SEARCH_LIMIT,
+               offset: int = 0) -> Dict[str, Any]:
+        """
+        Busca no índice com trechos KWIC paginados.
+
+        Args:
+            query: Termo, prefixo ou palavra (lema)
+            mode: 'term', 'prefix' ou 'lemma'
+            fold: Ignora acentos (termo e prefixo)
+            window: Caracteres de contexto de cada lado
+            limit: Máximo de ocorrências retornadas
+            offset: Ocorrências iniciais puladas
+
+        Returns:
+            Dicionário com total, frequência por forma e ocorrências
+        """
+        started = time.perf_counter()
+        form_ids = self.form_ids(query, mode, fold)
+        ordinals = self.occurrences(form_ids)
+        page = ordinals[offset:offset + limit].tolist()
+        hits = [self.kwic(ordinal, window) for ordinal in page]
+        counts = self.form_counts(form_ids)
+        return {
+            'query': query,
+            'mode': mode,
+            'fold': fold,
+            'lemma': self.lemma_of(query) if mode == 'lemma' else None,
+            'total': int(len(ordinals)),
+            'forms': dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))),
+            'offset': offset,
+            'limit': limit,
+            'hits': hits,
+            'took_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamanho do índice (ocorrências, vocabulário, bytes dos arrays)."""
+        arrays = (self.postings_offsets, self.postings, self.starts, self.ends,
+                  self.cantos, self.stanzas, self.verses)
+        return {
+            'tokens': len(self.starts),
+            'forms': len(self.forms),
+            'array_bytes': int(sum(array.nbytes for array in arrays)),
+            'lemmas': len(self.lemmas) if self.lemmas is not None else None,
+            'lemma_source': self.lemma_source
+        }
+
+    def _folded_vocabulary(self) -> List[str]:
+        """Vocabulário sem acentos, ordenado (com o mapa forma sem acento -> ids, sob demanda)."""
+        if self._folded_ids is None:
+            with self._lock:
+                if self._folded_ids is None:
+                    folded: Dict[str, List[int]] = {}
+                    for form_id, form in enumerate(self.forms):
+                        folded.setdefault(fold_term(form), []).append(form_id)
+                    self._folded_forms = sorted(folded)
+                    self._folded_ids = folded
+        return self._folded_forms
+
+    def ensure_lemmas(self) -> None:
+        """
+        Calcula o lema de cada forma do vocabulário (uma vez por índice e lematizador).
+
+        Usa o lematizador do spaCy quando o modelo o possui; senão o stemmer
+        RSLP; senão a forma sem acentos. Lemas gravados com outro lematizador
+        (ex.: antes da instalação do modelo spaCy) são recalculados, para que
+        consultas e vocabulário usem a mesma lematização.
+        """
+        lemmatize, source = self._lemmatizer()
+        if self.lemma_ids is not None and self.lemma_source == source:
+            return
+        with self._lock:
+            if self.lemma_ids is not None and self.lemma_source == source:
+                return
+            if self.lemma_ids is not None:
+                logger.info(f"Lemas do índice recalculados ({self.lemma_source} -> {source})")
+            lemma_of_form = lemmatize(self.forms)
+            lemmas = sorted(set(lemma_of_form))
+            lemma_positions = {lemma: position for position, lemma in enumerate(lemmas)}
+            self.lemmas = lemmas
+            self.lemma_ids = np.array([lemma_positions[lemma] for lemma in lemma_of_form], dtype=np.int32)
+            self.lemma_source = source
+            self._lemma_forms = None
+            self.dirty = True
+            logger.info(f"Lemas do índice calculados ({len(lemmas)} lemas, {source})")
+
+    def lemma_of(self, word: str) -> str:
+        """Lema de uma palavra (o da forma indexada, se existir)."""
+        self.ensure_lemmas()
+        form_id = self._form_ids.get(word.strip().lower())
+        if form_id is not None:
+            return self.lemmas[self.lemma_ids[form_id]]
+        lemmatize, _ = self._lemmatizer()
+        return lemmatize([word.strip().lower()])[0]
+
+    def _lemma_form_ids(self, word: str) -> List[int]:
+        """Formas com o mesmo lema da palavra consultada."""
+        lemma = self.lemma_of(word)
+        if self._lemma_forms is None:
+            with self._lock:
+                if self._lemma_forms is None:
+                    grouped: Dict[str, List[int]] = {}
+                    for form_id, lemma_id in enumerate(self.lemma_ids.tolist()):
+                        grouped.setdefault(self.lemmas[lemma_id], []).append(form_id)
+                    self._lemma_forms = grouped
+        return list(self._lemma_forms.get(lemma, []))
+
+    @staticmethod
+    def _lemmatizer():
+        """Função lista de formas -> lista de lemas e a origem ('spacy', 'rslp' ou 'folded')."""
+        registry = get_model_registry()
+        nlp = registry.get_nlp()
+        if 'lemmatizer' in nlp.pipe_names:
+            def lemmatize(words: List[str]) -> List[str]:
+                lemmas = []
+                for word, doc in zip(words, nlp.pipe(words, batch_size=1000)):
+                    lemma = doc[0].lemma_ if len(doc) == 1 else ''
+                    lemmas.append(fold_term(lemma or word))
+                return lemmas
+            return lemmatize, 'spacy'
+
+        stemmer = registry.get_stemmer()
+        if stemmer is not None:
+            return (lambda words: [stemmer.stem(fold_term(word)) for word in words]), 'rslp'
+        return (lambda words: [fold_term(word) for word in words]), 'folded'
+
+
+class CorpusIndexStore:
+    """Índices por texto: memória (LRU) + disco (.npz), construídos uma única vez."""
+
+    def __init__(self, disk_dir: Optional[str] = DEFAULT_INDEX_DIR,
+                 disk_bytes: int = DEFAULT_DISK_MB * 1024 * 1024,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        """
+        Args:
+            disk_dir: Diretório dos índices (None desativa o disco)
+            disk_bytes: Tamanho máximo dos arquivos em disco
+            memory_entries: Índices mantidos em memória
+        """
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self.memory_entries = max(1, memory_entries)
+        self._memory: 'OrderedDict[str, CorpusIndex]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'builds': 0, 'disk_evictions': 0}
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, text: str) -> CorpusIndex:
+        """
+        Retorna o índice do texto (memória, disco ou construído agora).
+
+        Args:
+            text: Texto do documento
+
+        Returns:
+            Índice posicional
+        """
+        key = text_key(text)
+        index = self._get_memory(key)
+        if index is not None:
+            return index
+
+        # Uma construção por vez: requisições simultâneas do mesmo texto reutilizam o resultado
+        with self._build_lock:
+            index = self._get_memory(key)
+            if index is not None:
+                return index
+            index = self._read_disk(key, text)
+            if index is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+            else:
+                started = time.time()
+                index = CorpusIndex.build(text, key)
+                logger.info(f"Índice do corpus construído ({len(index)} ocorrências, "
+                            f"{len(index.forms)} formas) em {time.time() - started:.2f}s")
+                with self._lock:
+                    self._stats['builds'] += 1
+                self._write_disk(index)
+            self._put_memory(index)
+        return index
+
+    def flush(self, index: CorpusIndex) -> None:
+        """Regrava o índice em disco se ele mudou (ex.: lemas calculados)."""
+        if index.dirty:
+            self._write_disk(index)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores e ocupação.
+
+        Returns:
+            Dicionário com acertos, construções e índices em memória
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        stats['memory_limit'] = self.memory_entries
+        stats['disk_dir'] = self.disk_dir
+        stats['disk_limit_bytes'] = self.disk_bytes
+        return stats
+
+    def _get_memory(self, key: str) -> Optional[CorpusIndex]:
+        with self._lock:
+            index = self._memory.get(key)
+            if index is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+            return index
+
+    def _put_memory(self, index: CorpusIndex) -> None:
+        with self._lock:
+            self._memory[index.key] = index
+            self._memory.move_to_end(index.key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    def _read_disk(self, key: str, text: str) -> Optional[CorpusIndex]:
+        """Carrega um índice do disco (None se ausente, desatualizado ou corrompido)."""
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            index = CorpusIndex.load(path, text, key)
+            if index is not None:
+                # Atualiza o mtime: o despejo em disco remove os menos usados
+                os.utime(path, None)
+            return index
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Índice em disco inválido removido ({key[:12]}): {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write_disk(self, index: CorpusIndex) -> None:
+        """Grava um índice e aplica o limite de tamanho do diretório."""
+        if not self.disk_dir:
+            return
+        try:
+            index.save(self._disk_path(index.key))
+        except OSError as e:
+            logger.warning(f"Falha ao gravar índice em disco: {e}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Remove os índices em disco menos usados até caber no limite."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+            total += info.st_size
+        if total <= self.disk_bytes:
+            return
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self._stats['disk_evictions'] += 1
+            except OSError:
+                pass
+
+
+_corpus_index_store: Optional[CorpusIndexStore] = None
+_corpus_index_store_lock = threading.Lock()
+
+
+def get_corpus_index_store() -> CorpusIndexStore:
+    """
+    Retorna o armazenamento de índices do processo.
+
+    Configuração via CORPUS_INDEX_DIR (vazio desativa o disco),
+    CORPUS_INDEX_DISK_MB e CORPUS_INDEX_MEMORY_ENTRIES.
+    """
+    global _corpus_index_store
+    if _corpus_index_store is None:
+        with _corpus_index_store_lock:
+            if _corpus_index_store is None:
+                disk_dir = os.getenv('CORPUS_INDEX_DIR', DEFAULT_INDEX_DIR) or None
+                try:
+                    store = CorpusIndexStore(
+                        disk_dir=disk_dir,
+                        disk_bytes=int(float(os.getenv('CORPUS_INDEX_DISK_MB', DEFAULT_DISK_MB)) * 1024 * 1024),
+                        memory_entries=int(os.getenv('CORPUS_INDEX_MEMORY_ENTRIES', DEFAULT_MEMORY_ENTRIES))
+                    )
+                except OSError as e:
+                    logger.warning(f"Diretório de índices indisponível ({e}); usando apenas memória.")
+                    store = CorpusIndexStore(disk_dir=None)
+                _corpus_index_store = store
+                logger.info(f"Índices do corpus inicializados (disco: {store.disk_dir})")
+    return _corpus_index_store
+
+
+def get_corpus_index(text: str) -> CorpusIndex:
+    """Retorna o índice posicional do texto (construído uma vez por documento)."""
+    return get_corpus_index_store().get(text)
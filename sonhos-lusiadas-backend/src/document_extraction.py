@@ -0,0 +1,501 @@
+"""
+Módulo de Extração de Texto de Documentos
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo extrai o texto dos arquivos enviados preservando a estrutura de
+linhas necessária para a separação de cantos e a detecção de estrofes:
+
+- DOCX: leitura incremental (iterparse) de word/document.xml, um parágrafo
+  (w:p) por linha, com memória constante em relação ao tamanho do documento
+- DOC: docx2txt ou, como alternativa, antiword
+- TXT: leitura direta em UTF-8
+- PDF: páginas divididas em blocos extraídos em paralelo (pdfplumber ou
+  PyPDF2) e reunidos na ordem original, preservando as quebras de linha
+
+As extrações rodam em um pool de processos limitado, com timeout por formato
+(no timeout os processos do pool são encerrados e o pool é recriado), e
+extrações simultâneas do mesmo arquivo (mesma impressão digital) são unidas.
+"""
+
+import os
+import zipfile
+import threading
+import subprocess
+import logging
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import docx2txt
+    DOCX2TXT_AVAILABLE = True
+except ImportError:
+    DOCX2TXT_AVAILABLE = False
+    logger.warning("docx2txt não disponível - arquivos .doc dependerão do antiword")
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+try:
+    from PyPDF2 import PdfReader
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+if not PDFPLUMBER_AVAILABLE and not PYPDF2_AVAILABLE:
+    logger.warning("pdfplumber/PyPDF2 não disponíveis - arquivos .pdf não serão processados")
+
+DEFAULT_EXTRACTION_WORKERS = 2
+# Páginas de PDF extraídas por tarefa do pool
+DEFAULT_PDF_PAGES_PER_TASK = 16
+# Timeouts padrão (segundos) por formato
+DEFAULT_TIMEOUTS = {
+    'docx': 60.0,
+    'doc': 30.0,
+    'txt': 10.0,
+    'pdf': 120.0
+}
+
+
+class ExtractionError(Exception):
+    """Falha (ou timeout) na extração de texto de um arquivo."""
+
+
+# Namespace principal do WordprocessingML
+W_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+_W_P = f'{{{W_NAMESPACE}}}p'
+_W_T = f'{{{W_NAMESPACE}}}t'
+_W_TAB = f'{{{W_NAMESPACE}}}tab'
+_W_BR = f'{{{W_NAMESPACE}}}br'
+_W_CR = f'{{{W_NAMESPACE}}}cr'
+
+
+def iter_docx_paragraphs(source: Union[str, IO[bytes]]) -> Iterator[str]:
+    """
+    Percorre os parágrafos de um DOCX de forma incremental.
+
+    Cada w:p é emitido assim que termina e então descartado da árvore, de modo
+    que a memória usada não cresce com o tamanho do documento.
+
+    Args:
+        source: Caminho ou arquivo binário do DOCX
+
+    Yields:
+        Texto de cada parágrafo (quebras w:br/w:cr viram '\\n', w:tab vira '\\t')
+    """
+    with zipfile.ZipFile(source, 'r') as docx:
+        with docx.open('word/document.xml') as document:
+            stack: List[ET.Element] = []
+            buffers: List[List[str]] = []
+            for event, elem in ET.iterparse(document, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(elem)
+                    if elem.tag == _W_P:
+                        buffers.append([])
+                    continue
+
+                stack.pop()
+                if not buffers:
+                    continue
+                if elem.tag == _W_T:
+                    if elem.text:
+                        buffers[-1].append(elem.text)
+                elif elem.tag == _W_TAB:
+                    buffers[-1].append('\t')
+                elif elem.tag in (_W_BR, _W_CR):
+                    buffers[-1].append('\n')
+                elif elem.tag == _W_P:
+                    paragraph = ''.join(buffers.pop())
+                    # Parágrafo aninhado (ex.: caixa de texto) vira linha própria
+                    if buffers:
+                        buffers[-1].append('\n' + paragraph + '\n')
+                    else:
+                        yield paragraph
+                    # Libera o parágrafo já processado
+                    elem.clear()
+                    if stack:
+                        stack[-1].remove(elem)
+
+
+def extract_docx_text(source: Union[str, IO[bytes]]) -> str:
+    """
+    Extrai o texto de um DOCX com um parágrafo por linha.
+
+    Args:
+        source: Caminho ou arquivo binário do DOCX
+
+    Returns:
+        Texto do documento (parágrafos separados por '\\n')
+    """
+    return '\n'.join(iter_docx_paragraphs(source)).strip()
+
+
+def extract_doc_text(path: str, timeout: float = DEFAULT_TIMEOUTS['doc']) -> str:
+    """
+    Extrai o texto de um arquivo .doc (docx2txt ou antiword).
+
+    Args:
+        path: Caminho do arquivo
+        timeout: Tempo máximo do antiword (segundos)
+
+    Returns:
+        Texto extraído
+    """
+    if DOCX2TXT_AVAILABLE:
+        try:
+            return docx2txt.process(path).strip()
+        except Exception as e:
+            raise ExtractionError(f"Erro ao processar arquivo DOC: {str(e)}")
+
+    # Método alternativo para .doc: antiword, se instalado
+    try:
+        result = subprocess.run(['antiword', path], capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise ExtractionError(f"Erro ao processar arquivo DOC - formato não suportado ({e})")
+    if result.returncode != 0:
+        raise ExtractionError("Erro: antiword não disponível para processar arquivo .doc")
+    return result.stdout.strip()
+
+
+def extract_txt_text(path: str) -> str:
+    """Lê um arquivo de texto em UTF-8."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        raise ExtractionError(f"Erro ao ler arquivo TXT: {str(e)}")
+
+
+def count_pdf_pages(path: str) -> int:
+    """
+    Conta as páginas de um PDF.
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Número de páginas
+    """
+    try:
+        if PYPDF2_AVAILABLE:
+            # PyPDF2 só lê a tabela de páginas, sem interpretar o conteúdo
+            return len(PdfReader(path).pages)
+        if PDFPLUMBER_AVAILABLE:
+            with pdfplumber.open(path) as pdf:
+                return len(pdf.pages)
+    except Exception as e:
+        raise ExtractionError(f"Erro ao processar arquivo PDF: {str(e)}")
+    raise ExtractionError("Erro: pdfplumber/PyPDF2 não disponíveis para processar arquivo .pdf")
+
+
+def pdf_page_text(page, line_tolerance: float = 3.0, gap_ratio: float = 1.6) -> str:
+    """
+    Reconstrói o texto de uma página do pdfplumber, uma linha visual por linha.
+
+    Espaços verticais maiores que o entrelinhamento típico da página (ex.: entre
+    estrofes) viram linhas em branco, que o extract_text() descartaria.
+
+    Args:
+        page: Página do pdfplumber
+        line_tolerance: Diferença máxima de topo (pt) entre palavras da mesma linha
+        gap_ratio: Múltiplo do entrelinhamento mediano que caracteriza uma lacuna
+
+    Returns:
+        Texto da página
+    """
+    lines: List[Tuple[float, float, List[Tuple[float, str]]]] = []
+    for word in sorted(page.extract_words(keep_blank_chars=True), key=lambda w: (w['top'], w['x0'])):
+        if lines and word['top'] - lines[-1][0] <= line_tolerance:
+            lines[-1][2].append((word['x0'], word['text']))
+            lines[-1] = (lines[-1][0], max(lines[-1][1], word['bottom']), lines[-1][2])
+        else:
+            lines.append((word['top'], word['bottom'], [(word['x0'], word['text'])]))
+    if not lines:
+        return ''
+
+    gaps = sorted(b[0] - a[0] for a, b in zip(lines, lines[1:]))
+    leading = gaps[len(gaps) // 2] if gaps else 0.0
+    output: List[str] = []
+    previous_top = None
+    for top, _, words in lines:
+        if previous_top is not None and leading and top - previous_top > leading * gap_ratio:
+            output.append('')
+        output.append(' '.join(text.strip() for _, text in sorted(words)))
+        previous_top = top
+    return '\n'.join(output)
+
+
+def extract_pdf_pages(path: str, start: int, end: int) -> List[str]:
+    """
+    Extrai o texto de um intervalo de páginas de um PDF (executado nos workers).
+
+    O pdfplumber reconstrói as linhas pelo layout (um verso por linha e uma
+    linha em branco entre estrofes); o PyPDF2 é o alternativo.
+
+    Args:
+        path: Caminho do arquivo
+        start: Primeira página (índice 0, inclusiva)
+        end: Última página (exclusiva)
+
+    Returns:
+        Texto de cada página do intervalo, na ordem
+    """
+    pages: List[str] = []
+    try:
+        if PDFPLUMBER_AVAILABLE:
+            with pdfplumber.open(path, pages=list(range(start + 1, end + 1))) as pdf:
+                for page in pdf.pages:
+                    pages.append(pdf_page_text(page))
+                    # Libera os objetos já interpretados da página
+                    page.flush_cache()
+        elif PYPDF2_AVAILABLE:
+            reader = PdfReader(path)
+            for index in range(start, end):
+                pages.append(reader.pages[index].extract_text() or '')
+        else:
+            raise ExtractionError("Erro: pdfplumber/PyPDF2 não disponíveis para processar arquivo .pdf")
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"Erro ao processar arquivo PDF (páginas {start + 1}-{end}): {str(e)}")
+    return pages
+
+
+def pdf_page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """Divide as páginas em intervalos [início, fim) de até pages_per_task páginas."""
+    step = max(1, pages_per_task)
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+
+def join_pdf_pages(pages: Iterable[str]) -> str:
+    """Une as páginas de um PDF com uma quebra de linha entre elas."""
+    return '\n'.join(page.strip('\n') for page in pages).strip()
+
+
+def extract_file(path: str, extension: str, timeout: Optional[float] = None) -> str:
+    """
+    Extrai o texto de um arquivo conforme a extensão (executado nos workers).
+
+    Args:
+        path: Caminho do arquivo
+        extension: Extensão sem ponto ('docx', 'doc', 'txt', 'pdf')
+        timeout: Timeout repassado a subprocessos (antiword)
+
+    Returns:
+        Texto extraído
+    """
+    if extension == 'docx':
+        try:
+            return extract_docx_text(path)
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            raise ExtractionError(f"Erro ao processar arquivo DOCX: {str(e)}")
+    if extension == 'doc':
+        return extract_doc_text(path, timeout or DEFAULT_TIMEOUTS['doc'])
+    if extension == 'txt':
+        return extract_txt_text(path)
+    if extension == 'pdf':
+        return join_pdf_pages(extract_pdf_pages(path, 0, count_pdf_pages(path)))
+    raise ExtractionError(f"Formato não suportado: .{extension}")
+
+
+class ExtractionService:
+    """Executa extrações em um pool de processos limitado, com timeout por formato."""
+
+    def __init__(self, max_workers: int = DEFAULT_EXTRACTION_WORKERS,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 pdf_pages_per_task: int = DEFAULT_PDF_PAGES_PER_TASK):
+        """
+        Args:
+            max_workers: Número máximo de extrações simultâneas
+            timeouts: Timeout (segundos) por extensão
+            pdf_pages_per_task: Páginas de PDF extraídas por tarefa do pool
+        """
+        self.max_workers = max_workers
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.pdf_pages_per_task = max(1, pdf_pages_per_task)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+    def extract(self, path: str, fingerprint: Optional[str] = None) -> str:
+        """
+        Extrai o texto de um arquivo no pool, respeitando o timeout do formato.
+
+        Args:
+            path: Caminho do arquivo
+            fingerprint: Impressão digital do conteúdo (ex.: SHA-256); extrações
+                simultâneas do mesmo arquivo compartilham o mesmo resultado
+
+        Returns:
+            Texto extraído
+
+        Raises:
+            ExtractionError: Em caso de falha ou timeout
+        """
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        timeout = self.timeouts.get(extension, max(self.timeouts.values()))
+        key = fingerprint or path
+
+        # A primeira requisição extrai; as simultâneas aguardam o mesmo resultado
+        with self._lock:
+            shared = self._in_flight.get(key)
+            leader = shared is None
+            if leader:
+                shared = Future()
+                self._in_flight[key] = shared
+
+        if not leader:
+            try:
+                return shared.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise ExtractionError(f"Tempo limite de extração excedido ({timeout:.0f}s) para arquivo .{extension}")
+
+        try:
+            if extension == 'pdf':
+                content = join_pdf_pages(self.iter_pdf_pages(path, timeout))
+                if not content:
+                    raise ExtractionError("Nenhum texto extraído do PDF (páginas digitalizadas sem "
+                                          "camada de texto não são suportadas)")
+            else:
+                content = self._extract_in_pool(path, extension, timeout)
+            shared.set_result(content)
+            return content
+        except BaseException as e:
+            shared.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def iter_pdf_pages(self, path: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Extrai as páginas de um PDF em paralelo, emitindo-as na ordem original.
+
+        As páginas são divididas em blocos de pdf_pages_per_task, todos agendados
+        no pool de uma vez; cada bloco é emitido assim que ele e os anteriores
+        terminam.
+
+        Args:
+            path: Caminho do arquivo
+            timeout: Tempo máximo da extração completa (padrão do formato 'pdf')
+
+        Yields:
+            Texto de cada página, na ordem
+
+        Raises:
+            ExtractionError: Em caso de falha ou timeout
+        """
+        timeout = timeout or self.timeouts['pdf']
+        deadline = time.monotonic() + timeout
+        ranges = pdf_page_ranges(count_pdf_pages(path), self.pdf_pages_per_task)
+
+        try:
+            futures = [self._submit(extract_pdf_pages, path, start, end) for start, end in ranges]
+        except BrokenExecutor as e:
+            self._reset_pool(e)
+            for start, end in ranges:
+                yield from extract_pdf_pages(path, start, end)
+            return
+
+        try:
+            for (start, end), future in zip(ranges, futures):
+                try:
+                    pages = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    self._recycle_pool(f"timeout de {timeout:.0f}s em {os.path.basename(path)}")
+                    raise ExtractionError(f"Tempo limite de extração excedido ({timeout:.0f}s) para arquivo .pdf")
+                except BrokenExecutor as e:
+                    self._reset_pool(e)
+                    pages = extract_pdf_pages(path, start, end)
+                yield from pages
+        finally:
+            # Interrompido (erro, timeout ou consumidor encerrado): descarta blocos pendentes
+            for future in futures:
+                future.cancel()
+
+    def _extract_in_pool(self, path: str, extension: str, timeout: float) -> str:
+        """Extrai um arquivo inteiro em uma tarefa do pool."""
+        try:
+            future = self._submit(extract_file, path, extension, timeout)
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                # cancel() não interrompe uma tarefa em execução: encerra os workers
+                self._recycle_pool(f"timeout de {timeout:.0f}s em {os.path.basename(path)}")
+                raise ExtractionError(f"Tempo limite de extração excedido ({timeout:.0f}s) para arquivo .{extension}")
+        except BrokenExecutor as e:
+            self._reset_pool(e)
+            return extract_file(path, extension, timeout)
+
+    def _submit(self, fn, *args) -> Future:
+        """Agenda uma tarefa no pool (criado sob demanda)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor.submit(fn, *args)
+
+    def _reset_pool(self, error: Exception) -> None:
+        """Descarta um pool quebrado; o próximo envio cria outro."""
+        logger.warning(f"Pool de extração indisponível ({error}); extraindo no processo atual.")
+        with self._lock:
+            self._executor = None
+
+    def _recycle_pool(self, reason: str) -> None:
+        """
+        Encerra os processos do pool atual e o descarta; o próximo envio cria outro.
+
+        Usado no timeout, quando a tarefa travada continuaria ocupando um worker.
+        Extrações de outros arquivos no mesmo pool recebem BrokenExecutor e são
+        refeitas no processo atual (como em _reset_pool).
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        logger.warning(f"Pool de extração reciclado ({reason}).")
+        # ProcessPoolExecutor não expõe os workers antes do Python 3.14
+        terminate_workers = getattr(executor, 'terminate_workers', None)
+        if terminate_workers is not None:
+            terminate_workers()
+            return
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+_extraction_service: Optional[ExtractionService] = None
+_extraction_service_lock = threading.Lock()
+
+
+def get_extraction_service() -> ExtractionService:
+    """
+    Retorna o serviço de extração do processo (criado sob demanda).
+
+    Configuração via EXTRACTION_WORKERS, EXTRACTION_TIMEOUT_<FORMATO>
+    (ex.: EXTRACTION_TIMEOUT_DOC=30) e EXTRACTION_PDF_PAGES_PER_TASK.
+    """
+    global _extraction_service
+    if _extraction_service is None:
+        with _extraction_service_lock:
+            if _extraction_service is None:
+                timeouts = {
+                    extension: float(os.getenv(f'EXTRACTION_TIMEOUT_{extension.upper()}', default))
+                    for extension, default in DEFAULT_TIMEOUTS.items()
+                }
+                _extraction_service = ExtractionService(
+                    max_workers=int(os.getenv('EXTRACTION_WORKERS', DEFAULT_EXTRACTION_WORKERS)),
+                    timeouts=timeouts,
+                    pdf_pages_per_task=int(os.getenv('EXTRACTION_PDF_PAGES_PER_TASK', DEFAULT_PDF_PAGES_PER_TASK))
+                )
+    return _extraction_service
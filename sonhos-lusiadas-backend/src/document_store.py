@@ -0,0 +1,268 @@
+"""
+Módulo de Armazenamento de Documentos
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo mantém no servidor os documentos enviados pelos usuários, para
+que análises e exportações possam referenciá-los por id em vez de receber o
+texto completo a cada requisição:
+
+- Endereçamento por conteúdo: o id é o SHA-256 do arquivo (deduplicação)
+- Cada documento guarda o arquivo original, o texto extraído e metadados
+- Despejo LRU (último acesso) por tamanho total e número de documentos
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 500
+DEFAULT_MAX_DOCUMENTS = 200
+STORE_SUBDIR = 'documents'
+
+_DOCUMENT_ID_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_document_id(value: Any) -> bool:
+    """Verifica se o valor tem o formato de um id de documento (SHA-256)."""
+    return isinstance(value, str) and bool(_DOCUMENT_ID_RE.match(value))
+
+
+class DocumentStore:
+    """Armazenamento de documentos endereçado por conteúdo, com despejo LRU."""
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 max_documents: int = DEFAULT_MAX_DOCUMENTS):
+        """
+        Args:
+            root: Diretório do armazenamento
+            max_bytes: Tamanho total máximo (arquivos originais + textos)
+            max_documents: Número máximo de documentos retidos
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def compute_id(data: bytes) -> str:
+        """Calcula o id (SHA-256) de um conteúdo."""
+        return hashlib.sha256(data).hexdigest()
+
+    def save_original(self, data: bytes, filename: str) -> Tuple[str, str, bool]:
+        """
+        Armazena um arquivo enviado (se ainda não existir).
+
+        Args:
+            data: Bytes do arquivo
+            filename: Nome do arquivo (já sanitizado)
+
+        Returns:
+            Tupla (id do documento, caminho do arquivo original, se é novo)
+        """
+        document_id = self.compute_id(data)
+        extension = os.path.splitext(filename)[1].lower()
+        directory = self._directory(document_id)
+        path = os.path.join(directory, f"original{extension}")
+
+        with self._lock:
+            is_new = not os.path.exists(path)
+            if is_new:
+                os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._write_metadata(document_id, {
+                    'document_id': document_id,
+                    'filename': filename,
+                    'size': len(data),
+                    'created_at': time.time()
+                })
+            else:
+                self._touch(document_id)
+
+        if is_new:
+            self._evict(keep=document_id)
+        return document_id, path, is_new
+
+    def save_text(self, text: str, filename: str = 'texto.txt') -> Tuple[str, bool]:
+        """
+        Armazena um texto puro como documento (ex.: texto colado pelo usuário).
+
+        Args:
+            text: Conteúdo textual
+            filename: Nome descritivo
+
+        Returns:
+            Tupla (id do documento, se é novo)
+        """
+        document_id, _, is_new = self.save_original(text.encode('utf-8'), filename)
+        if is_new or self.get_content(document_id) is None:
+            self.save_content(document_id, text)
+        return document_id, is_new
+
+    def save_content(self, document_id: str, content: str) -> None:
+        """
+        Armazena o texto extraído de um documento.
+
+        Args:
+            document_id: Id do documento
+            content: Texto extraído
+        """
+        path = os.path.join(self._directory(document_id), 'content.txt')
+        with self._lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            metadata = self._read_metadata(document_id) or {'document_id': document_id}
+            metadata['content_length'] = len(content)
+            self._write_metadata(document_id, metadata)
+        self._evict(keep=document_id)
+
+    def get_content(self, document_id: str) -> Optional[str]:
+        """
+        Retorna o texto extraído de um documento.
+
+        Args:
+            document_id: Id do documento
+
+        Returns:
+            Texto ou None se o documento não existir (ou tiver sido despejado)
+        """
+        if not is_document_id(document_id):
+            return None
+        path = os.path.join(self._directory(document_id), 'content.txt')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._touch(document_id)
+        return content
+
+    def get_metadata(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna os metadados de um documento (None se não existir)."""
+        if not is_document_id(document_id):
+            return None
+        with self._lock:
+            return self._read_metadata(document_id)
+
+    def delete(self, document_id: str) -> None:
+        """Remove um documento (ex.: arquivo cuja extração falhou)."""
+        if not is_document_id(document_id):
+            return
+        with self._lock:
+            shutil.rmtree(self._directory(document_id), ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna ocupação e limites do armazenamento."""
+        entries = self._entries()
+        return {
+            'documents': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'max_documents': self.max_documents,
+            'root': self.root
+        }
+
+    def _directory(self, document_id: str) -> str:
+        return os.path.join(self.root, document_id)
+
+    def _metadata_path(self, document_id: str) -> str:
+        return os.path.join(self._directory(document_id), 'meta.json')
+
+    def _read_metadata(self, document_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._metadata_path(document_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_metadata(self, document_id: str, metadata: Dict[str, Any]) -> None:
+        path = self._metadata_path(document_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _touch(self, document_id: str) -> None:
+        """Marca o último acesso (mtime dos metadados), usado pelo despejo LRU."""
+        try:
+            os.utime(self._metadata_path(document_id), None)
+        except OSError:
+            pass
+
+    def _entries(self):
+        """Lista (último acesso, tamanho, id) dos documentos armazenados."""
+        entries = []
+        for name in os.listdir(self.root):
+            if not is_document_id(name):
+                continue
+            directory = self._directory(name)
+            try:
+                accessed = os.stat(self._metadata_path(name)).st_mtime
+                size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+            except OSError:
+                continue
+            entries.append((accessed, size, name))
+        return entries
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove os documentos acessados há mais tempo até respeitar os limites."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            count = len(entries)
+            for _, size, document_id in entries:
+                if total <= self.max_bytes and count <= self.max_documents:
+                    break
+                if document_id == keep:
+                    continue
+                shutil.rmtree(self._directory(document_id), ignore_errors=True)
+                total -= size
+                count -= 1
+                logger.info(f"Documento {document_id[:12]} removido do armazenamento (LRU).")
+
+
+_stores: Dict[str, DocumentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_document_store(upload_folder: str) -> DocumentStore:
+    """
+    Retorna o armazenamento de documentos da pasta de uploads.
+
+    Configuração via DOCUMENT_STORE_MAX_MB e DOCUMENT_STORE_MAX_DOCUMENTS.
+
+    Args:
+        upload_folder: Pasta de uploads da aplicação
+
+    Returns:
+        DocumentStore compartilhado pelo processo
+    """
+    root = os.path.join(upload_folder, STORE_SUBDIR)
+    store = _stores.get(root)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(root)
+            if store is None:
+                store = DocumentStore(
+                    root,
+                    max_bytes=int(float(os.getenv('DOCUMENT_STORE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024),
+                    max_documents=int(os.getenv('DOCUMENT_STORE_MAX_DOCUMENTS', DEFAULT_MAX_DOCUMENTS))
+                )
+                _stores[root] = store
+    return store
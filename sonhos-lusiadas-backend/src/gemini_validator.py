@@ -4,15 +4,41 @@ Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
 
 Este módulo implementa validação cruzada usando Google Gemini como modelo secundário,
 conforme solicitado pela cliente para maior confiabilidade na análise.
+
+Os lotes são validados em um pool de threads compartilhado pelo processo
+(GEMINI_MAX_CONCURRENCY chamadas simultâneas no total, não por requisição),
+sobre uma sessão HTTP com conexões persistentes, sob um limitador de taxa (token bucket) e com novas
+tentativas (backoff exponencial) em respostas 429/5xx. Vários contextos são
+enviados no mesmo prompt (saída JSON indexada), em lotes dimensionados por um
+orçamento de tokens. Respostas já obtidas ficam em um cache persistente
+(validation_cache) e não são pedidas de novo.
+
+Cada lote pode receber um prazo (deadline): contextos não validados a tempo
+voltam com status 'pending'. Um disjuntor (circuit breaker) abre após falhas
+ou timeouts seguidos, e enquanto aberto os contextos voltam como 'skipped',
+assim como os contextos cuja chamada falhou após as novas tentativas.
+
+A sessão HTTP, o pool de threads e os locks não atravessam um fork(): o
+processo filho os recria na primeira chamada.
 """
 
 import os
+import re
 import json
+import time
+import random
+import threading
+import weakref
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Optional, Any
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from model_registry import get_model_registry
+from validation_cache import get_validation_cache, make_validation_key, normalize_context
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
@@ -20,23 +46,281 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RATE_LIMIT_RPS = 5.0
+DEFAULT_RATE_LIMIT_BURST = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1.0
+DEFAULT_TIMEOUT_SECONDS = 30.0
+# Status HTTP que justificam nova tentativa
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Orçamento de tempo da validação por requisição (segundos; 0 desativa)
+DEFAULT_VALIDATION_BUDGET_SECONDS = 60.0
+# Disjuntor: falhas seguidas até abrir e tempo aberto antes de testar de novo
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+
+# Status de contextos não validados
+VALIDATION_PENDING = 'pending'
+VALIDATION_SKIPPED = 'skipped'
+
+# Validação em lote: contextos por prompt e orçamento de tokens do prompt
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+# Tokens de saída reservados por contexto e para o envelope da resposta
+OUTPUT_TOKENS_PER_ITEM = 120
+OUTPUT_TOKENS_OVERHEAD = 200
+MAX_OUTPUT_TOKENS = 8192
+
+# Versão dos prompts de validação (alterar invalida o cache de validações)
+PROMPT_VERSION = '1'
+
+VALID_CLASSIFICATIONS = ('onírico', 'profético', 'alegórico', 'divino', 'ilusório')
+
+CATEGORY_DEFINITIONS = """As categorias possíveis são:
+1. "onírico" - sonhos, pesadelos, devaneios, estados de sono
+2. "profético" - visões, presságios, augúrios, revelações sobre o futuro
+3. "alegórico" - símbolos, metáforas, alegorias relacionadas a sonhos
+4. "divino" - revelações, aparições divinas, manifestações sobrenaturais
+5. "ilusório" - ilusões, quimeras, miragens, falsas aparências"""
+
+
+def context_text(context: Dict) -> str:
+    """Texto de um contexto do lote ('context' ou os campos do analisador)."""
+    return (context.get('context') or context.get('sentence') or context.get('text')
+            or context.get('excerpt') or '')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira de tokens (~4 caracteres por token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Limitador de taxa thread-safe (token bucket)."""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: Tokens repostos por segundo (requisições por segundo)
+            capacity: Tamanho do balde (rajada máxima)
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> Optional[float]:
+        """
+        Consome um token, aguardando se o balde estiver vazio.
+
+        Args:
+            deadline: Prazo absoluto (time.time()); a espera nunca passa dele
+
+        Returns:
+            Tempo (segundos) aguardado, ou None se o token só viria depois do prazo
+            (nenhum token é consumido)
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            if deadline is not None and time.time() + delay >= deadline:
+                return None
+            time.sleep(delay)
+            waited += delay
+
+
+class ValidationUnavailable(Exception):
+    """Validação não tentada ou interrompida (prazo esgotado ou disjuntor aberto)."""
+
+    def __init__(self, status: str, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Disjuntor thread-safe: fechado -> aberto (após falhas) -> meio-aberto (teste)."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        """
+        Args:
+            failure_threshold: Falhas seguidas que abrem o circuito
+            reset_seconds: Tempo aberto antes de liberar uma chamada de teste
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Estado atual ('closed', 'open' ou 'half_open')."""
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow(self) -> bool:
+        """Indica se uma chamada pode ser feita agora."""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                return False
+            # Meio-aberto: uma chamada de teste por vez (renovada se a anterior sumir)
+            now = time.monotonic()
+            if self._probe_started is None or now - self._probe_started > self.reset_seconds:
+                self._probe_started = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Registra uma chamada bem-sucedida (fecha o circuito)."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Registra uma falha (abre o circuito no limite ou se o teste falhar)."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                    logger.warning(f"Gemini: circuito aberto após {self._failures} falha(s) seguida(s).")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna estado e contadores do disjuntor."""
+        with self._lock:
+            self._refresh()
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'times_opened': self._times_opened,
+                'failure_threshold': self.failure_threshold,
+                'reset_seconds': self.reset_seconds
+            }
+
+    def _refresh(self) -> None:
+        """Passa de aberto para meio-aberto após reset_seconds (com lock)."""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_started = None
+
+
 class GeminiValidator:
     """Validador usando Google Gemini para validação cruzada."""
+
+    # Validadores do processo, reiniciados no filho após um fork()
+    _instances = weakref.WeakSet()
     
     def __init__(self):
         """Inicializa o validador Gemini."""
         self.api_key = os.getenv('GEMINI_API_KEY')
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        # GEMINI_BASE_URL permite apontar para um servidor local (scripts/gemini_mock_server.py)
+        self.base_url = (os.getenv('GEMINI_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
         self.model = "gemini-1.5-flash"
         self.available = bool(self.api_key)
+
+        # Concorrência, limite de taxa e novas tentativas
+        self.max_concurrency = max(1, int(os.getenv('GEMINI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)))
+        self.rate_limiter = TokenBucket(
+            float(os.getenv('GEMINI_RATE_LIMIT_RPS', DEFAULT_RATE_LIMIT_RPS)),
+            int(os.getenv('GEMINI_RATE_LIMIT_BURST', DEFAULT_RATE_LIMIT_BURST))
+        )
+        self.max_retries = max(0, int(os.getenv('GEMINI_MAX_RETRIES', DEFAULT_MAX_RETRIES)))
+        self.backoff_seconds = float(os.getenv('GEMINI_BACKOFF_SECONDS', DEFAULT_BACKOFF_SECONDS))
+        self.timeout = float(os.getenv('GEMINI_TIMEOUT_SECONDS', DEFAULT_TIMEOUT_SECONDS))
+        self._session: Optional[requests.Session] = None
+        self._session_pid = os.getpid()
+        self._session_lock = threading.Lock()
+        # Pool de threads das chamadas, compartilhado por todas as requisições
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Validação de vários contextos por prompt (GEMINI_BATCH_SIZE=1 desativa)
+        self.batch_size = max(1, int(os.getenv('GEMINI_BATCH_SIZE', DEFAULT_BATCH_SIZE)))
+        self.batch_token_budget = int(os.getenv('GEMINI_BATCH_TOKEN_BUDGET', DEFAULT_BATCH_TOKEN_BUDGET))
+
+        # Cache persistente de validações
+        self.cache = get_validation_cache() if self.available else None
+
+        # Orçamento de tempo por requisição e disjuntor
+        self.validation_budget = float(os.getenv('GEMINI_VALIDATION_BUDGET_SECONDS', DEFAULT_VALIDATION_BUDGET_SECONDS))
+        self.breaker = CircuitBreaker(
+            int(os.getenv('GEMINI_BREAKER_FAILURES', DEFAULT_BREAKER_FAILURES)),
+            float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', DEFAULT_BREAKER_RESET_SECONDS))
+        )
         
         if not self.available:
             logger.warning("GEMINI_API_KEY não encontrada. Validação Gemini não estará disponível.")
         else:
             logger.info("Validador Gemini configurado com sucesso.")
+        GeminiValidator._instances.add(self)
+
+    def _after_fork(self) -> None:
+        """Descarta no filho a sessão (sockets do pai), o pool de threads e os locks herdados."""
+        self._session = None
+        self._executor = None
+        self._session_pid = os.getpid()
+        self._session_lock = threading.Lock()
+        self.rate_limiter._lock = threading.Lock()
+        self.breaker._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Sessão HTTP do processo, com pool de conexões persistentes do tamanho da concorrência."""
+        if self._session is None or self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({
+                        "Content-Type": "application/json",
+                        "x-goog-api-key": self.api_key or ''
+                    })
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Pool de threads do processo; limita as chamadas simultâneas a max_concurrency."""
+        if self._executor is None:
+            with self._session_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                        thread_name_prefix='gemini')
+        return self._executor
     
     def validate_classification(self, context: str, classification: str, 
-                              confidence: float) -> Dict[str, Any]:
+                              confidence: float, deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Valida classificação usando Gemini.
         
@@ -44,6 +328,7 @@ class GeminiValidator:
             context: Contexto do sonho
             classification: Classificação atribuída
             confidence: Confiança da classificação
+            deadline: Prazo absoluto (time.time()) para a validação
             
         Returns:
             Dicionário com validação
@@ -55,39 +340,119 @@ class GeminiValidator:
                 'original_classification': classification,
                 'original_confidence': confidence
             }
-        
+
+        cached = self._cached_validation(context, classification, confidence)
+        if cached is not None:
+            return cached
+        return self._request_validation(context, classification, confidence, deadline)
+
+    def _request_validation(self, context: str, classification: str,
+                            confidence: float, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Valida um contexto com uma chamada à API (sem consultar o cache).
+
+        Args:
+            context: Contexto do sonho
+            classification: Classificação atribuída
+            confidence: Confiança da classificação
+            deadline: Prazo absoluto (time.time()) para a validação
+
+        Returns:
+            Dicionário com validação
+        """
         try:
             prompt = self._create_validation_prompt(context, classification)
-            response = self._call_gemini_api(prompt)
+            response = self._call_gemini_api(prompt, deadline=deadline)
             
             if response:
-                validation_result = self._parse_validation_response(response)
-                return {
-                    'validated': True,
-                    'original_classification': classification,
-                    'original_confidence': confidence,
-                    'gemini_classification': validation_result.get('classification', classification),
-                    'gemini_confidence': validation_result.get('confidence', confidence),
-                    'gemini_reasoning': validation_result.get('reasoning', ''),
-                    'agreement': validation_result.get('classification', classification) == classification,
-                    'confidence_difference': abs(validation_result.get('confidence', confidence) - confidence)
-                }
+                validation_result = self._extract_json_from_text(response.get('content', ''))
+                if validation_result is not None:
+                    # Só respostas JSON vão para o cache; as estimativas a partir de texto
+                    # livre ou de erros (_parse_validation_response) não são validações reais
+                    self._store_validation(context, classification, validation_result)
+                else:
+                    validation_result = self._parse_validation_response(response)
+                return self._build_validation(classification, confidence, validation_result)
             else:
-                return {
-                    'validated': False,
-                    'reason': 'Erro na resposta do Gemini',
-                    'original_classification': classification,
-                    'original_confidence': confidence
-                }
+                return self._unvalidated(classification, confidence, VALIDATION_SKIPPED,
+                                         'Erro na resposta do Gemini')
+
+        except ValidationUnavailable as e:
+            return self._unvalidated(classification, confidence, e.status, e.reason)
                 
         except Exception as e:
             logger.error(f"Erro na validação Gemini: {e}")
-            return {
-                'validated': False,
-                'reason': f'Erro: {str(e)}',
-                'original_classification': classification,
-                'original_confidence': confidence
-            }
+            return self._unvalidated(classification, confidence, VALIDATION_SKIPPED, f'Erro: {str(e)}')
+
+    def _unvalidated(self, classification: str, confidence: float,
+                     status: str, reason: str) -> Dict[str, Any]:
+        """Resultado de um contexto não validado (prazo, disjuntor ou falha da chamada)."""
+        return {
+            'validated': False,
+            'status': status,
+            'reason': reason,
+            'original_classification': classification,
+            'original_confidence': confidence
+        }
+
+    def _cached_validation(self, context: str, classification: str,
+                           confidence: float) -> Optional[Dict[str, Any]]:
+        """
+        Busca a validação de um contexto no cache persistente.
+
+        Args:
+            context: Contexto do sonho
+            classification: Classificação atribuída
+            confidence: Confiança da classificação
+
+        Returns:
+            Dicionário com validação (marcado com 'cached') ou None
+        """
+        if self.cache is None:
+            return None
+        key = make_validation_key(context, classification, self.model, PROMPT_VERSION)
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        validation = self._build_validation(classification, confidence, cached)
+        validation['cached'] = True
+        return validation
+
+    def _store_validation(self, context: str, classification: str,
+                          validation_result: Dict[str, Any]) -> None:
+        """Guarda no cache uma resposta com categoria reconhecida."""
+        if self.cache is None or validation_result.get('classification') not in VALID_CLASSIFICATIONS:
+            return
+        key = make_validation_key(context, classification, self.model, PROMPT_VERSION)
+        self.cache.put(key, {
+            'classification': validation_result.get('classification'),
+            'confidence': validation_result.get('confidence'),
+            'reasoning': validation_result.get('reasoning', '')
+        }, self.model, PROMPT_VERSION)
+
+    def _build_validation(self, classification: str, confidence: float,
+                          validation_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Monta o resultado de uma validação concluída.
+
+        Args:
+            classification: Classificação original
+            confidence: Confiança original
+            validation_result: Resposta analisada do Gemini
+
+        Returns:
+            Dicionário com validação
+        """
+        return {
+            'validated': True,
+            'original_classification': classification,
+            'original_confidence': confidence,
+            'gemini_classification': validation_result.get('classification', classification),
+            'gemini_confidence': validation_result.get('confidence', confidence),
+            'gemini_reasoning': validation_result.get('reasoning', ''),
+            'agreement': validation_result.get('classification', classification) == classification,
+            'confidence_difference': abs(validation_result.get('confidence', confidence) - confidence)
+        }
     
     def _create_validation_prompt(self, context: str, classification: str) -> str:
         """
@@ -107,12 +472,7 @@ CONTEXTO: "{context}"
 
 CLASSIFICAÇÃO ATUAL: {classification}
 
-As categorias possíveis são:
-1. "onírico" - sonhos, pesadelos, devaneios, estados de sono
-2. "profético" - visões, presságios, augúrios, revelações sobre o futuro
-3. "alegórico" - símbolos, metáforas, alegorias relacionadas a sonhos
-4. "divino" - revelações, aparições divinas, manifestações sobrenaturais
-5. "ilusório" - ilusões, quimeras, miragens, falsas aparências
+{CATEGORY_DEFINITIONS}
 
 Responda em formato JSON:
 {{
@@ -124,23 +484,64 @@ Responda em formato JSON:
 
 Considere o contexto literário português clássico e a obra de Camões.
 """
-    
-    def _call_gemini_api(self, prompt: str) -> Optional[Dict]:
+
+    def _create_batch_validation_prompt(self, items: List[Dict]) -> str:
+        """
+        Cria prompt para validar vários contextos de uma vez.
+
+        As definições das categorias aparecem uma única vez; cada contexto é
+        identificado por um índice que deve ser devolvido na resposta.
+
+        Args:
+            items: Contextos (texto e 'classification'), na ordem dos índices
+
+        Returns:
+            Prompt formatado
+        """
+        entries = "\n\n".join(
+            f"[{index}] CONTEXTO: {json.dumps(context_text(item), ensure_ascii=False)}\n"
+            f"[{index}] CLASSIFICAÇÃO ATUAL: {item.get('classification', 'onírico')}"
+            for index, item in enumerate(items)
+        )
+        return f"""
+Analise os seguintes {len(items)} contextos de "Os Lusíadas" de Camões e valide a classificação fornecida para cada um:
+
+{entries}
+
+{CATEGORY_DEFINITIONS}
+
+Responda apenas com um array JSON, com um objeto por contexto, na mesma ordem:
+[
+    {{
+        "index": 0,
+        "classification": "categoria_correta",
+        "confidence": 0.95,
+        "reasoning": "explicação_do_raciocínio",
+        "agreement": true/false
+    }}
+]
+
+Considere o contexto literário português clássico e a obra de Camões.
+"""
+
+    def _call_gemini_api(self, prompt: str, max_output_tokens: int = 1000,
+                         deadline: Optional[float] = None) -> Optional[Dict]:
         """
         Chama a API do Gemini.
         
         Args:
             prompt: Prompt para enviar
+            max_output_tokens: Limite de tokens da resposta
+            deadline: Prazo absoluto (time.time()) para a chamada
             
         Returns:
             Resposta da API ou None
+
+        Raises:
+            ValidationUnavailable: Prazo esgotado ou disjuntor aberto
         """
         try:
             url = f"{self.base_url}/models/{self.model}:generateContent"
-            headers = {
-                "Content-Type": "application/json",
-                "x-goog-api-key": self.api_key
-            }
             
             data = {
                 "contents": [{
@@ -150,13 +551,13 @@ Considere o contexto literário português clássico e a obra de Camões.
                 }],
                 "generationConfig": {
                     "temperature": 0.3,
-                    "maxOutputTokens": 1000,
+                    "maxOutputTokens": max_output_tokens,
                     "topP": 0.8,
                     "topK": 40
                 }
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = self._post_with_retry(url, data, deadline)
             response.raise_for_status()
             
             result = response.json()
@@ -166,11 +567,99 @@ Considere o contexto literário português clássico e a obra de Camões.
                 return {'content': content}
             
             return None
+
+        except ValidationUnavailable:
+            raise
             
         except Exception as e:
             logger.error(f"Erro na chamada da API Gemini: {e}")
             return None
     
+    def _post_with_retry(self, url: str, data: Dict, deadline: Optional[float] = None) -> requests.Response:
+        """
+        Envia a requisição respeitando o limite de taxa, com novas tentativas.
+
+        Respostas 429/5xx e erros de conexão/timeout são repetidos com backoff
+        exponencial (com jitter), respeitando o cabeçalho Retry-After. Cada
+        tentativa passa pelo disjuntor (só respostas 2xx contam como sucesso),
+        e o timeout HTTP e as esperas nunca ultrapassam o prazo.
+
+        Args:
+            url: Endpoint da API
+            data: Corpo JSON
+            deadline: Prazo absoluto (time.time()) para a chamada
+
+        Returns:
+            Resposta final (a última, se as tentativas se esgotarem)
+
+        Raises:
+            ValidationUnavailable: Prazo esgotado ou disjuntor aberto
+        """
+        attempt = 0
+        while True:
+            timeout = self._attempt_timeout(deadline)
+            if self.rate_limiter.acquire(deadline) is None:
+                raise ValidationUnavailable(VALIDATION_PENDING, 'Orçamento de tempo da validação esgotado')
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.time())
+            retry_after = None
+            try:
+                response = self.session.post(url, json=data, timeout=timeout)
+                if response.ok:
+                    self.breaker.record_success()
+                    return response
+                # Qualquer erro HTTP conta como falha (ex.: chave ou modelo inválido em 4xx)
+                self.breaker.record_failure()
+                if response.status_code not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                reason = f"HTTP {response.status_code}"
+            except requests.Timeout as e:
+                if timeout < self.timeout:
+                    # Timeout encurtado pelo prazo: o orçamento acabou, não o upstream
+                    raise ValidationUnavailable(VALIDATION_PENDING, 'Orçamento de tempo da validação esgotado')
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                reason = type(e).__name__
+            except requests.ConnectionError as e:
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                reason = type(e).__name__
+
+            delay = self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2)
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            if deadline is not None and time.time() + delay >= deadline:
+                raise ValidationUnavailable(VALIDATION_PENDING, 'Orçamento de tempo da validação esgotado')
+            attempt += 1
+            logger.warning(f"Gemini: {reason}; nova tentativa {attempt}/{self.max_retries} em {delay:.1f}s")
+            time.sleep(delay)
+
+    def _attempt_timeout(self, deadline: Optional[float]) -> float:
+        """
+        Verifica prazo e disjuntor antes de uma tentativa.
+
+        Args:
+            deadline: Prazo absoluto (time.time()) ou None
+
+        Returns:
+            Timeout HTTP da tentativa (limitado ao tempo restante)
+
+        Raises:
+            ValidationUnavailable: Prazo esgotado ou disjuntor aberto
+        """
+        remaining = None if deadline is None else deadline - time.time()
+        if remaining is not None and remaining <= 0:
+            raise ValidationUnavailable(VALIDATION_PENDING, 'Orçamento de tempo da validação esgotado')
+        if not self.breaker.allow():
+            raise ValidationUnavailable(VALIDATION_SKIPPED, 'Circuito aberto: Gemini com falhas recentes')
+        return self.timeout if remaining is None else min(self.timeout, remaining)
+
     def _parse_validation_response(self, response: Dict) -> Dict[str, Any]:
         """
         Analisa resposta do Gemini.
@@ -227,6 +716,60 @@ Considere o contexto literário português clássico e a obra de Camões.
             logger.error(f"Erro ao extrair JSON: {e}")
             return None
     
+    def _parse_batch_response(self, response: Dict, count: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Analisa a resposta de uma validação em lote.
+
+        Aceita o array JSON (inclusive dentro de blocos ```json), e, se o array
+        não for válido (ex.: resposta truncada), recupera os objetos completos
+        um a um. Itens sem índice válido ou com categoria desconhecida são
+        descartados e validados individualmente depois.
+
+        Args:
+            response: Resposta da API
+            count: Número de contextos enviados
+
+        Returns:
+            Mapa índice -> dados validados (apenas os itens reconhecidos)
+        """
+        content = response.get('content', '')
+        objects: List[Any] = []
+        start, end = content.find('['), content.rfind(']')
+        if start != -1 and end > start:
+            try:
+                parsed = json.loads(content[start:end + 1])
+                if isinstance(parsed, list):
+                    objects = parsed
+            except json.JSONDecodeError:
+                pass
+        if not objects:
+            for match in re.finditer(r'\{[^{}]*\}', content, re.DOTALL):
+                try:
+                    objects.append(json.loads(match.group(0)))
+                except json.JSONDecodeError:
+                    continue
+
+        results: Dict[int, Dict[str, Any]] = {}
+        for position, item in enumerate(objects):
+            if not isinstance(item, dict):
+                continue
+            index = item.get('index', position if len(objects) == count else None)
+            try:
+                index = int(index)
+                confidence = float(item.get('confidence'))
+            except (TypeError, ValueError):
+                continue
+            classification = str(item.get('classification', '')).strip().lower()
+            if not 0 <= index < count or index in results or classification not in VALID_CLASSIFICATIONS:
+                continue
+            results[index] = {
+                'classification': classification,
+                'confidence': max(0.0, min(1.0, confidence)),
+                'reasoning': str(item.get('reasoning', '')),
+                'agreement': item.get('agreement')
+            }
+        return results
+
     def _parse_text_response(self, text: str) -> Dict[str, Any]:
         """
         Analisa resposta em texto puro.
@@ -240,10 +783,9 @@ Considere o contexto literário português clássico e a obra de Camões.
         text_lower = text.lower()
         
         # Identifica classificação
-        classifications = ['onírico', 'profético', 'alegórico', 'divino', 'ilusório']
         found_classification = 'onírico'
         
-        for classification in classifications:
+        for classification in VALID_CLASSIFICATIONS:
             if classification in text_lower:
                 found_classification = classification
                 break
@@ -270,30 +812,197 @@ Considere o contexto literário português clássico e a obra de Camões.
             'agreement': True
         }
     
-    def validate_batch(self, contexts: List[Dict]) -> List[Dict]:
+    def validate_batch(self, contexts: List[Dict], deadline: Optional[float] = None) -> List[Dict]:
         """
         Valida lote de contextos.
+
+        Contextos já presentes no cache não são enviados, e trechos repetidos
+        no lote (mesmo texto e classificação) são enviados uma vez. Com
+        batch_size > 1, os demais são agrupados em prompts com vários itens
+        (limitados pelo orçamento de tokens); os grupos rodam no pool de
+        threads compartilhado (até max_concurrency chamadas no processo, somando
+        todas as requisições) e o resultado mantém a ordem de entrada.
+
+        Com prazo, o lote retorna no máximo no deadline: contextos ainda não
+        validados recebem status 'pending' (ou 'skipped' com o disjuntor aberto).
         
         Args:
             contexts: Lista de contextos para validar
+            deadline: Prazo absoluto (time.time()) para o lote
             
         Returns:
             Lista de contextos validados
         """
+        cached = [
+            self._cached_validation(context_text(context),
+                                    context.get('classification', 'onírico'),
+                                    context.get('confidence', 0.5))
+            for context in contexts
+        ] if self.available else [None] * len(contexts)
+        pending = [context for context, validation in zip(contexts, cached) if validation is None]
+        unique: Dict[tuple, Dict] = {}
+        for context in pending:
+            unique.setdefault(self._dedup_key(context), context)
+        requested = list(unique.values())
+
+        if self.available and self.batch_size > 1:
+            groups = self._plan_batches(requested)
+        else:
+            groups = [[context] for context in requested]
+
+        group_validations = []
+        if self.available and groups and self.breaker.state == CircuitBreaker.HALF_OPEN:
+            # Meio-aberto: o primeiro lote testa o upstream antes de liberar os demais
+            group_validations.append(self._validate_group(groups[0], deadline))
+            groups = groups[1:]
+
+        if not self.available or not groups:
+            group_validations.extend(self._validate_group(group, deadline) for group in groups)
+        else:
+            futures = [self.executor.submit(self._validate_group, group, deadline) for group in groups]
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                wait(futures, timeout=timeout)
+                group_validations.extend(
+                    future.result() if future.done() else self._pending_group(group)
+                    for group, future in zip(groups, futures)
+                )
+            finally:
+                # Lotes ainda na fila não são enviados; os em andamento já têm o timeout limitado pelo prazo
+                for future in futures:
+                    future.cancel()
+        by_key = dict(zip(unique.keys(), (validation for group in group_validations for validation in group)))
+
+        fresh = []
+        for context in pending:
+            key = self._dedup_key(context)
+            validation = by_key[key]
+            if unique[key] is not context:
+                validation = self._copy_validation(validation, context.get('confidence', 0.5))
+            fresh.append(validation)
+        fresh_validations = iter(fresh)
+        validations = [validation if validation is not None else next(fresh_validations) for validation in cached]
+
         validated_contexts = []
-        
-        for context in contexts:
-            validation = self.validate_classification(
-                context.get('context', ''),
-                context.get('classification', 'onírico'),
-                context.get('confidence', 0.5)
-            )
-            
+        for context, validation in zip(contexts, validations):
             # Adiciona validação ao contexto original
             context['gemini_validation'] = validation
             validated_contexts.append(context)
         
         return validated_contexts
+
+    @staticmethod
+    def _dedup_key(context: Dict) -> tuple:
+        """Identifica contextos equivalentes (texto normalizado e classificação)."""
+        return normalize_context(context_text(context)), context.get('classification', 'onírico')
+
+    def _copy_validation(self, validation: Dict[str, Any], confidence: float) -> Dict[str, Any]:
+        """Reaproveita a validação de um trecho repetido com a confiança de outro contexto."""
+        if not validation.get('validated'):
+            return dict(validation, original_confidence=confidence)
+        return self._build_validation(validation['original_classification'], confidence, {
+            'classification': validation['gemini_classification'],
+            'confidence': validation['gemini_confidence'],
+            'reasoning': validation['gemini_reasoning']
+        })
+
+    def _plan_batches(self, contexts: List[Dict]) -> List[List[Dict]]:
+        """
+        Agrupa contextos consecutivos em lotes que cabem no orçamento de tokens.
+
+        Cada lote tem no máximo batch_size contextos, e o prompt estimado
+        (cabeçalho + contextos) não passa de batch_token_budget, de modo que
+        trechos longos produzem lotes menores.
+
+        Args:
+            contexts: Contextos na ordem de entrada
+
+        Returns:
+            Lista de lotes (na ordem de entrada)
+        """
+        overhead = estimate_tokens(self._create_batch_validation_prompt([]))
+        batches: List[List[Dict]] = []
+        current: List[Dict] = []
+        tokens = overhead
+        for context in contexts:
+            cost = estimate_tokens(context_text(context)) + 20
+            if current and (len(current) >= self.batch_size or tokens + cost > self.batch_token_budget):
+                batches.append(current)
+                current, tokens = [], overhead
+            current.append(context)
+            tokens += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _pending_group(self, group: List[Dict]) -> List[Dict[str, Any]]:
+        """Validações 'pending' para um lote que não terminou dentro do prazo."""
+        return [self._unvalidated(context.get('classification', 'onírico'), context.get('confidence', 0.5),
+                                  VALIDATION_PENDING, 'Orçamento de tempo da validação esgotado')
+                for context in group]
+
+    def _validate_group(self, group: List[Dict], deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Valida um lote com um único prompt.
+
+        Itens ausentes ou inválidos na resposta são validados individualmente;
+        uma falha da chamada inteira marca o lote todo como não validado.
+
+        Args:
+            group: Contextos do lote
+            deadline: Prazo absoluto (time.time()) para o lote
+
+        Returns:
+            Validações na ordem do lote
+        """
+        if len(group) == 1:
+            return [self._validate_context(group[0], deadline)]
+
+        try:
+            prompt = self._create_batch_validation_prompt(group)
+            max_output_tokens = min(MAX_OUTPUT_TOKENS, OUTPUT_TOKENS_OVERHEAD + OUTPUT_TOKENS_PER_ITEM * len(group))
+            response = self._call_gemini_api(prompt, max_output_tokens=max_output_tokens, deadline=deadline)
+        except ValidationUnavailable as e:
+            return [self._unvalidated(context.get('classification', 'onírico'), context.get('confidence', 0.5),
+                                      e.status, e.reason)
+                    for context in group]
+        except Exception as e:
+            logger.error(f"Erro na validação Gemini em lote: {e}")
+            response = None
+
+        if not response:
+            return [self._unvalidated(context.get('classification', 'onírico'), context.get('confidence', 0.5),
+                                      VALIDATION_SKIPPED, 'Erro na resposta do Gemini')
+                    for context in group]
+
+        parsed = self._parse_batch_response(response, len(group))
+        missing = len(group) - len(parsed)
+        if missing:
+            logger.warning(f"Gemini: {missing}/{len(group)} item(ns) do lote sem resposta válida; validando individualmente.")
+
+        validations = []
+        for index, context in enumerate(group):
+            if index in parsed:
+                self._store_validation(context_text(context), context.get('classification', 'onírico'),
+                                       parsed[index])
+                validations.append(self._build_validation(
+                    context.get('classification', 'onírico'),
+                    context.get('confidence', 0.5),
+                    parsed[index]
+                ))
+            else:
+                validations.append(self._validate_context(context, deadline))
+        return validations
+
+    def _validate_context(self, context: Dict, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Valida um único contexto do lote (o cache já foi consultado)."""
+        validate = self._request_validation if self.available else self.validate_classification
+        return validate(
+            context_text(context),
+            context.get('classification', 'onírico'),
+            context.get('confidence', 0.5),
+            deadline
+        )
     
     def get_validation_summary(self, validated_contexts: List[Dict]) -> Dict[str, Any]:
         """
@@ -306,7 +1015,7 @@ Considere o contexto literário português clássico e a obra de Camões.
             Resumo da validação
         """
         if not validated_contexts:
-            return {'total': 0, 'validated': 0, 'agreement_rate': 0.0}
+            return {'total': 0, 'validated': 0, 'agreement_rate': 0.0, 'complete': True}
         
         total = len(validated_contexts)
         validated = sum(1 for ctx in validated_contexts 
@@ -315,15 +1024,39 @@ Considere o contexto literário português clássico e a obra de Camões.
                         if ctx.get('gemini_validation', {}).get('agreement', False))
         
         agreement_rate = agreements / validated if validated > 0 else 0.0
+
+        # Cobertura parcial: contextos sem validação por prazo, disjuntor ou falha da chamada
+        statuses = [ctx.get('gemini_validation', {}).get('status') for ctx in validated_contexts]
+        pending = statuses.count(VALIDATION_PENDING)
+        skipped = statuses.count(VALIDATION_SKIPPED)
         
         return {
             'total_contexts': total,
             'validated_contexts': validated,
+            'pending_contexts': pending,
+            'skipped_contexts': skipped,
+            'coverage': round(validated / total, 3),
+            'complete': validated == total,
+            'circuit_state': self.breaker.state,
             'agreement_rate': round(agreement_rate, 3),
             'validation_available': self.available
         }
 
+def _reset_after_fork() -> None:
+    for validator in list(GeminiValidator._instances):
+        validator._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def create_gemini_validator() -> GeminiValidator:
-    """Cria instância do validador Gemini."""
-    return GeminiValidator()
+    """Retorna o validador Gemini compartilhado pelo processo."""
+    return get_model_registry().get_shared('gemini_validator', GeminiValidator)
+
+
+def peek_gemini_validator() -> Optional[GeminiValidator]:
+    """Retorna o validador compartilhado se já existir (sem criar sessão nem cache)."""
+    return get_model_registry().peek_shared('gemini_validator')
 
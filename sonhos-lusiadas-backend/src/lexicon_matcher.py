@@ -0,0 +1,117 @@
+"""
+Módulo de Casamento de Léxico
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo implementa um casador multi-padrão para os léxicos de sono/sonho.
+Em vez de compilar uma regex por termo e varrer o texto inteiro para cada uma,
+os termos são compilados uma única vez em uma trie (autômato de prefixos) e o
+texto é percorrido em uma só passada.
+
+Semântica equivalente à regex legada rf'\\b{termo}\\w*\\b': o termo precisa
+começar no início de uma palavra (sequência \\w) e a ocorrência se estende até
+o fim dessa palavra. Como todas as ocorrências são ancoradas no início de
+palavra, a trie percorrida a partir de cada início de palavra dispensa os
+links de falha do Aho-Corasick e continua linear no tamanho do texto.
+"""
+
+import re
+import logging
+from typing import Dict, Iterator, List, Tuple
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r'\w+')
+_TERMINAL = '$'
+
+# (categoria, índice do termo na lista, termo, início, fim)
+LexiconHit = Tuple[str, int, str, int, int]
+
+
+class LexiconMatcher:
+    """Autômato de prefixos compilado a partir de um dicionário categoria -> termos."""
+
+    def __init__(self, terms_dict: Dict[str, List[str]]):
+        """
+        Compila o léxico.
+
+        Args:
+            terms_dict: Dicionário com termos (minúsculos) por categoria
+        """
+        self.terms_dict = {category: list(terms) for category, terms in terms_dict.items()}
+        self._root: Dict = {}
+        # Termos com caracteres fora de \w não cabem na trie; usam regex dedicada
+        self._fallback: List[Tuple[str, int, str, re.Pattern]] = []
+
+        for category, terms in self.terms_dict.items():
+            for index, term in enumerate(terms):
+                if not term:
+                    continue
+                if not _WORD_RE.fullmatch(term):
+                    pattern = re.compile(rf'\b{re.escape(term)}\w*\b', re.IGNORECASE)
+                    self._fallback.append((category, index, term, pattern))
+                    continue
+                node = self._root
+                for ch in term:
+                    node = node.setdefault(ch, {})
+                node.setdefault(_TERMINAL, []).append((category, index, term))
+
+    @staticmethod
+    def key_for(terms_dict: Dict[str, List[str]]) -> Tuple:
+        """Gera chave imutável para cache de matchers por léxico."""
+        return tuple((category, tuple(terms)) for category, terms in terms_dict.items())
+
+    def iter_matches(self, text_lower: str) -> Iterator[LexiconHit]:
+        """
+        Percorre o texto (já em minúsculas) uma única vez.
+
+        Args:
+            text_lower: Texto em minúsculas
+
+        Yields:
+            Tuplas (categoria, índice_termo, termo, início, fim) em ordem de posição
+        """
+        root = self._root
+        for word_match in _WORD_RE.finditer(text_lower):
+            word = word_match.group(0)
+            node = root
+            for ch in word:
+                node = node.get(ch)
+                if node is None:
+                    break
+                entries = node.get(_TERMINAL)
+                if entries:
+                    start, end = word_match.span()
+                    for category, index, term in entries:
+                        yield category, index, term, start, end
+
+        for category, index, term, pattern in self._fallback:
+            for match in pattern.finditer(text_lower):
+                yield category, index, term, match.start(), match.end()
+
+    def find_grouped(self, text_lower: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Agrupa as ocorrências na mesma ordem do backend regex legado.
+
+        O backend regex emite, por categoria, todas as ocorrências do primeiro
+        termo da lista, depois as do segundo, e assim por diante.
+
+        Args:
+            text_lower: Texto em minúsculas
+
+        Returns:
+            Dicionário categoria -> lista de (início, fim)
+        """
+        buckets: Dict[Tuple[str, int], List[Tuple[int, int]]] = {}
+        for category, index, _term, start, end in self.iter_matches(text_lower):
+            buckets.setdefault((category, index), []).append((start, end))
+
+        grouped: Dict[str, List[Tuple[int, int]]] = {}
+        for category, terms in self.terms_dict.items():
+            for index in range(len(terms)):
+                spans = buckets.get((category, index))
+                if spans:
+                    spans.sort()
+                    grouped.setdefault(category, []).extend(spans)
+        return grouped
@@ -54,6 +54,15 @@ try:
     app.register_blueprint(user_bp, url_prefix='/api/user')
     
     print("OK: Blueprints registrados com sucesso!")
+
+    # Pré-carrega modelos NLP em segundo plano (worker reporta 'warming' no /health)
+    if os.getenv('PRELOAD_MODELS', 'True').lower() == 'true':
+        try:
+            from model_registry import get_model_registry
+            get_model_registry().preload_in_background()
+            print("OK: Pré-carregamento de modelos NLP iniciado")
+        except ImportError as e:
+            print(f"AVISO: Pré-carregamento de modelos indisponível: {e}")
     
 except ImportError as e:
     print(f"ERRO: Erro ao importar blueprints: {e}")
@@ -0,0 +1,300 @@
+"""
+Módulo de Registro de Modelos
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo mantém uma única cópia, por processo, dos recursos NLP pesados:
+
+- Pipeline spaCy para português (pt_core_news_sm ou fallback básico)
+- Stemmer RSLP do NLTK
+- Stopwords do NLTK
+- Instâncias compartilhadas dos consumidores (analisador, validador)
+
+Os recursos são carregados uma vez (sob lock) e reutilizados por todas as
+requisições. O estado quente/frio é exposto para o endpoint /health.
+"""
+
+import os
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional, Set
+
+import nltk
+import spacy
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPACY_MODEL = "pt_core_news_sm"
+# Componentes que nenhuma etapa de análise usa (excluídos do pipeline podado)
+UNUSED_COMPONENTS = ('parser', 'ner')
+STAGE_PIPELINE_SUFFIX = 'stages'
+
+
+class ModelRegistry:
+    """Registro thread-safe de modelos NLP compartilhados pelo processo."""
+
+    def __init__(self, model_name: str = DEFAULT_SPACY_MODEL):
+        """
+        Inicializa o registro (sem carregar nada ainda).
+
+        Args:
+            model_name: Nome do modelo spaCy padrão
+        """
+        self.model_name = model_name
+        self._lock = threading.RLock()
+        self._nlp_models: Dict[str, Any] = {}
+        self._stemmer = None
+        self._stemmer_loaded = False
+        self._stopwords: Optional[Set[str]] = None
+        self._shared: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+        self._fallbacks: Set[str] = set()
+        self._preloading = False
+
+    def get_nlp(self, model_name: Optional[str] = None):
+        """
+        Retorna o pipeline spaCy, carregando-o na primeira chamada.
+
+        Args:
+            model_name: Nome do modelo spaCy (padrão do registro se omitido)
+
+        Returns:
+            Pipeline spaCy pronto para uso
+        """
+        name = model_name or self.model_name
+        nlp = self._nlp_models.get(name)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            nlp = self._nlp_models.get(name)
+            if nlp is None:
+                started = time.time()
+                try:
+                    nlp = spacy.load(name)
+                    logger.info(f"Modelo spaCy '{name}' carregado com sucesso.")
+                except OSError:
+                    logger.warning(f"Modelo spaCy '{name}' não encontrado. Usando modelo básico.")
+                    nlp = spacy.blank("pt")
+                    self._fallbacks.add(f"spacy:{name}")
+                # Garante segmentação de sentenças mesmo no modelo básico
+                if 'parser' not in nlp.pipe_names and 'senter' not in nlp.pipe_names \
+                        and 'sentencizer' not in nlp.pipe_names:
+                    nlp.add_pipe('sentencizer')
+                self._nlp_models[name] = nlp
+                self._load_times[f"spacy:{name}"] = round(time.time() - started, 3)
+        return nlp
+
+    def get_stage_nlp(self, model_name: Optional[str] = None):
+        """
+        Retorna o pipeline podado usado pelas etapas de análise.
+
+        Parser de dependências e NER não são usados por nenhuma etapa e ficam
+        de fora; a segmentação de sentenças passa a ser feita pelo sentencizer.
+
+        Args:
+            model_name: Nome do modelo spaCy (padrão do registro se omitido)
+
+        Returns:
+            Pipeline spaCy sem parser/ner e com sentencizer
+        """
+        name = model_name or self.model_name
+        key = f"{name}:{STAGE_PIPELINE_SUFFIX}"
+        nlp = self._nlp_models.get(key)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            nlp = self._nlp_models.get(key)
+            if nlp is None:
+                started = time.time()
+                try:
+                    nlp = spacy.load(name, exclude=list(UNUSED_COMPONENTS))
+                    logger.info(f"Pipeline podado de '{name}' carregado: {nlp.pipe_names}")
+                except OSError:
+                    logger.warning(f"Modelo spaCy '{name}' não encontrado. Usando modelo básico.")
+                    nlp = spacy.blank("pt")
+                    self._fallbacks.add(f"spacy:{key}")
+                if 'sentencizer' not in nlp.pipe_names:
+                    nlp.add_pipe('sentencizer')
+                self._nlp_models[key] = nlp
+                self._load_times[f"spacy:{key}"] = round(time.time() - started, 3)
+        return nlp
+
+    def resolved_model_name(self, model_name: Optional[str] = None) -> str:
+        """
+        Identifica o pipeline de análise realmente carregado.
+
+        Distingue o modelo pedido do fallback básico (spacy.blank), para que
+        resultados calculados com um não sejam reaproveitados com o outro.
+
+        Args:
+            model_name: Nome do modelo spaCy (padrão do registro se omitido)
+
+        Returns:
+            Ex.: 'pt_core_news_sm-3.7.0' ou 'blank:pt'
+        """
+        name = model_name or self.model_name
+        nlp = self.get_stage_nlp(name)
+        if f"spacy:{name}:{STAGE_PIPELINE_SUFFIX}" in self._fallbacks:
+            return f"blank:{nlp.lang}"
+        return f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}"
+
+    def get_stemmer(self):
+        """
+        Retorna o stemmer RSLP (ou None se indisponível).
+
+        Returns:
+            Instância de RSLPStemmer ou None
+        """
+        if self._stemmer_loaded:
+            return self._stemmer
+
+        with self._lock:
+            if not self._stemmer_loaded:
+                started = time.time()
+                try:
+                    from nltk.stem import RSLPStemmer
+                    self._stemmer = RSLPStemmer()
+                    logger.info("Stemmer RSLP configurado.")
+                except Exception:
+                    logger.warning("Stemmer RSLP não disponível.")
+                    self._stemmer = None
+                    self._fallbacks.add("stemmer")
+                self._stemmer_loaded = True
+                self._load_times["stemmer"] = round(time.time() - started, 3)
+        return self._stemmer
+
+    def get_stopwords(self) -> Set[str]:
+        """
+        Retorna o conjunto de stopwords em português.
+
+        Returns:
+            Conjunto de stopwords (compartilhado; não deve ser modificado)
+        """
+        if self._stopwords is not None:
+            return self._stopwords
+
+        with self._lock:
+            if self._stopwords is None:
+                started = time.time()
+                try:
+                    from nltk.corpus import stopwords
+                    words = set(stopwords.words('portuguese'))
+                    logger.info("Stopwords carregadas.")
+                except LookupError:
+                    nltk.download('stopwords')
+                    from nltk.corpus import stopwords
+                    words = set(stopwords.words('portuguese'))
+                    logger.info("Stopwords baixadas e carregadas.")
+                self._stopwords = words
+                self._load_times["stopwords"] = round(time.time() - started, 3)
+        return self._stopwords
+
+    def get_shared(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        Retorna uma instância compartilhada, criando-a uma única vez.
+
+        Args:
+            key: Identificador da instância (ex.: 'traditional_analyzer')
+            factory: Função que cria a instância na primeira chamada
+
+        Returns:
+            Instância compartilhada
+        """
+        instance = self._shared.get(key)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._shared.get(key)
+            if instance is None:
+                instance = factory()
+                self._shared[key] = instance
+        return instance
+
+    def peek_shared(self, key: str) -> Optional[Any]:
+        """Retorna a instância compartilhada se já existir, sem criá-la (ex.: health check)."""
+        return self._shared.get(key)
+
+    def preload(self) -> None:
+        """Carrega todos os modelos padrão imediatamente."""
+        with self._lock:
+            self._preloading = True
+        try:
+            self.get_nlp()
+            self.get_stage_nlp()
+            self.get_stemmer()
+            self.get_stopwords()
+            logger.info("Modelos NLP pré-carregados.")
+        except Exception as e:
+            logger.error(f"Erro no pré-carregamento de modelos: {e}")
+        finally:
+            with self._lock:
+                self._preloading = False
+
+    def preload_in_background(self) -> threading.Thread:
+        """
+        Dispara o pré-carregamento em uma thread daemon.
+
+        Returns:
+            Thread iniciada
+        """
+        thread = threading.Thread(target=self.preload, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def is_warm(self) -> bool:
+        """Indica se todos os modelos padrão já estão carregados."""
+        return (
+            self.model_name in self._nlp_models
+            and f"{self.model_name}:{STAGE_PIPELINE_SUFFIX}" in self._nlp_models
+            and self._stemmer_loaded
+            and self._stopwords is not None
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Retorna o estado atual do registro para monitoramento.
+
+        Returns:
+            Dicionário com estado quente/frio e detalhes de cada recurso
+        """
+        warm = self.is_warm()
+        if warm:
+            state = 'warm'
+        elif self._preloading:
+            state = 'warming'
+        else:
+            state = 'cold'
+
+        return {
+            'state': state,
+            'warm': warm,
+            'spacy_model': self.model_name,
+            'loaded': {
+                'spacy': sorted(self._nlp_models.keys()),
+                'stemmer': self._stemmer_loaded,
+                'stopwords': self._stopwords is not None,
+                'shared': sorted(self._shared.keys())
+            },
+            'fallbacks': sorted(self._fallbacks),
+            'load_seconds': dict(self._load_times),
+            'pid': os.getpid()
+        }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Retorna o registro de modelos do processo (criado sob demanda)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(os.getenv('SPACY_MODEL', DEFAULT_SPACY_MODEL))
+    return _registry
@@ -9,12 +9,13 @@ Este módulo é responsável por preparar o texto para análise, incluindo:
 - Remoção de stopwords
 """
 
-import spacy
 import re
 import os
 from typing import List, Dict, Optional
 import logging
 
+from model_registry import ModelRegistry, get_model_registry
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,39 +23,23 @@ logger = logging.getLogger(__name__)
 class TextPreprocessor:
     """Classe para pré-processamento de texto."""
     
-    def __init__(self, model_name: str = "pt_core_news_sm"):
+    def __init__(self, model_name: str = "pt_core_news_sm",
+                 registry: Optional[ModelRegistry] = None):
         """
         Inicializa o preprocessador.
         
         Args:
             model_name: Nome do modelo spaCy para português
+            registry: Registro de modelos compartilhado (padrão: registro do processo)
         """
-        try:
-            self.nlp = spacy.load(model_name)
-            logger.info(f"Modelo spaCy '{model_name}' carregado com sucesso.")
-        except OSError:
-            logger.error(f"Modelo spaCy '{model_name}' não encontrado. "
-                        "Execute: python -m spacy download pt_core_news_sm")
-            # Usa modelo básico como fallback
-            self.nlp = spacy.blank("pt")
-            logger.warning("Usando modelo básico spaCy sem recursos avançados.")
-        
-        # Garante que as stopwords do NLTK estão disponíveis
-        try:
-            import nltk
-            from nltk.corpus import stopwords
-            stopwords.words("portuguese")
-        except LookupError:
-            import nltk
-            nltk.download("stopwords")
-        
-        # Garante que o stemmer RSLP do NLTK está disponível
-        try:
-            from nltk.stem import RSLPStemmer
-            self.stemmer = RSLPStemmer()
-        except:
+        self.registry = registry or get_model_registry()
+        
+        # Modelos carregados uma única vez por processo
+        self.nlp = self.registry.get_nlp(model_name)
+        self.stopwords = self.registry.get_stopwords()
+        self.stemmer = self.registry.get_stemmer()
+        if self.stemmer is None:
             logger.warning("Stemmer RSLP não disponível. Usando lemmatização do spaCy.")
-            self.stemmer = None
     
     def clean_text(self, text: str) -> str:
         """
@@ -190,7 +175,7 @@ def process_lusiadas_text(text: str) -> Dict:
     Returns:
         Dicionário com dados processados
     """
-    preprocessor = TextPreprocessor()
+    preprocessor = get_model_registry().get_shared('text_preprocessor', TextPreprocessor)
     
     # Processa texto
     processed_text = preprocessor.preprocess(text)
@@ -0,0 +1,284 @@
+"""
+Módulo de Cache de Resultados
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo implementa um cache endereçado por conteúdo para as respostas
+das análises completas:
+
+- Chave SHA-256 de (texto limpo, modo, versão do léxico, versão do código)
+- Camada em memória (LRU) com despejo por tamanho total em bytes
+- Camada em disco (arquivos gzip) que sobrevive a reinícios do servidor
+- Contadores de acertos/faltas expostos para monitoramento
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_MB = 64
+DEFAULT_DISK_MB = 512
+DEFAULT_CACHE_DIR = os.path.join('cache', 'results')
+
+
+def make_cache_key(**parts: Any) -> str:
+    """
+    Calcula a chave de cache a partir das partes que determinam o resultado.
+
+    Args:
+        **parts: Valores serializáveis em JSON (texto, modo, versões...)
+
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def fingerprint(value: Any) -> str:
+    """Hash curto de uma estrutura serializável (ex.: léxico de termos)."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def source_fingerprint(paths: Iterable[str]) -> str:
+    """
+    Hash curto do código-fonte dos módulos de análise.
+
+    Qualquer alteração nos arquivos invalida automaticamente as entradas antigas.
+
+    Args:
+        paths: Caminhos dos arquivos-fonte
+
+    Returns:
+        Hash hexadecimal de 16 caracteres
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b'<ausente>')
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Cache de duas camadas (memória LRU + disco) para respostas serializadas."""
+
+    def __init__(self, memory_bytes: int = DEFAULT_MEMORY_MB * 1024 * 1024,
+                 disk_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 disk_bytes: int = DEFAULT_DISK_MB * 1024 * 1024):
+        """
+        Args:
+            memory_bytes: Tamanho máximo da camada em memória (bytes)
+            disk_dir: Diretório da camada em disco (None desativa o disco)
+            disk_bytes: Tamanho máximo da camada em disco (bytes, comprimidos)
+        """
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Tuple[Optional[bytes], str]:
+        """
+        Busca uma entrada, primeiro em memória e depois em disco.
+
+        Args:
+            key: Chave do cache
+
+        Returns:
+            Tupla (dados ou None, origem: 'memory', 'disk' ou 'miss')
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return data, 'memory'
+
+        data = self._read_disk(key)
+        if data is not None:
+            with self._lock:
+                self._stats['disk_hits'] += 1
+                self._put_memory(key, data)
+            return data, 'disk'
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None, 'miss'
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Armazena uma entrada nas duas camadas.
+
+        Args:
+            key: Chave do cache
+            data: Resposta serializada
+        """
+        with self._lock:
+            self._stats['stores'] += 1
+            self._put_memory(key, data)
+        self._write_disk(key, data)
+
+    def clear(self) -> None:
+        """Remove todas as entradas (memória e disco)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.json.gz'):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores e ocupação do cache.
+
+        Returns:
+            Dicionário com acertos, faltas, despejos e tamanhos
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_size
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        stats['memory_limit_bytes'] = self.memory_bytes
+        stats['disk_dir'] = self.disk_dir
+        stats['disk_limit_bytes'] = self.disk_bytes
+        return stats
+
+    def _put_memory(self, key: str, data: bytes) -> None:
+        """Insere na camada em memória e despeja as entradas mais antigas (com lock)."""
+        if len(data) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self._stats['memory_evictions'] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json.gz")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        """Lê uma entrada do disco (None se ausente ou corrompida)."""
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with gzip.open(path, 'rb') as f:
+                data = f.read()
+            # Atualiza o mtime: o despejo em disco remove os menos usados
+            os.utime(path, None)
+            return data
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:
+            logger.warning(f"Entrada de cache corrompida removida ({key[:12]}): {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        """Grava uma entrada no disco de forma atômica e aplica o limite de tamanho."""
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wb', compresslevel=5) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Falha ao gravar cache em disco: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Remove as entradas em disco menos usadas até caber no limite."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.json.gz'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+            total += info.st_size
+        if total <= self.disk_bytes:
+            return
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self._stats['disk_evictions'] += 1
+            except OSError:
+                pass
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Retorna o cache de resultados do processo (None se desativado).
+
+    Configuração via RESULT_CACHE_ENABLED, RESULT_CACHE_MEMORY_MB,
+    RESULT_CACHE_DIR (vazio desativa o disco) e RESULT_CACHE_DISK_MB.
+    """
+    global _result_cache
+    if os.getenv('RESULT_CACHE_ENABLED', 'True').lower() != 'true':
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(
+                    memory_bytes=int(float(os.getenv('RESULT_CACHE_MEMORY_MB', DEFAULT_MEMORY_MB)) * 1024 * 1024),
+                    disk_dir=os.getenv('RESULT_CACHE_DIR', DEFAULT_CACHE_DIR) or None,
+                    disk_bytes=int(float(os.getenv('RESULT_CACHE_DISK_MB', DEFAULT_DISK_MB)) * 1024 * 1024)
+                )
+                logger.info(f"Cache de resultados inicializado (disco: {_result_cache.disk_dir})")
+    return _result_cache
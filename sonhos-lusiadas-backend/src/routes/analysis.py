@@ -10,28 +10,38 @@ import logging
 import re
 import unicodedata
 from datetime import datetime
+from functools import lru_cache
 import io
 import base64
-from flask import Blueprint, request, jsonify, current_app
+import time
+import threading
+import multiprocessing
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app, stream_with_context, url_for
 from werkzeug.utils import secure_filename
 import json
 
-# Importar bibliotecas para processamento de arquivos
-try:
-    import docx2txt
-    DOCX2TXT_AVAILABLE = True
-    print("OK: docx2txt disponivel para processamento de arquivos .doc")
-except ImportError:
-    DOCX2TXT_AVAILABLE = False
-    print("AVISO: docx2txt nao disponivel - arquivos .doc podem nao funcionar")
-
 # Adiciona o diretório pai ao path para importar módulos
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+# Extração de texto de arquivos enviados (pool de processos com timeout por formato)
+from document_extraction import DOCX2TXT_AVAILABLE, ExtractionError, get_extraction_service
+from document_store import get_document_store
+if DOCX2TXT_AVAILABLE:
+    print("OK: docx2txt disponivel para processamento de arquivos .doc")
+else:
+    print("AVISO: docx2txt nao disponivel - arquivos .doc podem nao funcionar")
+
 # Importa módulos NLP tradicionais
 try:
     from traditional_nlp import TraditionalNLPAnalyzer, create_traditional_analyzer
-    from gemini_validator import GeminiValidator, create_gemini_validator
+    from gemini_validator import GeminiValidator, create_gemini_validator, peek_gemini_validator
+    from model_registry import get_model_registry
+    from cooccurrence import CooccurrenceMatrix
+    from result_cache import get_result_cache, make_cache_key, source_fingerprint
+    from analysis_jobs import JOB_DONE, JOB_FAILED, get_job_manager
+    from corpus_index import (DEFAULT_KWIC_WINDOW, DEFAULT_SEARCH_LIMIT, SEARCH_MODES, fold_term,
+                              get_corpus_index, get_corpus_index_store)
     TRADITIONAL_NLP_AVAILABLE = True
     print("OK: Módulos NLP tradicionais carregados")
 except ImportError as e:
@@ -49,6 +59,30 @@ analysis_bp = Blueprint('analysis', __name__)
 ALLOWED_EXTENSIONS = {'txt', 'doc', 'docx', 'pdf'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
 
+# Fan-out por canto em /complete-analysis
+CANTO_EXECUTOR = os.getenv('CANTO_EXECUTOR', 'process').lower()
+CANTO_WORKERS = int(os.getenv('CANTO_WORKERS', 0)) or (os.cpu_count() or 1)
+_canto_executor = None
+_canto_executor_lock = threading.Lock()
+
+# Etapas do spaCy usadas pela análise de cada canto
+CANTO_PARSE_STAGES = ('lemmas', 'sentences')
+
+# Progresso (%) de um canto ao concluir cada etapa da análise completa
+CANTO_STAGE_PROGRESS = {'parsed': 20, 'analyzed': 60, 'validated': 100}
+
+# Versão do código de análise (entra na chave do cache de resultados)
+_SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+ANALYSIS_SOURCES = [
+    __file__,
+    *(os.path.join(_SRC_DIR, name) for name in (
+        'traditional_nlp.py', 'analysis_document.py', 'cooccurrence.py', 'similarity.py',
+        'lexicon_matcher.py', 'text_index.py', 'gemini_validator.py', 'context_classifier.py',
+        'corpus_index.py'
+    ))
+]
+ANALYSIS_CODE_VERSION = source_fingerprint(ANALYSIS_SOURCES) if TRADITIONAL_NLP_AVAILABLE else None
+
 def allowed_file(filename):
     """Verifica se o arquivo tem extensão permitida."""
     return '.' in filename and \
@@ -165,16 +199,161 @@ def build_sonho_pattern() -> re.Pattern:
 
 @analysis_bp.route('/health', methods=['GET'])
 def health_check():
-    """Verifica se a API está funcionando."""
-    return jsonify({
-        'status': 'ok',
+    """Verifica se a API está funcionando e se os modelos NLP estão carregados.
+
+    Com ?require_warm=1 responde 503 enquanto o worker estiver frio, permitindo
+    que o balanceador de carga só encaminhe requisições a workers aquecidos.
+    """
+    models = get_model_registry().status() if TRADITIONAL_NLP_AVAILABLE else None
+    result_cache = get_result_cache() if TRADITIONAL_NLP_AVAILABLE else None
+    # Só relata o validador já existente: um probe não deve abrir sessão HTTP nem o SQLite
+    validator = peek_gemini_validator() if TRADITIONAL_NLP_AVAILABLE else None
+    validation_cache = validator.cache if validator is not None else None
+    warm = bool(models and models.get('warm'))
+    require_warm = request.args.get('require_warm', '').lower() in ('1', 'true', 'yes')
+
+    if warm or not require_warm:
+        status = 'ok'
+    else:
+        status = models.get('state', 'cold') if models else 'unavailable'
+
+    payload = {
+        'status': status,
         'message': 'API de análise funcionando!',
-        'version': '1.0.0'
-    })
+        'version': '1.0.0',
+        'warm': warm,
+        'models': models,
+        'result_cache': result_cache.stats() if result_cache is not None else None,
+        'validation_cache': validation_cache.stats() if validation_cache is not None else None,
+        'gemini_circuit': validator.breaker.stats() if validator is not None and validator.available else None,
+        'corpus_index': get_corpus_index_store().stats() if TRADITIONAL_NLP_AVAILABLE else None,
+        'jobs': get_job_manager().stats() if TRADITIONAL_NLP_AVAILABLE else None
+    }
+    if require_warm and not warm:
+        return jsonify(payload), 503
+    return jsonify(payload)
+
+@analysis_bp.route('/cache/stats', methods=['GET'])
+def result_cache_stats():
+    """Retorna os contadores do cache de resultados da análise completa."""
+    result_cache = get_result_cache() if TRADITIONAL_NLP_AVAILABLE else None
+    if result_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, 'code_version': ANALYSIS_CODE_VERSION, **result_cache.stats()})
+
+def upload_response(document_id, filename, filepath, content, include_content, deduplicated):
+    """Monta a resposta de /upload (o texto completo só vai se include_content)."""
+    response = {
+        'message': 'Arquivo processado com sucesso',
+        'document_id': document_id,
+        'deduplicated': deduplicated,
+        'filename': filename,
+        'filepath': filepath,
+        'content_length': len(content),
+        'content_preview': content[:500]
+    }
+    if include_content:
+        response['content'] = content
+    return response
+
+def resolve_request_text(data: dict):
+    """Obtém o texto de uma requisição: campo 'text' ou 'document_id' do armazenamento.
+
+    Returns:
+        Tupla (texto, resposta de erro ou None)
+    """
+    document_id = data.get('document_id')
+    if document_id:
+        store = get_document_store(current_app.config['UPLOAD_FOLDER'])
+        text = store.get_content(document_id)
+        if text is None:
+            return '', (jsonify({'error': 'Documento não encontrado', 'document_id': document_id}), 404)
+        print(f"DEBUG: Texto obtido do documento {document_id[:12]} ({len(text)} caracteres)")
+        return text, None
+    return data.get('text', ''), None
+
+@analysis_bp.route('/documents', methods=['POST'])
+def create_document():
+    """Registra um texto colado como documento e retorna seu id."""
+    try:
+        data = request.get_json() or {}
+        text = data.get('text', '')
+        if not text:
+            return jsonify({'error': 'Texto é obrigatório'}), 400
+
+        store = get_document_store(current_app.config['UPLOAD_FOLDER'])
+        document_id, is_new = store.save_text(text, secure_filename(data.get('filename') or 'texto.txt'))
+        return jsonify({
+            'document_id': document_id,
+            'deduplicated': not is_new,
+            'content_length': len(text)
+        }), 201 if is_new else 200
+
+    except Exception as e:
+        logger.error(f"Erro ao registrar documento: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@analysis_bp.route('/documents/<document_id>', methods=['GET'])
+def get_document(document_id):
+    """Retorna os metadados de um documento (e o texto com ?include_content=1)."""
+    store = get_document_store(current_app.config['UPLOAD_FOLDER'])
+    metadata = store.get_metadata(document_id)
+    if metadata is None:
+        return jsonify({'error': 'Documento não encontrado'}), 404
+    if request.args.get('include_content', '').lower() in ('1', 'true', 'yes'):
+        metadata['content'] = store.get_content(document_id)
+    return jsonify(metadata)
+
+@analysis_bp.route('/search', methods=['GET', 'POST'])
+def search_corpus():
+    """Busca no índice posicional do documento (termo, prefixo ou lema) com trechos KWIC.
+
+    Parâmetros (query string ou JSON): q, mode (term | prefix | lemma), fold
+    (ignora acentos), window, limit, offset e 'document_id' ou 'text'.
+    """
+    try:
+        data = (request.get_json(silent=True) if request.method == 'POST' else None) or request.args.to_dict()
+        query = str(data.get('q') or data.get('query') or '').strip()
+        if not query:
+            return jsonify({'error': 'Parâmetro q é obrigatório'}), 400
+        mode = str(data.get('mode') or 'term').lower()
+        if mode not in SEARCH_MODES:
+            return jsonify({'error': f"Modo inválido: {mode}", 'modes': list(SEARCH_MODES)}), 400
+
+        text, error = resolve_request_text(data)
+        if error:
+            return error
+        if not text:
+            return jsonify({'error': 'Texto ou document_id é obrigatório'}), 400
+
+        try:
+            window = min(500, max(0, int(data.get('window', DEFAULT_KWIC_WINDOW))))
+            limit = min(1000, max(0, int(data.get('limit', DEFAULT_SEARCH_LIMIT))))
+            offset = max(0, int(data.get('offset', 0)))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'window, limit e offset devem ser inteiros'}), 400
+        fold = str(data.get('fold', '')).lower() in ('1', 'true', 'yes')
+
+        store = get_corpus_index_store()
+        index = store.get(text)
+        result = index.search(query, mode=mode, fold=fold, window=window, limit=limit, offset=offset)
+        # Lemas calculados nesta busca passam a valer também para o índice em disco
+        store.flush(index)
+
+        result['document_id'] = data.get('document_id')
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Erro na busca no índice: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @analysis_bp.route('/upload', methods=['POST'])
 def upload_file():
-    """Upload de arquivo para análise."""
+    """Upload de arquivo para análise.
+
+    Retorna o document_id usado pelas análises e exportações; o texto completo
+    só é incluído na resposta com ?include_content=1.
+    """
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'Nenhum arquivo enviado'}), 400
@@ -185,83 +364,33 @@ def upload_file():
         
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            include_content = request.args.get('include_content', '').lower() in ('1', 'true', 'yes')
+
+            # Armazenamento endereçado por conteúdo: o mesmo arquivo é guardado e extraído uma vez
+            store = get_document_store(current_app.config['UPLOAD_FOLDER'])
+            document_id, filepath, is_new = store.save_original(file.read(), filename)
+            content = store.get_content(document_id)
+            if content is not None:
+                print(f"DEBUG: Documento {document_id[:12]} já armazenado; reutilizando texto extraído")
+                return jsonify(upload_response(document_id, filename, filepath, content,
+                                               include_content, deduplicated=True))
+
+            # Extrai o texto no pool de extração (timeout por formato); uploads
+            # simultâneos do mesmo arquivo compartilham a mesma extração
+            try:
+                content = get_extraction_service().extract(filepath, fingerprint=document_id)
+                print(f"DEBUG: Conteúdo {filename.rsplit('.', 1)[1].upper()} extraído: {content[:200]}...")
+            except ExtractionError as e:
+                print(f"Erro ao extrair texto de {filename}: {e}")
+                # Sem texto o documento não pode ser analisado: não mantém o original órfão
+                store.delete(document_id)
+                return jsonify({'error': str(e), 'filename': filename}), 422
             
-            # Processar arquivos Word
-            content = ""
-            if filename.endswith('.docx'):
-                try:
-                    import zipfile
-                    import xml.etree.ElementTree as ET
-                    
-                    # DOCX é um arquivo ZIP
-                    with zipfile.ZipFile(filepath, 'r') as docx:
-                        # Ler o documento principal
-                        document = docx.read('word/document.xml')
-                        root = ET.fromstring(document)
-                        
-                        # Extrair texto de todos os parágrafos
-                        for paragraph in root.iter():
-                            if paragraph.text:
-                                content += paragraph.text + " "
-                            if paragraph.tail:
-                                content += paragraph.tail + " "
-                                
-                    content = content.strip()
-                    print(f"DEBUG: Conteúdo DOCX extraído: {content[:200]}...")
-                    
-                except Exception as e:
-                    print(f"Erro ao processar DOCX: {e}")
-                    content = "Erro ao processar arquivo DOCX"
-                    
-            elif filename.endswith('.doc'):
-                if DOCX2TXT_AVAILABLE:
-                    try:
-                        print("DEBUG: Processando arquivo .doc com docx2txt...")
-                        content = docx2txt.process(filepath)
-                        content = content.strip()
-                        print(f"DEBUG: Conteúdo DOC extraído: {content[:200]}...")
-                        
-                    except Exception as e:
-                        print(f"Erro ao processar DOC com docx2txt: {e}")
-                        content = f"Erro ao processar arquivo DOC: {str(e)}"
-                else:
-                    print("docx2txt não disponível, tentando método alternativo...")
-                    try:
-                        # Método alternativo para .doc
-                        import subprocess
-                        
-                        # Tentar usar antiword se disponível
-                        result = subprocess.run(['antiword', filepath], 
-                                             capture_output=True, text=True, timeout=30)
-                        if result.returncode == 0:
-                            content = result.stdout.strip()
-                            print(f"DEBUG: Conteúdo DOC extraído com antiword: {content[:200]}...")
-                        else:
-                            content = "Erro: antiword não disponível para processar arquivo .doc"
-                            
-                    except Exception as e:
-                        print(f"Erro ao processar DOC: {e}")
-                        content = "Erro ao processar arquivo DOC - formato não suportado"
-                    
-            elif filename.endswith('.txt'):
-                # Para arquivos .txt, ler diretamente
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    print(f"DEBUG: Conteúdo TXT lido: {content[:200]}...")
-                except Exception as e:
-                    print(f"Erro ao ler TXT: {e}")
-                    content = f"Erro ao ler arquivo TXT: {str(e)}"
+            # Guarda o texto extraído para análises/exportações por document_id
+            store.save_content(document_id, content)
             
-            return jsonify({
-                'message': 'Arquivo processado com sucesso',
-                'filename': filename,
-                'filepath': filepath,
-                'content': content,
-                'content_length': len(content)
-            })
+            return jsonify(upload_response(document_id, filename, filepath, content, include_content,
+                                           deduplicated=False))
         else:
             return jsonify({'error': 'Tipo de arquivo não permitido'}), 400
             
@@ -309,7 +438,9 @@ def expand_semantic():
         sleep_terms = analyzer.sleep_terms
         
         # Expande termos usando análise de coocorrência se texto fornecido
-        text = data.get('text', '')
+        text, error = resolve_request_text(data)
+        if error:
+            return error
         if text:
             cooccurrence = analyzer.analyze_cooccurrence(text)
             # Adiciona termos co-ocorrentes mais frequentes
@@ -346,7 +477,9 @@ def analyze_contexts():
     """Análise de contextos usando técnicas NLP tradicionais focadas no sono."""
     try:
         data = request.get_json()
-        text = data.get('text', '')
+        text, error = resolve_request_text(data)
+        if error:
+            return error
         words = data.get('words', [])
         
         if not text:
@@ -364,10 +497,10 @@ def analyze_contexts():
         # Extrai contextos relacionados ao sono
         sleep_contexts = dream_patterns.get('classified_contexts', [])
         
-        # Valida com Gemini se disponível
+        # Valida com Gemini se disponível (dentro do orçamento de tempo da requisição)
         validator = create_gemini_validator()
         if validator.available:
-            sleep_contexts = validator.validate_batch(sleep_contexts)
+            sleep_contexts = validator.validate_batch(sleep_contexts, deadline=validation_deadline(validator))
         
         return jsonify({
             'message': 'Análise de contextos realizada com técnicas NLP tradicionais',
@@ -444,6 +577,17 @@ def export_detailed_report():
         export_format = data.get('format', 'csv')  # 'csv' ou 'pdf'
         analysis_data = data.get('analysis_data', {})
         
+        # Sem analysis_data, a análise do documento armazenado é obtida do cache
+        # (ou recalculada), evitando reenviar o resultado completo pelo cliente
+        if not analysis_data and data.get('document_id') and TRADITIONAL_NLP_AVAILABLE:
+            text, error = resolve_request_text(data)
+            if error:
+                return error
+            mode = (data.get('mode', 'traditional') or 'traditional').lower()
+            body, source = run_complete_analysis_cached(remove_gutenberg_boilerplate(text), mode)
+            analysis_data = json.loads(body).get('results', {})
+            print(f"DEBUG: Exportando análise do documento {data['document_id'][:12]} (cache: {source})")
+        
         if not analysis_data:
             return jsonify({'error': 'Dados de análise não fornecidos'}), 400
         
@@ -866,33 +1010,140 @@ def get_terms(mode: str):
         return EXPANDED_TERMS_STRICT
     return EXPANDED_TERMS_FULL
 
+class TermMatcher:
+    """Casador pré-compilado de um dicionário de termos sobre texto normalizado.
+
+    Substitui um build_term_pattern(term) por termo/sentença: os termos são
+    normalizados uma única vez e o texto é percorrido em uma só passada,
+    palavra a palavra, com busca em dicionário. A semântica é a mesma de
+    build_term_pattern() e de build_sonho_pattern().
+    """
+
+    _WORD_RE = re.compile(r"\w+")
+    _SONHO_RE = re.compile(r"sonh[a-z]*", re.IGNORECASE)
+
+    def __init__(self, terms_to_use: dict):
+        self.terms_to_use = terms_to_use
+        # palavra normalizada -> [(termo original, categoria)]
+        self._lookup: dict = {}
+        # termos compostos (com espaços/hífens) ficam em regex própria, compilada uma vez
+        self._compound: list = []
+        seen = set()
+        for category, terms in terms_to_use.items():
+            for term in terms:
+                if (term, category) in seen:
+                    continue
+                seen.add((term, category))
+                term_norm = normalize_text(term)
+                if self._WORD_RE.fullmatch(term_norm):
+                    self._lookup.setdefault(term_norm, []).append((term, category))
+                elif term_norm:
+                    self._compound.append((term, category, build_term_pattern(term)))
+
+    @property
+    def has_compound_terms(self) -> bool:
+        """Se há termos compostos (fora do alcance de uma busca por palavra)."""
+        return bool(self._compound)
+
+    def scan(self, text_norm: str):
+        """Percorre o texto normalizado uma única vez.
+
+        Retorna (term_hits, sonho_hits), ambos listas de (termo, categoria, span):
+        term_hits usa o termo original do dicionário; sonho_hits traz a variação
+        de 'sonho*' encontrada, na categoria 'onírico'.
+        """
+        term_hits = []
+        sonho_hits = []
+        lookup = self._lookup
+        sonho_fullmatch = self._SONHO_RE.fullmatch
+        for m in self._WORD_RE.finditer(text_norm):
+            word = m.group(0)
+            entries = lookup.get(word)
+            if entries:
+                span = m.span()
+                for term, category in entries:
+                    term_hits.append((term, category, span))
+            if word[:4] == 'sonh' and sonho_fullmatch(word):
+                sonho_hits.append((word, 'onírico', m.span()))
+        for term, category, pattern in self._compound:
+            for m in pattern.finditer(text_norm):
+                term_hits.append((term, category, m.span()))
+        return term_hits, sonho_hits
+
+TERM_MATCHER_FULL = TermMatcher(EXPANDED_TERMS_FULL)
+TERM_MATCHER_STRICT = TermMatcher(EXPANDED_TERMS_STRICT)
+@lru_cache(maxsize=32)
+def _compile_term_matcher(key: tuple) -> TermMatcher:
+    """Compila o TermMatcher de um dicionário avulso (poucos mantidos, os mais recentes)."""
+    return TermMatcher({category: list(terms) for category, terms in key})
+
+def get_term_matcher(terms_to_use: dict) -> TermMatcher:
+    """Retorna o TermMatcher pré-compilado do modo (ou de um dicionário avulso)."""
+    if terms_to_use is EXPANDED_TERMS_FULL:
+        return TERM_MATCHER_FULL
+    if terms_to_use is EXPANDED_TERMS_STRICT:
+        return TERM_MATCHER_STRICT
+    return _compile_term_matcher(tuple((category, tuple(terms)) for category, terms in terms_to_use.items()))
+
+def count_terms_with_index(text: str, terms_to_use: dict):
+    """Contagens de count_expanded_terms lidas do índice posicional do documento.
+
+    Retorna (term_counts, sonho_variations): contagem por (categoria, termo) e
+    variações de 'sonho*' (sem acentos) na ordem da primeira ocorrência.
+    """
+    index = get_corpus_index(text)
+    term_counts = {
+        (category, term): index.folded_counts(term)
+        for category, terms in terms_to_use.items() for term in terms
+    }
+
+    first_seen = []
+    for form_id in index.form_ids('sonh', 'prefix', fold=True):
+        variation = fold_term(index.forms[form_id])
+        if TermMatcher._SONHO_RE.fullmatch(variation):
+            ordinals = index.occurrences([form_id])
+            first_seen.append((int(ordinals[0]), variation, len(ordinals)))
+    sonho_variations: dict = {}
+    for _first, variation, count in sorted(first_seen):
+        sonho_variations[variation] = sonho_variations.get(variation, 0) + count
+    return term_counts, sonho_variations
+
 def count_expanded_terms(text: str, terms_to_use: dict) -> dict:
-    """Conta termos expandidos no texto dado um conjunto de termos."""
+    """Conta termos expandidos no texto dado um conjunto de termos.
+
+    Termos de uma palavra são contados no índice posicional do documento
+    (construído uma vez por texto); termos compostos e textos fora da forma
+    NFC usam a varredura do TermMatcher.
+    """
     results: dict = {}
-    text_norm = normalize_text(text)
-    sonho_pattern = build_sonho_pattern()
+    matcher = get_term_matcher(terms_to_use)
+    if TRADITIONAL_NLP_AVAILABLE and not matcher.has_compound_terms and unicodedata.is_normalized('NFC', text):
+        term_counts, sonho_variations = count_terms_with_index(text, terms_to_use)
+    else:
+        term_hits, sonho_hits = matcher.scan(normalize_text(text))
+
+        term_counts = {}
+        for term, category, _span in term_hits:
+            term_counts[(category, term)] = term_counts.get((category, term), 0) + 1
+
+        # Agrupa variações de sonho
+        sonho_variations = {}
+        for variation, _cat, _span in sonho_hits:
+            sonho_variations[variation] = sonho_variations.get(variation, 0) + 1
 
     for category, terms in terms_to_use.items():
         results[category] = {}
         total_count = 0
         
         # Busca específica por "sonho*" para categoria onírica
-        if category == 'onírico':
-            sonho_matches = sonho_pattern.findall(text_norm)
-            if sonho_matches:
-                # Agrupa variações de sonho
-                sonho_variations = {}
-                for match in sonho_matches:
-                    sonho_variations[match] = sonho_variations.get(match, 0) + 1
-                
-                for variation, count in sonho_variations.items():
-                    results[category][variation] = count
-                    total_count += count
+        if category == 'onírico' and sonho_variations:
+            for variation, count in sonho_variations.items():
+                results[category][variation] = count
+                total_count += count
         
         # Busca pelos outros termos
         for term in terms:
-            pat = build_term_pattern(term)
-            count = len(pat.findall(text_norm))
+            count = term_counts.get((category, term), 0)
             if count > 0:
                 results[category][term] = count
                 total_count += count
@@ -911,7 +1162,7 @@ def analyze_dream_contexts(text: str, terms_to_use: dict) -> list:
 
     current_stanza = None
     buffer_sentence = ''
-    sonho_pattern = build_sonho_pattern()
+    matcher = get_term_matcher(terms_to_use)
 
     def flush_buffer(idx: int, stanza_num):
         nonlocal buffer_sentence
@@ -920,9 +1171,10 @@ def analyze_dream_contexts(text: str, terms_to_use: dict) -> list:
             return None
         s_norm = normalize_text(s)
         dream_terms = []
+        term_hits, sonho_hits = matcher.scan(s_norm)
         
         # Busca específica por "sonho*" primeiro
-        sonho_matches = sonho_pattern.findall(s_norm)
+        sonho_matches = [variation for variation, _cat, _span in sonho_hits]
         if sonho_matches:
             print(f"DEBUG: Encontrado 'sonho*' na estrofe {stanza_num}: {sonho_matches} - '{s[:50]}...'")
             for match in sonho_matches:
@@ -930,9 +1182,10 @@ def analyze_dream_contexts(text: str, terms_to_use: dict) -> list:
                 dream_terms.append({'term': match, 'category': 'onírico', 'excerpt': excerpt})
         
         # Busca pelos outros termos
+        found = {(category, term) for term, category, _span in term_hits}
         for category, terms in terms_to_use.items():
             for term in terms:
-                if build_term_pattern(term).search(s_norm):
+                if (category, term) in found:
                     excerpt = s if len(s) <= 220 else (s[:220] + '...')
                     dream_terms.append({'term': term, 'category': category, 'excerpt': excerpt})
         
@@ -1083,12 +1336,521 @@ def calculate_analysis_metrics(text: str, aggregated: dict) -> dict:
         'confidence_score': confidence
     }
 
+def validation_deadline(validator):
+    """Prazo absoluto (time.time()) da validação Gemini de uma requisição.
+
+    Returns:
+        Prazo ou None (Gemini indisponível ou orçamento desativado)
+    """
+    if not validator.available or validator.validation_budget <= 0:
+        return None
+    return time.time() + validator.validation_budget
+
+def analyze_canto(canto_title: str, canto_text: str, mode: str, canto_document=None) -> dict:
+    """Analisa um único canto (padrões, normalização e estatísticas).
+
+    Executada nos workers do fan-out por canto; não depende de estado da requisição.
+    A validação Gemini fica no processo principal (validate_canto_contexts), para
+    que o limite de taxa e a concorrência configurados valham para o servidor todo.
+
+    Args:
+        canto_title: Título do canto (ex.: 'CANTO I')
+        canto_text: Texto do canto
+        mode: 'traditional' ou 'estrito'
+        canto_document: AnalysisDocument já processado (opcional)
+
+    Returns:
+        Dicionário com o resultado do canto, a matriz de coocorrência e o
+        conjunto de palavras únicas normalizadas
+    """
+    analyzer = create_traditional_analyzer()
+    if canto_document is None:
+        canto_document = canto_text
+
+    # Analisa padrões de sonhos usando NLP tradicional
+    # Aplica modo específico (completo ou estrito)
+    if mode == 'estrito':
+        # Modo estrito: apenas termos muito específicos de sonhos
+        dream_patterns = analyzer.analyze_dream_patterns_strict(canto_document)
+    else:
+        # Modo completo: todos os termos relacionados
+        dream_patterns = analyzer.analyze_dream_patterns(canto_document)
+    
+    # Extrai contextos relacionados ao sono
+    sleep_contexts = dream_patterns.get('classified_contexts', [])
+
+    # Normaliza campos esperados pelo frontend/exportadores
+    normalized_contexts = []
+    for ctx in sleep_contexts:
+        if not isinstance(ctx, dict):
+            continue
+        context_type = ctx.get('context_type') or ctx.get('classification') or 'onírico'
+        # Confiança pode vir como 0-1 (float) ou 0-100 (percentual)
+        confidence = ctx.get('confidence_score')
+        if confidence is None:
+            confidence = ctx.get('confidence')
+        if isinstance(confidence, (int, float)) and confidence > 1:
+            confidence = round(float(confidence) / 100.0, 2)
+        if not isinstance(confidence, (int, float)):
+            confidence = 0.0
+
+        sentence = ctx.get('sentence') or ctx.get('text') or ctx.get('excerpt') or ''
+        stanza = ctx.get('stanza') if isinstance(ctx.get('stanza'), int) else ctx.get('stanza')
+
+        normalized = dict(ctx)
+        normalized['context_type'] = context_type
+        normalized['confidence_score'] = round(float(confidence), 2)
+        normalized['sentence'] = sentence
+        normalized['stanza'] = stanza
+        normalized_contexts.append(normalized)
+    
+    # Conta termos por categoria
+    canto_classification = {'onírico': 0, 'profético': 0, 'alegórico': 0, 'divino': 0, 'ilusório': 0}
+    for ctx in normalized_contexts:
+        classification = ctx.get('context_type') or ctx.get('classification', 'onírico')
+        if classification in canto_classification:
+            canto_classification[classification] += 1
+    
+    # Estrofes com ocorrência
+    stanzas_with_hits = sorted({ctx.get('stanza') for ctx in normalized_contexts if ctx.get('stanza') is not None})
+    
+    # Pré-processamento
+    unique_words = set(normalize_text(canto_text).split())
+    canto_pre = {
+        'original_length': len(canto_text),
+        'processed_length': len(normalize_text(canto_text)),
+        'sentences': len(re.split(r"(?<=[\.!?])\s+|\n+", canto_text)),
+        'words': len(canto_text.split()),
+        'unique_words': len(unique_words)
+    }
+
+    # Conta termos encontrados
+    sleep_terms_found = dream_patterns.get('sleep_terms', {})
+    total_terms_found = sum(len(terms) for terms in sleep_terms_found.values())
+
+    canto_result = {
+        'preprocessing': canto_pre,
+        'sleep_terms': sleep_terms_found,
+        'dream_contexts': normalized_contexts,
+        'context_classification': canto_classification,
+        'stanzas': stanzas_with_hits,
+        'cooccurrence': dream_patterns.get('cooccurrence', {}),
+        'similarity': dream_patterns.get('similarity', {}),
+        'semantic_expansion': {
+            'total_categories': len(analyzer.categories),
+            'total_terms_searched': sum(len(terms) for terms in analyzer.sleep_terms.values()),
+            'terms_found': total_terms_found,
+            'coverage_percentage': (total_terms_found / canto_pre['words']) * 100 if canto_pre['words'] > 0 else 0
+        }
+    }
+
+    return {
+        'result': canto_result,
+        'cooccurrence_matrix': dream_patterns.get('cooccurrence_matrix'),
+        'unique_words': unique_words
+    }
+
+
+def validate_canto_contexts(validator, contexts: list, deadline=None) -> list:
+    """Valida com o Gemini os contextos normalizados de um canto (no processo principal).
+
+    Args:
+        validator: GeminiValidator compartilhado pelo processo
+        contexts: Contextos normalizados por analyze_canto
+        deadline: Prazo absoluto (time.time()) da validação
+
+    Returns:
+        Contextos com 'gemini_validation' (os originais se o Gemini estiver indisponível)
+    """
+    if not validator.available:
+        return contexts
+    validated = validator.validate_batch(contexts, deadline=deadline)
+    # Preserva campos normalizados e aplica atualizações do validador
+    if not isinstance(validated, list) or len(validated) != len(contexts):
+        # fallback: mantém os normalizados originais
+        return contexts
+    merged = []
+    for i, vctx in enumerate(validated):
+        base_ctx = dict(contexts[i])
+        if isinstance(vctx, dict):
+            base_ctx.update(vctx)
+            # Reforça campos essenciais após merge
+            base_ctx['context_type'] = base_ctx.get('context_type') or base_ctx.get('classification') or 'onírico'
+            conf = base_ctx.get('confidence_score')
+            if conf is None:
+                conf = base_ctx.get('confidence')
+            if isinstance(conf, (int, float)) and conf > 1:
+                conf = round(float(conf) / 100.0, 2)
+            base_ctx['confidence_score'] = round(float(conf or 0.0), 2)
+            base_ctx['sentence'] = base_ctx.get('sentence') or base_ctx.get('text') or base_ctx.get('excerpt') or ''
+        merged.append(base_ctx)
+    return merged
+
+def warm_canto_worker():
+    """Inicializador dos workers de processo: carrega os modelos antes do primeiro canto."""
+    create_traditional_analyzer()
+
+def parse_canto_document(canto_text: str):
+    """Processa um canto com spaCy (executada nos workers de processo)."""
+    analyzer = create_traditional_analyzer()
+    return analyzer.parse_documents([canto_text], stages=CANTO_PARSE_STAGES, n_process=1)[0]
+
+def get_canto_executor():
+    """Retorna o pool de workers do fan-out por canto (criado sob demanda).
+
+    CANTO_EXECUTOR: 'process' (padrão), 'thread' ou 'serial'.
+    CANTO_WORKERS: número de workers (padrão: núcleos disponíveis).
+
+    O padrão é 'process' porque a análise de cada canto (léxico, coocorrência,
+    similaridade e estatísticas) é Python puro e, em threads, fica presa ao GIL.
+    Os workers de processo são iniciados com 'spawn' (um fork do servidor
+    multithread herdaria locks e conexões em estado arbitrário) e carregam
+    os modelos uma vez, ao subir, em vez de a cada requisição.
+    """
+    global _canto_executor
+    if CANTO_EXECUTOR == 'serial':
+        return None
+    if _canto_executor is None:
+        with _canto_executor_lock:
+            if _canto_executor is None:
+                if CANTO_EXECUTOR == 'process':
+                    _canto_executor = ProcessPoolExecutor(max_workers=CANTO_WORKERS,
+                                                          mp_context=multiprocessing.get_context('spawn'),
+                                                          initializer=warm_canto_worker)
+                else:
+                    _canto_executor = ThreadPoolExecutor(max_workers=CANTO_WORKERS,
+                                                         thread_name_prefix='canto')
+                print(f"OK: Pool de cantos criado ({CANTO_EXECUTOR}, {CANTO_WORKERS} workers)")
+    return _canto_executor
+
+def parse_canto_documents(analyzer, cantos: dict, on_parsed=None) -> list:
+    """Processa os cantos com spaCy, usando todos os núcleos.
+
+    Com o pool de processos, cada canto é processado em um worker (que já tem
+    os modelos carregados); nos demais modos, os cantos vão em um único lote
+    para o nlp.pipe (multiprocesso conforme SPACY_N_PROCESS).
+
+    Args:
+        analyzer: Analisador tradicional do processo
+        cantos: Dicionário título -> texto (na ordem da obra)
+        on_parsed: Callback opcional on_parsed(título), chamado por canto processado
+
+    Returns:
+        AnalysisDocuments na ordem dos cantos
+    """
+    global _canto_executor
+    executor = get_canto_executor() if CANTO_EXECUTOR == 'process' and len(cantos) > 1 else None
+    if executor is not None:
+        try:
+            futures = [executor.submit(parse_canto_document, text) for text in cantos.values()]
+            canto_documents = []
+            for canto_title, future in zip(cantos, futures):
+                canto_documents.append(future.result())
+                if on_parsed is not None:
+                    on_parsed(canto_title)
+            print(f"DEBUG: {len(canto_documents)} cantos processados no pool de processos")
+            return canto_documents
+        except BrokenExecutor as e:
+            print(f"AVISO: Pool de cantos indisponível ({e}); processando sequencialmente")
+            with _canto_executor_lock:
+                _canto_executor = None
+
+    canto_documents = analyzer.parse_documents(list(cantos.values()), stages=CANTO_PARSE_STAGES)
+    print(f"DEBUG: {len(canto_documents)} cantos processados em lote (n_process={analyzer.n_process})")
+    if on_parsed is not None:
+        for canto_title in cantos:
+            on_parsed(canto_title)
+    return canto_documents
+
+def iter_canto_analyses(cantos: dict, mode: str, canto_documents: list, on_complete=None):
+    """Distribui a análise dos cantos entre os workers.
+
+    Os resultados são entregues na ordem dos cantos, independentemente da
+    ordem de conclusão, para que a resposta seja determinística.
+
+    Args:
+        cantos: Dicionário título -> texto (na ordem da obra)
+        mode: 'traditional' ou 'estrito'
+        canto_documents: AnalysisDocuments na mesma ordem dos cantos
+        on_complete: Callback opcional on_complete(título), chamado assim que
+            cada canto termina (em qualquer ordem)
+
+    Yields:
+        Tuplas (título, resultado de analyze_canto), na ordem dos cantos
+    """
+    global _canto_executor
+    jobs = [(title, text, mode, document)
+            for (title, text), document in zip(cantos.items(), canto_documents)]
+    executor = get_canto_executor() if len(jobs) > 1 else None
+    futures = None
+    if executor is not None:
+        try:
+            futures = [executor.submit(analyze_canto, *job) for job in jobs]
+        except BrokenExecutor as e:
+            print(f"AVISO: Pool de cantos indisponível ({e}); processando sequencialmente")
+            with _canto_executor_lock:
+                _canto_executor = None
+
+    if futures is not None and on_complete is not None:
+        for job, future in zip(jobs, futures):
+            def notify(done_future, title=job[0]):
+                if not done_future.cancelled() and done_future.exception() is None:
+                    on_complete(title)
+            future.add_done_callback(notify)
+
+    for i, job in enumerate(jobs):
+        if futures is not None:
+            try:
+                yield job[0], futures[i].result()
+                continue
+            except BrokenExecutor as e:
+                # Pool quebrado (ex.: worker morto): descarta e processa o restante localmente
+                print(f"AVISO: Pool de cantos indisponível ({e}); processando sequencialmente")
+                with _canto_executor_lock:
+                    _canto_executor = None
+                futures = None
+        canto_analysis = analyze_canto(*job)
+        if on_complete is not None:
+            on_complete(job[0])
+        yield job[0], canto_analysis
+
+def complete_analysis_cache_key(cleaned_text: str, mode: str) -> str:
+    """Chave do cache de resultados para um texto limpo e um modo."""
+    analyzer = create_traditional_analyzer()
+    validator = create_gemini_validator()
+    return make_cache_key(
+        text=cleaned_text,
+        mode=mode,
+        lexicon=analyzer.lexicon_version,
+        code=ANALYSIS_CODE_VERSION,
+        cooccurrence_top_k=analyzer.cooccurrence_top_k,
+        # Modelo spaCy efetivamente carregado (o fallback básico produz outros lemas)
+        spacy_model=get_model_registry().resolved_model_name(),
+        gemini=validator.available
+    )
+
+def iter_complete_analysis(cleaned_text: str, mode: str, on_progress=None,
+                           collect_contexts: bool = True):
+    """Executa a análise completa emitindo eventos à medida que avança.
+
+    Args:
+        cleaned_text: Texto já sem o boilerplate do Gutenberg
+        mode: 'traditional' ou 'estrito'
+        on_progress: Callback opcional on_progress(título, etapa), chamado quando
+            um canto conclui cada etapa de CANTO_STAGE_PROGRESS
+        collect_contexts: Se False, não acumula os contextos de todos os cantos
+            no campo legado 'dream_contexts' (usado pelo streaming, em que o
+            cliente já recebe os contextos em cada evento de canto)
+
+    Yields:
+        Eventos (dicionários com a chave 'event'):
+        - 'start': títulos dos cantos identificados
+        - 'canto': resultado de um canto (na ordem da obra)
+        - 'aggregate': agregados, campos legados e metodologia
+    """
+    analyzer = create_traditional_analyzer()
+    validator = create_gemini_validator()
+    # Um único orçamento de validação para a requisição inteira (todos os cantos)
+    deadline = validation_deadline(validator)
+
+    # Separa por cantos
+    cantos = split_cantos(cleaned_text)
+    yield {'event': 'start', 'cantos': list(cantos.keys()), 'mode': mode}
+
+    stanzas_by_canto = {}
+    aggregate_counts = {'onírico': 0, 'profético': 0, 'alegórico': 0, 'divino': 0, 'ilusório': 0}
+    aggregate_terms_found = 0
+    aggregate_words = 0
+    aggregate_unique_words = set()
+    aggregate_sentences = 0
+
+    # Matrizes de coocorrência por canto (somadas ao final)
+    canto_cooccurrence_matrices: list = []
+
+    # Acúmulos para compatibilidade legada
+    legacy_expanded_terms: dict = {}
+    legacy_dream_contexts: list = []
+    # Sem os contextos completos, guarda só o necessário para o resumo da validação
+    validation_flags: list = []
+
+    def report(canto_title, stage):
+        if on_progress is not None:
+            on_progress(canto_title, stage)
+
+    # Processa todos os cantos com spaCy (workers de processo ou nlp.pipe em lote)
+    canto_documents = parse_canto_documents(analyzer, cantos,
+                                            on_parsed=lambda title: report(title, 'parsed'))
+
+    canto_analyses = iter_canto_analyses(cantos, mode, canto_documents,
+                                         on_complete=lambda title: report(title, 'analyzed'))
+    for index, (canto_title, canto_analysis) in enumerate(canto_analyses):
+        canto_result = canto_analysis['result']
+        # Validação no processo principal: um único limitador de taxa para todos os cantos
+        canto_result['dream_contexts'] = validate_canto_contexts(validator, canto_result['dream_contexts'],
+                                                                 deadline)
+        report(canto_title, 'validated')
+        if canto_analysis['cooccurrence_matrix'] is not None:
+            canto_cooccurrence_matrices.append(canto_analysis['cooccurrence_matrix'])
+        canto_classification = canto_result['context_classification']
+        canto_pre = canto_result['preprocessing']
+        sleep_terms_found = canto_result['sleep_terms']
+        normalized_contexts = canto_result['dream_contexts']
+        total_terms_found = canto_result['semantic_expansion']['terms_found']
+        stanzas_by_canto[canto_title] = canto_result.get('stanzas', [])
+
+        # Agrega (na ordem dos cantos)
+        for k in aggregate_counts.keys():
+            aggregate_counts[k] += canto_classification.get(k, 0)
+        aggregate_terms_found += total_terms_found
+        aggregate_words += canto_pre['words']
+        aggregate_unique_words.update(canto_analysis['unique_words'])
+        aggregate_sentences += canto_pre['sentences']
+
+        # Compatibilidade legada: somar termos por categoria/termo
+        for category, terms in sleep_terms_found.items():
+            if category not in legacy_expanded_terms:
+                legacy_expanded_terms[category] = {}
+            for term_data in terms:
+                term = term_data.get('term', '')
+                if term:
+                    legacy_expanded_terms[category][term] = legacy_expanded_terms[category].get(term, 0) + 1
+
+        # Compatibilidade legada: juntar contextos e anotar o canto
+        for ctx in normalized_contexts:
+            if collect_contexts:
+                ctx_with_canto = dict(ctx)
+                ctx_with_canto['canto'] = canto_title
+                legacy_dream_contexts.append(ctx_with_canto)
+            elif validator.available:
+                validation_flags.append({'gemini_validation': ctx.get('gemini_validation', {})})
+
+        yield {'event': 'canto', 'canto': canto_title, 'index': index, 'result': canto_result}
+
+    aggregate_results = {
+        'preprocessing': {
+            'original_length': len(cleaned_text),
+            'processed_length': len(normalize_text(cleaned_text)),
+            'sentences': aggregate_sentences,
+            'words': aggregate_words,
+            'unique_words': len(aggregate_unique_words)
+        },
+        'context_classification': aggregate_counts,
+        'semantic_expansion': {
+            'total_categories': len(analyzer.categories),
+            'total_terms_searched': sum(len(terms) for terms in analyzer.sleep_terms.values()),
+            'terms_found': aggregate_terms_found,
+            'coverage_percentage': (aggregate_terms_found / aggregate_words) * 100 if aggregate_words > 0 else 0
+        },
+        'cooccurrence': CooccurrenceMatrix.merge(canto_cooccurrence_matrices).top_k(analyzer.cooccurrence_top_k),
+        'cantos_identified': len(cantos),
+        'stanzas_by_canto': stanzas_by_canto,
+        'validation': {
+            'gemini_available': validator.available,
+            'summary': validator.get_validation_summary(
+                legacy_dream_contexts if collect_contexts else validation_flags
+            ) if validator.available else None
+        }
+    }
+
+    # Métricas globais
+    aggregate_results['validation_metrics'] = calculate_analysis_metrics(cleaned_text, aggregate_results)
+
+    # Campos legados para o frontend atual
+    legacy_flat = {
+        'preprocessing': aggregate_results['preprocessing'],
+        'expanded_terms': legacy_expanded_terms,
+        'context_classification': aggregate_results['context_classification'],
+        'validation_metrics': aggregate_results['validation_metrics'],
+        'dream_contexts': legacy_dream_contexts,
+    }
+
+    yield {
+        'event': 'aggregate',
+        'aggregate': aggregate_results,
+        'legacy': legacy_flat,
+        'methodology': {
+            'name': 'Análise NLP Tradicional dos Lusíadas - Foco no Sono',
+            'version': '3.0',
+            'description': 'Metodologia com técnicas NLP tradicionais focada especificamente no termo "sono"',
+            'categories_analyzed': list(analyzer.categories.keys()),
+            'total_terms': sum(len(terms) for terms in analyzer.sleep_terms.values()),
+            'mode': mode,
+            'focus': 'sono_e_termos_relacionados',
+            'techniques': ['tokenization', 'lemmatization', 'pos_tagging', 'cooccurrence', 'similarity', 'pattern_matching']
+        }
+    }
+
+def build_complete_analysis_payload(events) -> dict:
+    """Monta a resposta de /complete-analysis a partir dos eventos da análise."""
+    per_canto_results = {}
+    final = None
+    for event in events:
+        if event['event'] == 'canto':
+            per_canto_results[event['canto']] = event['result']
+        elif event['event'] == 'aggregate':
+            final = event
+
+    # Estrutura de resposta com detalhamento e campos legados para o frontend atual
+    return {
+        'message': 'Análise completa realizada com técnicas NLP tradicionais',
+        'results': {
+            'by_canto': per_canto_results,
+            'aggregate': final['aggregate'],
+            # Campos legados (compat):
+            **final['legacy']
+        },
+        'methodology': final['methodology']
+    }
+
+def run_complete_analysis_cached(cleaned_text: str, mode: str, on_start=None, on_progress=None):
+    """Executa a análise completa passando pelo cache de resultados.
+
+    Args:
+        cleaned_text: Texto já sem o boilerplate do Gutenberg
+        mode: 'traditional' ou 'estrito'
+        on_start: Callback opcional on_start(títulos dos cantos)
+        on_progress: Callback opcional on_progress(título, etapa)
+
+    Returns:
+        Tupla (resposta JSON serializada, origem: 'memory', 'disk', 'miss' ou
+        None com o cache desativado)
+    """
+    # Cache endereçado por conteúdo: reenvios do mesmo texto não reprocessam nada
+    result_cache = get_result_cache()
+    cache_key = complete_analysis_cache_key(cleaned_text, mode)
+    if result_cache is not None:
+        cached, source = result_cache.get(cache_key)
+        if cached is not None:
+            print(f"DEBUG: Resultado em cache ({source}) para {cache_key[:12]}")
+            return cached, source
+
+    def events():
+        for event in iter_complete_analysis(cleaned_text, mode, on_progress=on_progress):
+            if event['event'] == 'start' and on_start is not None:
+                on_start(event['cantos'])
+            yield event
+
+    payload = build_complete_analysis_payload(events())
+    data = jsonify(payload).get_data()
+    if result_cache is None:
+        return data, None
+    # Só resultados com todos os contextos validados vão para o cache: validação
+    # parcial (prazo, disjuntor ou falha) é refeita na próxima execução
+    summary = payload['results']['aggregate']['validation']['summary']
+    if summary is None or summary.get('complete'):
+        result_cache.put(cache_key, data)
+    else:
+        print(f"AVISO: Validação parcial ({summary.get('coverage')}); resultado não armazenado em cache")
+    return data, 'miss'
+
 @analysis_bp.route('/complete-analysis', methods=['POST'])
 def complete_analysis():
     """Análise completa usando técnicas NLP tradicionais focadas no sono."""
     try:
         data = request.get_json()
-        text = data.get('text', '')
+        text, error = resolve_request_text(data)
+        if error:
+            return error
         mode = (data.get('mode', 'traditional') or 'traditional').lower()
 
         print(f"DEBUG BACKEND: Texto recebido: {text[:100]}...")
@@ -1104,204 +1866,171 @@ def complete_analysis():
         # Limpa boilerplate do Gutenberg
         cleaned_text = remove_gutenberg_boilerplate(text)
 
-        # Cria analisador NLP tradicional
-        analyzer = create_traditional_analyzer()
-        validator = create_gemini_validator()
+        body, source = run_complete_analysis_cached(cleaned_text, mode)
+        response = current_app.response_class(body, mimetype='application/json')
+        if source is not None:
+            response.headers['X-Result-Cache'] = 'miss' if source == 'miss' else f"hit-{source}"
+        return response
 
-        # Separa por cantos
-        cantos = split_cantos(cleaned_text)
-
-        per_canto_results = {}
-        aggregate_counts = {'onírico': 0, 'profético': 0, 'alegórico': 0, 'divino': 0, 'ilusório': 0}
-        aggregate_terms_found = 0
-        aggregate_words = 0
-        aggregate_unique_words = set()
-        aggregate_sentences = 0
-
-        # Acúmulos para compatibilidade legada
-        legacy_expanded_terms: dict = {}
-        legacy_dream_contexts: list = []
-
-        for canto_title, canto_text in cantos.items():
-            # Analisa padrões de sonhos usando NLP tradicional
-            # Aplica modo específico (completo ou estrito)
-            if mode == 'estrito':
-                # Modo estrito: apenas termos muito específicos de sonhos
-                dream_patterns = analyzer.analyze_dream_patterns_strict(canto_text)
-            else:
-                # Modo completo: todos os termos relacionados
-                dream_patterns = analyzer.analyze_dream_patterns(canto_text)
-            
-            # Extrai contextos relacionados ao sono
-            sleep_contexts = dream_patterns.get('classified_contexts', [])
+    except Exception as e:
+        logger.error(f"Erro na análise completa: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
 
-            # Normaliza campos esperados pelo frontend/exportadores
-            normalized_contexts = []
-            for ctx in sleep_contexts:
-                if not isinstance(ctx, dict):
-                    continue
-                context_type = ctx.get('context_type') or ctx.get('classification') or 'onírico'
-                # Confiança pode vir como 0-1 (float) ou 0-100 (percentual)
-                confidence = ctx.get('confidence_score')
-                if confidence is None:
-                    confidence = ctx.get('confidence')
-                if isinstance(confidence, (int, float)) and confidence > 1:
-                    confidence = round(float(confidence) / 100.0, 2)
-                if not isinstance(confidence, (int, float)):
-                    confidence = 0.0
-
-                sentence = ctx.get('sentence') or ctx.get('text') or ctx.get('excerpt') or ''
-                stanza = ctx.get('stanza') if isinstance(ctx.get('stanza'), int) else ctx.get('stanza')
-
-                normalized = dict(ctx)
-                normalized['context_type'] = context_type
-                normalized['confidence_score'] = round(float(confidence), 2)
-                normalized['sentence'] = sentence
-                normalized['stanza'] = stanza
-                normalized_contexts.append(normalized)
-            
-            # Valida com Gemini se disponível
-            if validator.available:
-                validated = validator.validate_batch(normalized_contexts)
-                # Preserva campos normalizados e aplica atualizações do validador
-                if isinstance(validated, list) and len(validated) == len(normalized_contexts):
-                    merged = []
-                    for i, vctx in enumerate(validated):
-                        base_ctx = dict(normalized_contexts[i])
-                        if isinstance(vctx, dict):
-                            base_ctx.update(vctx)
-                            # Reforça campos essenciais após merge
-                            base_ctx['context_type'] = base_ctx.get('context_type') or base_ctx.get('classification') or 'onírico'
-                            conf = base_ctx.get('confidence_score')
-                            if conf is None:
-                                conf = base_ctx.get('confidence')
-                            if isinstance(conf, (int, float)) and conf > 1:
-                                conf = round(float(conf) / 100.0, 2)
-                            base_ctx['confidence_score'] = round(float(conf or 0.0), 2)
-                            base_ctx['sentence'] = base_ctx.get('sentence') or base_ctx.get('text') or base_ctx.get('excerpt') or ''
-                        merged.append(base_ctx)
-                    normalized_contexts = merged
-                else:
-                    # fallback: mantém os normalizados originais
-                    normalized_contexts = normalized_contexts
-            
-            # Conta termos por categoria
-            canto_classification = {'onírico': 0, 'profético': 0, 'alegórico': 0, 'divino': 0, 'ilusório': 0}
-            for ctx in normalized_contexts:
-                classification = ctx.get('context_type') or ctx.get('classification', 'onírico')
-                if classification in canto_classification:
-                    canto_classification[classification] += 1
-            
-            # Estrofes com ocorrência
-            stanzas_with_hits = sorted({ctx.get('stanza') for ctx in normalized_contexts if ctx.get('stanza') is not None})
-            
-            # Pré-processamento
-            canto_pre = {
-                'original_length': len(canto_text),
-                'processed_length': len(normalize_text(canto_text)),
-                'sentences': len(re.split(r"(?<=[\.!?])\s+|\n+", canto_text)),
-                'words': len(canto_text.split()),
-                'unique_words': len(set(normalize_text(canto_text).split()))
-            }
+def iter_cached_analysis_events(body: bytes):
+    """Reconstrói os eventos de streaming a partir de uma resposta em cache."""
+    payload = json.loads(body)
+    results = payload.get('results', {})
+    by_canto = results.get('by_canto', {})
+    yield {'event': 'start', 'cantos': list(by_canto.keys()),
+           'mode': payload.get('methodology', {}).get('mode')}
+    for index, (canto_title, canto_result) in enumerate(by_canto.items()):
+        yield {'event': 'canto', 'canto': canto_title, 'index': index, 'result': canto_result}
+    yield {
+        'event': 'aggregate',
+        'aggregate': results.get('aggregate', {}),
+        'legacy': {'expanded_terms': results.get('expanded_terms', {})},
+        'methodology': payload.get('methodology', {})
+    }
 
-            # Conta termos encontrados
-            sleep_terms_found = dream_patterns.get('sleep_terms', {})
-            total_terms_found = sum(len(terms) for terms in sleep_terms_found.values())
-
-            per_canto_results[canto_title] = {
-                'preprocessing': canto_pre,
-                'sleep_terms': sleep_terms_found,
-                'dream_contexts': normalized_contexts,
-                'context_classification': canto_classification,
-                'stanzas': stanzas_with_hits,
-                'cooccurrence': dream_patterns.get('cooccurrence', {}),
-                'similarity': dream_patterns.get('similarity', {}),
-                'semantic_expansion': {
-                    'total_categories': len(analyzer.categories),
-                    'total_terms_searched': sum(len(terms) for terms in analyzer.sleep_terms.values()),
-                    'terms_found': total_terms_found,
-                    'coverage_percentage': (total_terms_found / canto_pre['words']) * 100 if canto_pre['words'] > 0 else 0
-                }
-            }
+def format_stream_event(event: dict, stream_format: str) -> str:
+    """Serializa um evento como linha NDJSON ou mensagem SSE."""
+    name = event['event']
+    if name == 'aggregate':
+        # Bloco final: agregados + termos expandidos (os contextos já foram enviados por canto)
+        event = {
+            'event': 'aggregate',
+            'aggregate': event['aggregate'],
+            'expanded_terms': event['legacy'].get('expanded_terms', {}),
+            'methodology': event['methodology']
+        }
+    data = current_app.json.dumps(event)
+    if stream_format == 'sse':
+        return f"event: {name}\ndata: {data}\n\n"
+    return data + "\n"
+
+@analysis_bp.route('/complete-analysis/stream', methods=['POST'])
+def complete_analysis_stream():
+    """Análise completa em streaming: um evento por canto e, ao final, os agregados.
+
+    Formato: NDJSON (padrão) ou Server-Sent Events com ?format=sse (ou
+    'Accept: text/event-stream'). Cada canto é enviado assim que fica pronto,
+    na ordem da obra, sem montar a resposta completa em memória.
+    """
+    data = request.get_json() or {}
+    text, error = resolve_request_text(data)
+    if error:
+        return error
+    mode = (data.get('mode', 'traditional') or 'traditional').lower()
+    stream_format = (request.args.get('format') or data.get('format') or '').lower()
+    if not stream_format:
+        stream_format = 'sse' if 'text/event-stream' in request.headers.get('Accept', '') else 'ndjson'
 
-            # Agrega
-            for k in aggregate_counts.keys():
-                aggregate_counts[k] += canto_classification.get(k, 0)
-            aggregate_terms_found += total_terms_found
-            aggregate_words += canto_pre['words']
-            aggregate_unique_words.update(set(normalize_text(canto_text).split()))
-            aggregate_sentences += canto_pre['sentences']
-
-            # Compatibilidade legada: somar termos por categoria/termo
-            for category, terms in sleep_terms_found.items():
-                if category not in legacy_expanded_terms:
-                    legacy_expanded_terms[category] = {}
-                for term_data in terms:
-                    term = term_data.get('term', '')
-                    if term:
-                        legacy_expanded_terms[category][term] = legacy_expanded_terms[category].get(term, 0) + 1
-
-            # Compatibilidade legada: juntar contextos e anotar o canto
-            for ctx in normalized_contexts:
-                ctx_with_canto = dict(ctx)
-                ctx_with_canto['canto'] = canto_title
-                legacy_dream_contexts.append(ctx_with_canto)
+    if not text:
+        return jsonify({'error': 'Texto é obrigatório'}), 400
 
-        aggregate_results = {
-            'preprocessing': {
-                'original_length': len(cleaned_text),
-                'processed_length': len(normalize_text(cleaned_text)),
-                'sentences': aggregate_sentences,
-                'words': aggregate_words,
-                'unique_words': len(aggregate_unique_words)
-            },
-            'context_classification': aggregate_counts,
-            'semantic_expansion': {
-                'total_categories': len(analyzer.categories),
-                'total_terms_searched': sum(len(terms) for terms in analyzer.sleep_terms.values()),
-                'terms_found': aggregate_terms_found,
-                'coverage_percentage': (aggregate_terms_found / aggregate_words) * 100 if aggregate_words > 0 else 0
-            },
-            'cantos_identified': len(cantos),
-            'stanzas_by_canto': {k: v.get('stanzas', []) for k, v in per_canto_results.items()},
-            'validation': {
-                'gemini_available': validator.available,
-                'summary': validator.get_validation_summary(legacy_dream_contexts) if validator.available else None
-            }
-        }
+    if not TRADITIONAL_NLP_AVAILABLE:
+        return jsonify({'error': 'Módulos NLP tradicionais não disponíveis'}), 500
 
-        # Métricas globais
-        aggregate_results['validation_metrics'] = calculate_analysis_metrics(cleaned_text, aggregate_results)
+    if stream_format not in ('sse', 'ndjson'):
+        return jsonify({'error': 'Formato inválido (use sse ou ndjson)'}), 400
 
-        # Estrutura de resposta com detalhamento e campos legados para o frontend atual
-        legacy_flat = {
-            'preprocessing': aggregate_results['preprocessing'],
-            'expanded_terms': legacy_expanded_terms,
-            'context_classification': aggregate_results['context_classification'],
-            'validation_metrics': aggregate_results['validation_metrics'],
-            'dream_contexts': legacy_dream_contexts,
-        }
+    print(f"DEBUG: Streaming da análise completa ({stream_format}, modo: {mode}, {len(text)} caracteres)")
 
-        return jsonify({
-            'message': 'Análise completa realizada com técnicas NLP tradicionais',
-            'results': {
-                'by_canto': per_canto_results,
-                'aggregate': aggregate_results,
-                # Campos legados (compat):
-                **legacy_flat
-            },
-            'methodology': {
-                'name': 'Análise NLP Tradicional dos Lusíadas - Foco no Sono',
-                'version': '3.0',
-                'description': 'Metodologia com técnicas NLP tradicionais focada especificamente no termo "sono"',
-                'categories_analyzed': list(analyzer.categories.keys()),
-                'total_terms': sum(len(terms) for terms in analyzer.sleep_terms.values()),
-                'mode': mode,
-                'focus': 'sono_e_termos_relacionados',
-                'techniques': ['tokenization', 'lemmatization', 'pos_tagging', 'cooccurrence', 'similarity', 'pattern_matching']
-            }
-        })
+    def generate():
+        try:
+            cleaned_text = remove_gutenberg_boilerplate(text)
+            result_cache = get_result_cache()
+            cached = None
+            if result_cache is not None:
+                cached, source = result_cache.get(complete_analysis_cache_key(cleaned_text, mode))
+            if cached is not None:
+                events = iter_cached_analysis_events(cached)
+            else:
+                events = iter_complete_analysis(cleaned_text, mode, collect_contexts=False)
+            for event in events:
+                yield format_stream_event(event, stream_format)
+            yield format_stream_event({'event': 'end'}, stream_format)
+        except Exception as e:
+            logger.error(f"Erro no streaming da análise completa: {e}")
+            yield format_stream_event({'event': 'error', 'error': 'Erro interno do servidor'}, stream_format)
+
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    response = current_app.response_class(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def run_analysis_job(job, app, text: str, mode: str) -> bytes:
+    """Executa a análise completa de um job em segundo plano.
+
+    Args:
+        job: AnalysisJob que recebe o progresso (e a etapa) de cada canto
+        app: Aplicação Flask (o job roda fora do contexto da requisição)
+        text: Texto enviado pelo cliente
+        mode: 'traditional' ou 'estrito'
+
+    Returns:
+        Resposta JSON serializada (mesmo formato de /complete-analysis)
+    """
+    with app.app_context():
+        cleaned_text = remove_gutenberg_boilerplate(text)
+        body, source = run_complete_analysis_cached(
+            cleaned_text, mode,
+            on_start=job.set_units,
+            on_progress=lambda title, stage: job.update(title, CANTO_STAGE_PROGRESS[stage], stage)
+        )
+        job.meta['result_cache'] = source
+        print(f"DEBUG: Job {job.id} concluído (cache: {source})")
+        return body
+
+@analysis_bp.route('/jobs', methods=['POST'])
+def create_analysis_job():
+    """Cria um job de análise completa e retorna seu id imediatamente."""
+    try:
+        data = request.get_json() or {}
+        text, error = resolve_request_text(data)
+        if error:
+            return error
+        mode = (data.get('mode', 'traditional') or 'traditional').lower()
+
+        if not text:
+            return jsonify({'error': 'Texto é obrigatório'}), 400
+
+        if not TRADITIONAL_NLP_AVAILABLE:
+            return jsonify({'error': 'Módulos NLP tradicionais não disponíveis'}), 500
+
+        app = current_app._get_current_object()
+        job = get_job_manager().submit(
+            run_analysis_job, app, text, mode,
+            meta={'mode': mode, 'text_length': len(text)}
+        )
+        print(f"DEBUG: Job {job.id} criado (modo: {mode}, {len(text)} caracteres)")
+
+        payload = job.to_dict()
+        payload['status_url'] = url_for('analysis.get_analysis_job', job_id=job.id)
+        payload['result_url'] = url_for('analysis.get_analysis_job_result', job_id=job.id)
+        return jsonify(payload), 202
 
     except Exception as e:
-        logger.error(f"Erro na análise completa: {e}")
-        return jsonify({'error': 'Erro interno do servidor'}), 500
\ No newline at end of file
+        logger.error(f"Erro ao criar job de análise: {e}")
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@analysis_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """Retorna o status e o progresso por canto de um job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job não encontrado ou expirado'}), 404
+    return jsonify(job.to_dict())
+
+@analysis_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def get_analysis_job_result(job_id):
+    """Retorna o resultado de um job concluído (202 enquanto estiver em andamento)."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job não encontrado ou expirado'}), 404
+    if job.status == JOB_FAILED:
+        return jsonify({'error': 'Falha na análise', 'details': job.error}), 500
+    if job.status != JOB_DONE:
+        return jsonify(job.to_dict()), 202
+    return current_app.response_class(job.result, mimetype='application/json')
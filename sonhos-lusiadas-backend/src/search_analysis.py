@@ -6,19 +6,21 @@ Este módulo é responsável por:
 - Buscar ocorrências das palavras expandidas no texto
 - Extrair contextos relevantes
 - Contar frequências por canto
-- Classificar contextos usando Claude Sonnet 4
+- Classificar contextos (regras locais ou OpenAI, via context_classifier)
 """
 
 import re
 import pandas as pd
-import os
 import logging
 from typing import List, Dict, Tuple, Optional
 from collections import defaultdict, Counter
-import json
-import openai
 from dotenv import load_dotenv
 
+from context_classifier import ClassifierBackend, get_context_classifier
+from corpus_index import get_corpus_index
+from suffix_index import get_suffix_index
+from text_index import get_canto_index
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
@@ -29,26 +31,16 @@ logger = logging.getLogger(__name__)
 class ContextAnalyzer:
     """Classe para análise de contexto e busca de padrões."""
     
-    def __init__(self):
-        """Inicializa o analisador de contexto."""
-        self.openai_client = None
-        self._setup_openai()
+    def __init__(self, classifier: Optional[ClassifierBackend] = None):
+        """
+        Inicializa o analisador de contexto.
+        
+        Args:
+            classifier: Backend de classificação (padrão: CONTEXT_CLASSIFIER_BACKEND)
+        """
+        self.classifier = classifier or get_context_classifier()
         self.results_cache = {}
     
-    def _setup_openai(self):
-        """Configura o cliente OpenAI."""
-        api_key = os.getenv('OPENAI_API_KEY')
-        if api_key:
-            try:
-                openai.api_key = api_key
-                self.openai_client = openai
-                logger.info("Cliente OpenAI configurado para análise de contexto.")
-            except Exception as e:
-                logger.error(f"Erro ao configurar OpenAI: {e}")
-                self.openai_client = None
-        else:
-            logger.warning("OPENAI_API_KEY não encontrada para análise de contexto.")
-    
     def search_contexts(self, text: str, words: List[str], 
                        context_window: int = 100) -> pd.DataFrame:
         """
@@ -63,26 +55,29 @@ class ContextAnalyzer:
             DataFrame com palavras, contextos e posições
         """
         results = []
+        # Suffix array e índice posicional construídos uma vez por texto
+        index = get_suffix_index(text)
+        corpus = get_corpus_index(text)
         
         for word in words:
-            # Cria padrão de busca flexível
-            pattern = re.compile(rf'\b\w*{re.escape(word)}\w*\b', re.IGNORECASE)
-            
-            for match in pattern.finditer(text):
-                start = max(0, match.start() - context_window // 2)
-                end = min(len(text), match.end() + context_window // 2)
+            # Ocorrências expandidas até a palavra inteira (equivale a \b\w*palavra\w*\b)
+            spans = index.word_spans(word)
+            # Canto, estrofe e verso lidos do índice posicional (início de cada palavra)
+            locations = corpus.locate_offsets([match_start for match_start, _ in spans])
+            for (match_start, match_end), (canto, stanza, verse) in zip(spans, locations):
+                start = max(0, match_start - context_window // 2)
+                end = min(len(text), match_end + context_window // 2)
                 
                 context = text[start:end].strip()
                 
-                # Extrai canto se possível
-                canto = self._extract_canto_from_position(text, match.start())
-                
                 results.append({
                     'word': word,
                     'context': context,
-                    'position': match.start(),
+                    'position': match_start,
                     'canto': canto,
-                    'match_text': match.group(),
+                    'stanza': stanza,
+                    'verse': verse,
+                    'match_text': text[match_start:match_end],
                     'context_length': len(context)
                 })
         
@@ -102,17 +97,7 @@ class ContextAnalyzer:
         Returns:
             Número do canto ou None
         """
-        # Busca por padrões de canto antes da posição
-        canto_pattern = re.compile(r'Canto\s+([IVX]+)', re.IGNORECASE)
-        
-        text_before = text[:position]
-        cantos = list(canto_pattern.finditer(text_before))
-        
-        if cantos:
-            last_canto = cantos[-1]
-            return self._roman_to_int(last_canto.group(1))
-        
-        return None
+        return get_canto_index(text).canto_at(position)
     
     def _roman_to_int(self, roman: str) -> int:
         """Converte numeral romano para inteiro."""
@@ -130,97 +115,38 @@ class ContextAnalyzer:
         
         return result
     
-    def classify_contexts_with_openai(self, contexts_df: pd.DataFrame) -> pd.DataFrame:
+    def classify_contexts(self, contexts_df: pd.DataFrame,
+                          backend: Optional[ClassifierBackend] = None) -> pd.DataFrame:
         """
-        Classifica contextos usando OpenAI GPT-4.
+        Classifica contextos com o backend configurado.
         
         Args:
             contexts_df: DataFrame com contextos
+            backend: Backend de classificação (padrão: o do analisador)
             
         Returns:
             DataFrame com classificação adicionada
         """
-        if not self.openai_client or contexts_df.empty:
+        if contexts_df.empty:
             return contexts_df
         
-        # Adiciona coluna de classificação
-        contexts_df = contexts_df.copy()
-        contexts_df['classification'] = 'não_classificado'
-        contexts_df['confidence'] = 0.0
+        labels = (backend or self.classifier).classify_frame(contexts_df)
         
-        # Processa em lotes para eficiência
-        batch_size = 5
-        for i in range(0, len(contexts_df), batch_size):
-            batch = contexts_df.iloc[i:i+batch_size]
-            
-            try:
-                classifications = self._classify_batch(batch)
-                
-                for j, classification in enumerate(classifications):
-                    if i + j < len(contexts_df):
-                        contexts_df.iloc[i + j, contexts_df.columns.get_loc('classification')] = classification['type']
-                        contexts_df.iloc[i + j, contexts_df.columns.get_loc('confidence')] = classification['confidence']
-                
-                # Pequena pausa para evitar rate limiting
-                time.sleep(0.5)
-                
-            except Exception as e:
-                logger.error(f"Erro na classificação do lote {i//batch_size + 1}: {e}")
-        
-        return contexts_df
+        # Escrita vetorizada das colunas (alinhada pelo índice)
+        return contexts_df.assign(classification=labels['classification'],
+                                  confidence=labels['confidence'])
     
-    def _classify_batch(self, batch_df: pd.DataFrame) -> List[Dict]:
+    def classify_contexts_with_openai(self, contexts_df: pd.DataFrame) -> pd.DataFrame:
         """
-        Classifica um lote de contextos.
+        Classifica contextos usando OpenAI GPT-4 (lotes assíncronos).
         
         Args:
-            batch_df: DataFrame com lote de contextos
+            contexts_df: DataFrame com contextos
             
         Returns:
-            Lista de classificações
-        """
-        contexts_text = []
-        for _, row in batch_df.iterrows():
-            contexts_text.append(f"Palavra: {row['word']}\nContexto: {row['context']}")
-        
-        prompt = f"""
-        Classifique os seguintes contextos de palavras relacionadas a "sonho" em Os Lusíadas:
-        
-        {chr(10).join(contexts_text)}
-        
-        Para cada contexto, identifique o tipo de sonho:
-        1. "onírico" - sonhos, pesadelos, devaneios
-        2. "profético" - visões, presságios, augúrios
-        3. "alegórico" - símbolos, metáforas, alegorias
-        4. "divino" - revelações, aparições divinas
-        5. "ilusão" - quimeras, miragens, falsas aparências
-        
-        Retorne JSON com formato:
-        [{{"type": "tipo", "confidence": 0.95}}, ...]
+            DataFrame com classificação adicionada
         """
-        
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            max_tokens=1000,
-            temperature=0.3,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
-        
-        try:
-            # Extrai JSON da resposta
-            json_text = response.choices[0].message.content
-            json_match = re.search(r'\[.*\]', json_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                # Fallback para classificação simples
-                return [{"type": "não_classificado", "confidence": 0.0} for _ in range(len(batch_df))]
-        except Exception as e:
-            logger.error(f"Erro ao processar classificação: {e}")
-            return [{"type": "não_classificado", "confidence": 0.0} for _ in range(len(batch_df))]
+        return self.classify_contexts(contexts_df, get_context_classifier('openai'))
     
     def calculate_frequencies(self, contexts_df: pd.DataFrame) -> Dict:
         """
@@ -323,7 +249,7 @@ def run_complete_analysis(text: str, words: List[str]) -> Dict:
         }
     
     # Classifica contextos
-    contexts_df = analyzer.classify_contexts_with_claude(contexts_df)
+    contexts_df = analyzer.classify_contexts(contexts_df)
     
     # Calcula frequências
     frequencies = analyzer.calculate_frequencies(contexts_df)
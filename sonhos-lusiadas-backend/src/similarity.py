@@ -0,0 +1,113 @@
+"""
+Módulo de Similaridade Esparsa entre Sentenças
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo calcula os vizinhos mais similares de cada sentença a partir de
+uma matriz TF-IDF esparsa, sem materializar a matriz densa N x N:
+
+- A matriz TF-IDF (linhas normalizadas em L2) permanece esparsa
+- O produto X · Xᵀ é calculado em blocos de linhas, limitando a memória
+- Apenas os top-k vizinhos acima do limiar são mantidos por sentença
+- O resultado é devolvido como arrays compactos (i, j, score)
+"""
+
+import logging
+from typing import Any, Dict
+
+import numpy as np
+from scipy import sparse
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_TOP_K = 10
+DEFAULT_CHUNK_SIZE = 512
+
+
+def top_k_similar_pairs(tfidf_matrix, threshold: float = DEFAULT_THRESHOLD,
+                        top_k: int = DEFAULT_TOP_K,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Calcula pares de sentenças similares (cosseno) em blocos.
+
+    Args:
+        tfidf_matrix: Matriz TF-IDF esparsa com linhas normalizadas (norm='l2')
+        threshold: Similaridade mínima (exclusiva) para manter um par
+        top_k: Máximo de vizinhos mantidos por sentença
+        chunk_size: Número de linhas por bloco do produto X · Xᵀ
+
+    Returns:
+        Dicionário com arrays 'i', 'j' (i < j) e 'score', ordenados por (i, j)
+    """
+    matrix = sparse.csr_matrix(tfidf_matrix)
+    n = matrix.shape[0]
+    transposed = matrix.T.tocsc()
+
+    rows, cols, scores = [], [], []
+    for start in range(0, n, chunk_size):
+        end = min(n, start + chunk_size)
+        block = (matrix[start:end] @ transposed).tocsr()
+        # Descarta valores abaixo do limiar antes de ordenar
+        block.data[block.data <= threshold] = 0
+        block.eliminate_zeros()
+
+        for local_row in range(end - start):
+            i = start + local_row
+            lo, hi = block.indptr[local_row], block.indptr[local_row + 1]
+            neighbours = block.indices[lo:hi]
+            values = block.data[lo:hi]
+            keep = neighbours != i
+            neighbours, values = neighbours[keep], values[keep]
+            if values.size > top_k:
+                best = np.argpartition(-values, top_k - 1)[:top_k]
+                neighbours, values = neighbours[best], values[best]
+            if values.size:
+                rows.append(np.full(values.size, i, dtype=np.int64))
+                cols.append(neighbours.astype(np.int64))
+                scores.append(values)
+
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return {'i': empty, 'j': empty.copy(), 'score': np.empty(0, dtype=np.float64)}
+
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    scores = np.concatenate(scores)
+
+    # Canoniza (i < j) e remove pares repetidos (vizinhança é simétrica)
+    first = np.minimum(rows, cols)
+    second = np.maximum(rows, cols)
+    keys = first * n + second
+    keys, unique_idx = np.unique(keys, return_index=True)
+    return {
+        'i': first[unique_idx],
+        'j': second[unique_idx],
+        'score': scores[unique_idx]
+    }
+
+
+def pairs_to_json(pairs: Dict[str, np.ndarray], total_sentences: int,
+                  threshold: float, top_k: int) -> Dict[str, Any]:
+    """
+    Converte os arrays de pares para estrutura serializável em JSON.
+
+    Args:
+        pairs: Resultado de top_k_similar_pairs
+        total_sentences: Número de sentenças comparadas
+        threshold: Limiar usado
+        top_k: Vizinhos por sentença usados
+
+    Returns:
+        Dicionário compacto com listas paralelas i, j e score
+    """
+    return {
+        'i': pairs['i'].tolist(),
+        'j': pairs['j'].tolist(),
+        'score': np.round(pairs['score'], 4).tolist(),
+        'total_pairs': int(pairs['i'].size),
+        'total_sentences': total_sentences,
+        'threshold': threshold,
+        'top_k': top_k
+    }
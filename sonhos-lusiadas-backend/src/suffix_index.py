@@ -0,0 +1,207 @@
+"""
+Módulo de Índice de Sufixos
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo constrói, uma única vez por texto, um suffix array do texto
+normalizado (minúsculas, mesmos offsets do original) para responder buscas de
+substrings e expressões em O(m log n), sem varrer o texto a cada palavra:
+
+- Ocorrências de uma substring ou expressão ("assim como")
+- Expansão para a palavra que contém a ocorrência (mesmos trechos que a regex
+  legada r'\\b\\w*{palavra}\\w*\\b' com IGNORECASE)
+- Palavras distintas que contêm uma substring
+"""
+
+import re
+import logging
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize_for_index(text: str) -> str:
+    """
+    Converte o texto para minúsculas preservando os offsets.
+
+    Caracteres cuja forma minúscula tem outro comprimento (ex.: 'İ') são
+    mantidos como estão, para que cada posição do texto normalizado
+    corresponda à mesma posição do original.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Texto normalizado com o mesmo comprimento
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+def build_suffix_array(text: str) -> np.ndarray:
+    """
+    Constrói o suffix array por duplicação de prefixos (ordenações do numpy).
+
+    Args:
+        text: Texto (já normalizado)
+
+    Returns:
+        Offsets dos sufixos em ordem lexicográfica (int32)
+    """
+    n = len(text)
+    if n == 0:
+        return np.zeros(0, dtype=np.int32)
+
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    rank = np.unique(codes, return_inverse=True)[1].astype(np.int64)
+    suffixes = np.argsort(rank, kind='stable')
+    step = 1
+    while step < n:
+        # Ordena por (rank do prefixo de tamanho step, rank dos step caracteres seguintes)
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n - step] = rank[step:]
+        suffixes = np.lexsort((second, rank))
+        first_sorted, second_sorted = rank[suffixes], second[suffixes]
+        changed = (first_sorted[1:] != first_sorted[:-1]) | (second_sorted[1:] != second_sorted[:-1])
+        sorted_ranks = np.concatenate(([0], np.cumsum(changed)))
+        rank = np.empty(n, dtype=np.int64)
+        rank[suffixes] = sorted_ranks
+        if sorted_ranks[-1] == n - 1:
+            break
+        step *= 2
+    return suffixes.astype(np.int32)
+
+
+class SuffixArrayIndex:
+    """Suffix array de um texto, com fronteiras de palavras para expansão."""
+
+    def __init__(self, text: str):
+        """
+        Constrói o índice.
+
+        Args:
+            text: Texto original
+        """
+        self.text = text
+        self.normalized = normalize_for_index(text)
+        self.suffixes = build_suffix_array(self.normalized)
+
+        # Sequências \w do texto (para expandir ocorrências até a palavra inteira)
+        starts, ends = [], []
+        for match in _WORD_RE.finditer(text):
+            starts.append(match.start())
+            ends.append(match.end())
+        self.word_starts = np.array(starts, dtype=np.int64)
+        self.word_ends = np.array(ends, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.suffixes)
+
+    def suffix_range(self, pattern: str) -> Tuple[int, int]:
+        """
+        Intervalo [início, fim) do suffix array com sufixos que começam pelo padrão.
+
+        Args:
+            pattern: Substring (comparada em minúsculas)
+
+        Returns:
+            Tupla (início, fim)
+        """
+        pattern = normalize_for_index(pattern)
+        size = len(pattern)
+        normalized = self.normalized
+
+        def prefix(offset):
+            return normalized[offset:offset + size]
+
+        low = bisect_left(self.suffixes, pattern, key=prefix)
+        high = bisect_right(self.suffixes, pattern, lo=low, key=prefix)
+        return low, high
+
+    def count(self, pattern: str) -> int:
+        """Número de ocorrências (possivelmente sobrepostas) do padrão."""
+        if not pattern:
+            return 0
+        low, high = self.suffix_range(pattern)
+        return high - low
+
+    def occurrences(self, pattern: str) -> np.ndarray:
+        """
+        Posições de todas as ocorrências do padrão, em ordem crescente.
+
+        Args:
+            pattern: Substring ou expressão (ex.: "assim como")
+
+        Returns:
+            Array de offsets no texto original
+        """
+        if not pattern:
+            return np.zeros(0, dtype=np.int64)
+        low, high = self.suffix_range(pattern)
+        return np.sort(self.suffixes[low:high]).astype(np.int64)
+
+    def word_spans(self, word: str) -> List[Tuple[int, int]]:
+        """
+        Trechos equivalentes a re.finditer(r'\\b\\w*{palavra}\\w*\\b', IGNORECASE).
+
+        Cada ocorrência é expandida do início da sequência \\w que contém seu
+        primeiro caractere até o fim da sequência que contém o último; trechos
+        sobrepostos a um anterior são descartados, como no finditer.
+
+        Args:
+            word: Palavra, radical ou expressão
+
+        Returns:
+            Lista (início, fim) em ordem crescente
+        """
+        if not (word and _WORD_RE.fullmatch(word[0]) and _WORD_RE.fullmatch(word[-1])):
+            # Bordas fora de \w mudam a semântica de \b: usa a regex legada
+            pattern = re.compile(rf'\b\w*{re.escape(word)}\w*\b', re.IGNORECASE)
+            return [match.span() for match in pattern.finditer(self.text)]
+
+        positions = self.occurrences(word)
+        if not len(positions):
+            return []
+        first_words = np.searchsorted(self.word_starts, positions, side='right') - 1
+        last_words = np.searchsorted(self.word_starts, positions + len(word) - 1, side='right') - 1
+        span_starts = self.word_starts[first_words]
+        span_ends = self.word_ends[last_words]
+
+        spans = []
+        previous_end = -1
+        for start, end in zip(span_starts.tolist(), span_ends.tolist()):
+            if start >= previous_end:
+                spans.append((start, end))
+                previous_end = end
+        return spans
+
+    def containing_words(self, pattern: str) -> Dict[str, int]:
+        """
+        Palavras distintas (em minúsculas) que contêm o padrão, com frequência.
+
+        Args:
+            pattern: Substring
+
+        Returns:
+            Dicionário palavra -> ocorrências, da mais frequente para a menos
+        """
+        counts = Counter(
+            self.normalized[start:end] for start, end in self.word_spans(pattern)
+        )
+        return dict(counts.most_common())
+
+
+@lru_cache(maxsize=4)
+def get_suffix_index(text: str) -> SuffixArrayIndex:
+    """Retorna o suffix array do texto (construído uma vez por texto)."""
+    return SuffixArrayIndex(text)
@@ -0,0 +1,202 @@
+"""
+Módulo de Índices Estruturais do Texto
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo constrói, uma única vez por texto, índices de offsets ordenados
+para localizar a estrutura do poema (cantos, estrofes e versos) por busca
+binária, em vez de reprocessar o prefixo do texto a cada ocorrência encontrada.
+"""
+
+import re
+import logging
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Números de estrofe: números soltos em uma linha
+_STANZA_LINE_RE = re.compile(r'^\s*(\d+)\s*$', re.MULTILINE)
+# Linha corrente parcial (do início da linha até a posição consultada)
+_STANZA_PARTIAL_RE = re.compile(r'\s*(\d+)\s*')
+# Cabeçalhos de canto (mesmo padrão usado pelo ContextAnalyzer)
+_CANTO_HEADER_RE = re.compile(r'Canto\s+([IVX]+)', re.IGNORECASE)
+
+
+class StanzaIndex:
+    """Índice ordenado dos números de estrofe de um texto."""
+
+    def __init__(self, text: str):
+        """
+        Constrói o índice em uma única passada pelo texto.
+
+        Args:
+            text: Texto completo (canto ou obra)
+        """
+        self.text = text
+        self.offsets: List[int] = []
+        self.numbers: List[int] = []
+        for match in _STANZA_LINE_RE.finditer(text):
+            self.offsets.append(match.end(1))
+            self.numbers.append(int(match.group(1)))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def lookup(self, position: int) -> Optional[Tuple[int, int]]:
+        """
+        Localiza a última estrofe iniciada antes da posição.
+
+        Args:
+            position: Posição no texto
+
+        Returns:
+            Tupla (número da estrofe, offset do número) ou None
+        """
+        # O prefixo pode terminar no meio de uma linha "12 verso...": nesse caso
+        # a própria linha corrente conta como número de estrofe
+        line_start = self.text.rfind('\n', 0, position) + 1
+        partial = _STANZA_PARTIAL_RE.fullmatch(self.text, line_start, position)
+        if partial:
+            return int(partial.group(1)), partial.end(1)
+
+        i = bisect_right(self.offsets, position) - 1
+        if i >= 0:
+            return self.numbers[i], self.offsets[i]
+        return None
+
+    def stanza_at(self, position: int) -> Optional[int]:
+        """
+        Retorna o número da última estrofe iniciada antes da posição.
+
+        Equivale a aplicar r'^\\s*(\\d+)\\s*$' (MULTILINE) sobre text[:position]
+        e pegar a última ocorrência, mas em O(log n).
+
+        Args:
+            position: Posição no texto
+
+        Returns:
+            Número da estrofe ou None
+        """
+        found = self.lookup(position)
+        return found[0] if found else None
+
+
+class CantoIndex:
+    """Tabela de fronteiras de cantos, estrofes e versos de um texto."""
+
+    def __init__(self, text: str):
+        """
+        Constrói as tabelas de offsets em uma única passada pelo texto.
+
+        Args:
+            text: Texto completo da obra
+        """
+        self.text = text
+        self.canto_starts: List[int] = []
+        self.canto_ends: List[int] = []
+        self.canto_numbers: List[int] = []
+        for match in _CANTO_HEADER_RE.finditer(text):
+            self.canto_starts.append(match.start())
+            self.canto_ends.append(match.end())
+            self.canto_numbers.append(roman_to_int(match.group(1)))
+
+        self.stanzas = get_stanza_index(text)
+
+        # Início de cada linha e contagem acumulada de versos (linhas com texto
+        # que não são número de estrofe) antes de cada linha
+        self.line_starts: List[int] = []
+        self.is_verse: List[bool] = []
+        self.verses_before: List[int] = [0]
+        offset = 0
+        for line in text.split('\n'):
+            stripped = line.strip()
+            verse = bool(stripped) and not stripped.isdigit()
+            self.line_starts.append(offset)
+            self.is_verse.append(verse)
+            self.verses_before.append(self.verses_before[-1] + (1 if verse else 0))
+            offset += len(line) + 1
+
+    def canto_at(self, position: int) -> Optional[int]:
+        """
+        Retorna o número do último cabeçalho "Canto X" antes da posição.
+
+        Equivale a aplicar r'Canto\\s+([IVX]+)' sobre text[:position] e pegar a
+        última ocorrência, mas em O(log n).
+
+        Args:
+            position: Posição no texto
+
+        Returns:
+            Número do canto ou None
+        """
+        i = bisect_right(self.canto_ends, position) - 1
+
+        # Cabeçalho cortado pela posição: o prefixo ainda pode conter parte dele
+        following = i + 1
+        if following < len(self.canto_starts) and self.canto_starts[following] < position:
+            partial = _CANTO_HEADER_RE.match(self.text, self.canto_starts[following], position)
+            if partial:
+                return roman_to_int(partial.group(1))
+
+        if i >= 0:
+            return self.canto_numbers[i]
+        return None
+
+    def locate(self, position: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """
+        Resolve uma posição para (canto, estrofe, verso) por busca binária.
+
+        O verso é a ordem da linha dentro da estrofe (1 = primeiro verso), ou
+        None quando a posição não está em uma linha de verso.
+
+        Args:
+            position: Posição no texto
+
+        Returns:
+            Tupla (canto, estrofe, verso)
+        """
+        canto = self.canto_at(position)
+
+        stanza_info = self.stanzas.lookup(position)
+        if stanza_info is None:
+            return canto, None, None
+        stanza, stanza_offset = stanza_info
+
+        line = bisect_right(self.line_starts, position) - 1
+        stanza_line = bisect_right(self.line_starts, stanza_offset) - 1
+        if line < 0 or not self.is_verse[line]:
+            return canto, stanza, None
+        verse = self.verses_before[line + 1] - self.verses_before[stanza_line]
+        return canto, stanza, verse
+
+
+def roman_to_int(roman: str) -> int:
+    """Converte numeral romano (maiúsculo ou minúsculo) para inteiro."""
+    roman_numerals = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
+    result = 0
+    prev_value = 0
+
+    for char in reversed(roman.upper()):
+        value = roman_numerals[char]
+        if value < prev_value:
+            result -= value
+        else:
+            result += value
+        prev_value = value
+
+    return result
+
+
+@lru_cache(maxsize=32)
+def get_stanza_index(text: str) -> StanzaIndex:
+    """Retorna o índice de estrofes do texto (construído uma vez por texto)."""
+    return StanzaIndex(text)
+
+
+@lru_cache(maxsize=8)
+def get_canto_index(text: str) -> CantoIndex:
+    """Retorna a tabela de fronteiras do texto (construída uma vez por texto)."""
+    return CantoIndex(text)
@@ -13,18 +13,26 @@ para análise de sonhos em Os Lusíadas, substituindo dependências de LLMs por:
 - Análise de padrões linguísticos baseada em regras
 """
 
+import os
 import re
-import nltk
-import spacy
 import numpy as np
 import pandas as pd
 from collections import Counter, defaultdict
-from typing import List, Dict, Tuple, Optional, Set
+from typing import Any, List, Dict, Tuple, Optional, Set, Union
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import LatentDirichletAllocation
 import logging
 
+from analysis_document import ALL_STAGES, AnalysisDocument
+from context_classifier import classify_by_patterns, pattern_confidence
+from corpus_index import get_corpus_index
+from cooccurrence import CooccurrenceEngine, CooccurrenceMatrix
+from lexicon_matcher import LexiconMatcher
+from similarity import DEFAULT_THRESHOLD, DEFAULT_TOP_K, pairs_to_json, top_k_similar_pairs
+from model_registry import ModelRegistry, get_model_registry
+from result_cache import fingerprint
+from text_index import StanzaIndex, get_stanza_index
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,9 +40,16 @@ logger = logging.getLogger(__name__)
 class TraditionalNLPAnalyzer:
     """Analisador NLP tradicional para análise de sonhos em Os Lusíadas."""
     
-    def __init__(self):
-        """Inicializa o analisador NLP tradicional."""
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        """
+        Inicializa o analisador NLP tradicional.
+        
+        Args:
+            registry: Registro de modelos compartilhado (padrão: registro do processo)
+        """
+        self.registry = registry or get_model_registry()
         self.nlp = None
+        self.stage_nlp = None
         self.stemmer = None
         self.stopwords = set()
         self._setup_nlp_models()
@@ -84,6 +99,38 @@ class TraditionalNLPAnalyzer:
             ]
         }
         
+        # Termos muito específicos para modo estrito (analyze_dream_patterns_strict)
+        self.strict_terms = {
+            'onírico': [
+                'sonho', 'sonhos', 'sonhar', 'sonhando', 'sonhava', 'sonhei', 'sonharia',
+                'pesadelo', 'pesadelos', 'pesadelar', 'pesadelando', 'pesadelava',
+                'dormir', 'dormindo', 'dormia', 'dormiu', 'adormecer', 'adormecendo', 'adormecia',
+                'despertar', 'despertando', 'despertava', 'despertou',
+                'repouso', 'repousar', 'repousando', 'repousava',
+                'descanso', 'descansar', 'descansando', 'descansava',
+                'sonolência', 'sonolento', 'soneca', 'sonecar'
+            ],
+            'profético': [
+                'visão', 'visões', 'profecia', 'profécias', 'profetizar', 'profetizando',
+                'revelação', 'revelações', 'revelar', 'revelando', 'revelava',
+                'aparição', 'aparições', 'aparecer', 'aparecendo', 'aparecia',
+                'vaticínio', 'vaticínios', 'vaticinar', 'vaticinando', 'vaticinava',
+                'presságio', 'presságios', 'pressagiar', 'pressagiando', 'pressagiava'
+            ],
+            'alegórico': [
+                'sombra', 'sombras', 'fantasia', 'fantasias', 'ilusão', 'ilusões',
+                'metáfora', 'metáforas', 'símbolo', 'símbolos', 'alegoria', 'alegorias'
+            ],
+            'divino': [
+                'glória', 'glorioso', 'divino', 'divinos', 'celestial', 'celestiais',
+                'milagre', 'milagres', 'milagroso', 'sagrado', 'sagrados', 'santo', 'santos'
+            ],
+            'ilusório': [
+                'ilusão', 'ilusões', 'quimera', 'quimeras', 'miragem', 'miragens',
+                'falsa', 'falso', 'falsos', 'falsas'
+            ]
+        }
+        
         # Categorias de classificação (mantidas conforme solicitado)
         self.categories = {
             'onírico': ['sono', 'sonho', 'dormir', 'pesadelo'],
@@ -92,118 +139,112 @@ class TraditionalNLPAnalyzer:
             'divino': ['glória', 'divino', 'celestial', 'sobrenatural'],
             'ilusório': ['ilusão', 'quimera', 'miragem', 'falsa']
         }
+        
+        # Versão do léxico: muda sempre que termos ou categorias forem alterados
+        lexicon = {'sleep_terms': self.sleep_terms, 'strict_terms': self.strict_terms,
+                   'categories': self.categories}
+        self.lexicon_version = fingerprint(lexicon)
+        
+        # Backend de casamento de léxico: 'automaton' (passada única), 'regex'
+        # (uma regex por termo, legado), 'index' (índice posicional do corpus)
+        # ou 'compare' (roda automaton e regex e compara)
+        self.matcher_backend = os.getenv('LEXICON_MATCHER_BACKEND', 'automaton').lower()
+        self._matchers: Dict[Tuple, LexiconMatcher] = {}
+        self._get_matcher(self.sleep_terms)
+        self._get_matcher(self.strict_terms)
+        
+        # Coocorrência esparsa com índice de prefixos dos termos de sono
+        self.cooccurrence_engine = CooccurrenceEngine(self.sleep_terms)
+        self.cooccurrence_top_k = int(os.getenv('COOCCURRENCE_TOP_K', 20))
+        
+        # Processamento em lote (nlp.pipe): 'auto' usa um processo por núcleo (no
+        # máximo um por texto) e divide os textos em um lote por processo
+        n_process = os.getenv('SPACY_N_PROCESS', 'auto').lower()
+        self.n_process = (os.cpu_count() or 1) if n_process == 'auto' else max(1, int(n_process))
+        batch_size = os.getenv('SPACY_BATCH_SIZE', 'auto').lower()
+        self.batch_size = None if batch_size == 'auto' else max(1, int(batch_size))
     
     def _setup_nlp_models(self):
-        """Configura modelos NLP necessários."""
-        try:
-            # Carrega modelo spaCy para português
-            self.nlp = spacy.load("pt_core_news_sm")
-            logger.info("Modelo spaCy carregado com sucesso.")
-        except OSError:
-            logger.warning("Modelo spaCy não encontrado. Usando modelo básico.")
-            self.nlp = spacy.blank("pt")
-            # Garante segmentação de sentenças mesmo no modelo básico
-            if 'sentencizer' not in self.nlp.pipe_names:
-                self.nlp.add_pipe('sentencizer')
+        """Obtém os modelos NLP do registro compartilhado (carregados uma vez por processo)."""
+        self.nlp = self.registry.get_nlp()
+        self.stage_nlp = self.registry.get_stage_nlp()
+        self.stemmer = self.registry.get_stemmer()
+        self.stopwords = self.registry.get_stopwords()
+    
+    def document(self, text: Union[str, AnalysisDocument]) -> AnalysisDocument:
+        """
+        Retorna o documento de análise do texto (processado uma única vez pelo spaCy).
         
-        try:
-            # Configura stemmer RSLP
-            from nltk.stem import RSLPStemmer
-            self.stemmer = RSLPStemmer()
-            logger.info("Stemmer RSLP configurado.")
-        except:
-            logger.warning("Stemmer RSLP não disponível.")
-            self.stemmer = None
+        Args:
+            text: Texto ou documento já processado
+            
+        Returns:
+            Documento de análise compartilhável entre as etapas
+        """
+        if isinstance(text, AnalysisDocument):
+            return text
+        return AnalysisDocument.parse(text, self.stage_nlp)
+    
+    def parse_documents(self, texts: List[str], stages=ALL_STAGES,
+                        n_process: Optional[int] = None,
+                        batch_size: Optional[int] = None) -> List[AnalysisDocument]:
+        """
+        Processa vários textos em lote (ex.: todos os cantos de uma vez).
         
-        try:
-            # Carrega stopwords
-            from nltk.corpus import stopwords
-            self.stopwords = set(stopwords.words('portuguese'))
-            logger.info("Stopwords carregadas.")
-        except LookupError:
-            nltk.download('stopwords')
-            from nltk.corpus import stopwords
-            self.stopwords = set(stopwords.words('portuguese'))
-            logger.info("Stopwords baixadas e carregadas.")
+        Args:
+            texts: Textos para processar
+            stages: Etapas que usarão os documentos ('lemmas', 'pos', 'sentences')
+            n_process: Número de processos (padrão: SPACY_N_PROCESS)
+            batch_size: Textos por lote (padrão: SPACY_BATCH_SIZE)
+            
+        Returns:
+            Documentos de análise, na mesma ordem dos textos
+        """
+        n_process = max(1, min(n_process or self.n_process, len(texts)))
+        # 'auto': um lote por processo (ex.: 10 cantos em 4 núcleos -> lotes de 3)
+        batch_size = batch_size or self.batch_size or -(-len(texts) // n_process)
+        return AnalysisDocument.parse_many(
+            texts, self.stage_nlp, stages=stages,
+            n_process=n_process,
+            batch_size=batch_size
+        )
     
-    def tokenize_and_lemmatize(self, text: str) -> List[str]:
+    def tokenize_and_lemmatize(self, text: Union[str, AnalysisDocument]) -> List[str]:
         """
         Tokeniza e lematiza o texto.
         
         Args:
-            text: Texto para processar
+            text: Texto ou documento de análise
             
         Returns:
             Lista de tokens lematizados
         """
-        doc = self.nlp(text)
-        tokens = []
-        
-        for token in doc:
-            if not token.is_space and not token.is_punct and not token.is_stop:
-                if hasattr(token, 'lemma_') and token.lemma_:
-                    tokens.append(token.lemma_.lower())
-                else:
-                    tokens.append(token.text.lower())
-        
-        return tokens
+        return self.document(text).lemmas
     
-    def pos_tagging(self, text: str) -> List[Tuple[str, str]]:
+    def pos_tagging(self, text: Union[str, AnalysisDocument]) -> List[Tuple[str, str]]:
         """
         Realiza POS tagging do texto.
         
         Args:
-            text: Texto para analisar
+            text: Texto ou documento de análise
             
         Returns:
             Lista de tuplas (token, pos_tag)
         """
-        doc = self.nlp(text)
-        pos_tags = []
-        
-        for token in doc:
-            if not token.is_space and not token.is_punct:
-                pos_tags.append((token.text.lower(), token.pos_))
-        
-        return pos_tags
+        return self.document(text).pos_tags
     
-    def extract_sleep_related_terms(self, text: str) -> Dict[str, List[Dict]]:
+    def extract_sleep_related_terms(self, text: Union[str, AnalysisDocument]) -> Dict[str, List[Dict]]:
         """
         Extrai termos relacionados ao sono usando técnicas tradicionais.
         
         Args:
-            text: Texto para analisar
+            text: Texto (ou documento de análise) para analisar
             
         Returns:
             Dicionário com termos encontrados e seus contextos
         """
-        results = defaultdict(list)
-        text_lower = text.lower()
-        
-        for category, terms in self.sleep_terms.items():
-            for term in terms:
-                # Captura o termo e possíveis flexões simples (sufixos alfanuméricos)
-                pattern = re.compile(rf'\b{re.escape(term)}\w*\b', re.IGNORECASE)
-                for match in pattern.finditer(text_lower):
-                    # Extrai contexto (100 caracteres antes e depois para contexto mais rico)
-                    start = max(0, match.start() - 100)
-                    end = min(len(text), match.end() + 100)
-                    context = text[start:end].strip()
-                    
-                    # Identifica estrofe se possível
-                    stanza = self._extract_stanza_number(text, match.start())
-                    
-                    results[category].append({
-                        'term': match.group(0),
-                        'context': context,
-                        'text': context,  # Adiciona campo 'text' para compatibilidade
-                        'excerpt': context,  # Adiciona campo 'excerpt' para compatibilidade
-                        'position': match.start(),
-                        'stanza': stanza,
-                        'category': category
-                    })
-        
-        return dict(results)
+        # Backend conforme LEXICON_MATCHER_BACKEND (índice posicional com =index)
+        return self._extract_terms_with_list(text, self.sleep_terms)
     
     def _extract_stanza_number(self, text: str, position: int) -> Optional[int]:
         """
@@ -216,63 +257,62 @@ class TraditionalNLPAnalyzer:
         Returns:
             Número da estrofe ou None
         """
-        # Busca por números de estrofe antes da posição
-        text_before = text[:position]
-        
-        # Padrão para números de estrofe (números soltos em linhas)
-        stanza_pattern = re.compile(r'^\s*(\d+)\s*$', re.MULTILINE)
-        matches = list(stanza_pattern.finditer(text_before))
-        
-        if matches:
-            return int(matches[-1].group(1))
-        
-        return None
+        # Índice de offsets construído uma vez por texto; consulta por busca binária
+        return get_stanza_index(text).stanza_at(position)
     
-    def analyze_cooccurrence(self, text: str, window_size: int = 5) -> Dict[str, Dict[str, int]]:
+    def analyze_cooccurrence(self, text: Union[str, AnalysisDocument], window_size: int = 5,
+                             top_k: Optional[int] = None) -> Dict[str, Dict[str, int]]:
         """
         Analisa coocorrência de palavras relacionadas ao sono.
         
         Args:
             text: Texto para analisar
             window_size: Tamanho da janela de coocorrência
+            top_k: Máximo de vizinhos por termo (padrão: COOCCURRENCE_TOP_K)
             
         Returns:
-            Dicionário com matriz de coocorrência
-        """
-        tokens = self.tokenize_and_lemmatize(text)
-        cooccurrence = defaultdict(lambda: defaultdict(int))
-        
-        # Identifica posições dos termos de sono
-        sleep_positions = []
-        for i, token in enumerate(tokens):
-            for category, terms in self.sleep_terms.items():
-                for term in terms:
-                    if token.startswith(term):
-                        sleep_positions.append((i, token, category))
-        
-        # Calcula coocorrência
-        for pos, sleep_token, category in sleep_positions:
-            start = max(0, pos - window_size)
-            end = min(len(tokens), pos + window_size + 1)
-            
-            for i in range(start, end):
-                if i != pos:
-                    cooccurrence[sleep_token][tokens[i]] += 1
+            Dicionário termo -> {vizinho: contagem} com os top-k vizinhos
+        """
+        matrix = self.cooccurrence_matrix(text, window_size)
+        return matrix.top_k(top_k or self.cooccurrence_top_k)
+    
+    def cooccurrence_matrix(self, text: Union[str, AnalysisDocument],
+                            window_size: int = 5) -> CooccurrenceMatrix:
+        """
+        Constrói a matriz esparsa de coocorrência do texto.
+        
+        Matrizes de textos diferentes (ex.: cantos) podem ser somadas com
+        CooccurrenceMatrix.merge para obter os totais do corpus.
         
-        return dict(cooccurrence)
+        Args:
+            text: Texto ou documento de análise
+            window_size: Tamanho da janela de coocorrência
+            
+        Returns:
+            Matriz de coocorrência (termo de sono x palavra de contexto)
+        """
+        tokens = self.document(text).lemmas
+        return self.cooccurrence_engine.build(tokens, window_size)
     
-    def calculate_semantic_similarity(self, text: str) -> Dict[str, float]:
+    def calculate_semantic_similarity(self, text: Union[str, AnalysisDocument],
+                                      threshold: float = DEFAULT_THRESHOLD,
+                                      top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
         """
         Calcula similaridade semântica usando TF-IDF.
         
+        A matriz TF-IDF permanece esparsa e apenas os top-k vizinhos de cada
+        sentença acima do limiar são mantidos (calculados em blocos).
+        
         Args:
-            text: Texto para analisar
+            text: Texto ou documento de análise
+            threshold: Similaridade mínima para manter um par
+            top_k: Máximo de vizinhos por sentença
             
         Returns:
-            Dicionário com scores de similaridade
+            Dicionário com arrays paralelos i, j (índices de sentença) e score
         """
         # Divide texto em sentenças
-        sentences = [sent.text for sent in self.nlp(text).sents]
+        sentences = self.document(text).sentences
         
         if len(sentences) < 2:
             return {}
@@ -287,18 +327,9 @@ class TraditionalNLPAnalyzer:
         try:
             tfidf_matrix = vectorizer.fit_transform(sentences)
             
-            # Calcula similaridade coseno
-            similarity_matrix = cosine_similarity(tfidf_matrix)
-            
-            # Encontra sentenças mais similares
-            similarities = {}
-            for i in range(len(sentences)):
-                for j in range(i + 1, len(sentences)):
-                    similarity = similarity_matrix[i][j]
-                    if similarity > 0.1:  # Threshold mínimo
-                        similarities[f"sentence_{i}_{j}"] = similarity
-            
-            return similarities
+            # Vizinhos mais similares por sentença (cosseno, sem matriz densa N x N)
+            pairs = top_k_similar_pairs(tfidf_matrix, threshold=threshold, top_k=top_k)
+            return pairs_to_json(pairs, len(sentences), threshold, top_k)
             
         except Exception as e:
             logger.error(f"Erro no cálculo de similaridade: {e}")
@@ -358,49 +389,8 @@ class TraditionalNLPAnalyzer:
         Returns:
             Classificação do contexto
         """
-        # Padrões para cada categoria
-        patterns = {
-            'divino': [
-                r'\b(glória|divino|celestial|sobrenatural|milagre|sagrado|santo)\b',
-                r'\b(deus|deuses|divindade|oráculo)\b',
-                r'\b(revelação|aparição|manifestação)\b'
-            ],
-            'profético': [
-                r'\b(visão|profecia|presságio|augúrio|vaticínio)\b',
-                r'\b(futuro|porvir|predição|oráculo)\b',
-                r'\b(anunciar|prever|pressagiar)\b'
-            ],
-            'alegórico': [
-                r'\b(símbolo|metáfora|alegoria|figura)\b',
-                r'\b(representar|significar|simbolizar)\b',
-                r'\b(como|qual|assim como)\b'
-            ],
-            'ilusório': [
-                r'\b(ilusão|quimera|miragem|falsa|falso)\b',
-                r'\b(enganar|enganoso|fictício)\b',
-                r'\b(aparência|semblante|aspecto)\b'
-            ],
-            'onírico': [
-                r'\b(sonho|sonhar|dormir|pesadelo)\b',
-                r'\b(adormecer|despertar|sonolento)\b',
-                r'\b(repouso|descanso|soneca)\b'
-            ]
-        }
-        
-        # Conta ocorrências de padrões
-        pattern_scores = {}
-        for cat, pattern_list in patterns.items():
-            score = 0
-            for pattern in pattern_list:
-                matches = len(re.findall(pattern, text, re.IGNORECASE))
-                score += matches
-            pattern_scores[cat] = score
-        
-        # Retorna categoria com maior score
-        if pattern_scores:
-            return max(pattern_scores, key=pattern_scores.get)
-        
-        return 'onírico'  # Default
+        # Padrões compilados compartilhados com o classificador da busca
+        return classify_by_patterns(text)
     
     def _calculate_confidence(self, text: str, category: str) -> float:
         """
@@ -413,25 +403,7 @@ class TraditionalNLPAnalyzer:
         Returns:
             Score de confiança (0.0 a 1.0)
         """
-        base_confidence = 0.5
-        
-        # Bonus por comprimento do contexto
-        length_bonus = min(0.3, len(text) / 200)
-        
-        # Bonus por termos específicos
-        specific_terms = ['sonho', 'visão', 'profecia', 'revelação', 'glória']
-        term_bonus = 0.0
-        for term in specific_terms:
-            if term in text.lower():
-                term_bonus += 0.1
-        
-        # Penalty por contexto muito curto
-        length_penalty = 0.0
-        if len(text) < 30:
-            length_penalty = 0.2
-        
-        confidence = min(0.95, base_confidence + length_bonus + term_bonus - length_penalty)
-        return round(confidence, 2)
+        return pattern_confidence(text)
     
     def _generate_reasoning(self, text: str, classification: str, confidence: float) -> str:
         """
@@ -463,24 +435,54 @@ class TraditionalNLPAnalyzer:
         
         return reasoning
     
-    def analyze_dream_patterns(self, text: str) -> Dict:
+    def analyze_dream_patterns(self, text: Union[str, AnalysisDocument]) -> Dict:
         """
         Analisa padrões de sonhos no texto usando técnicas tradicionais (modo completo).
         
         Args:
-            text: Texto para analisar
+            text: Texto ou documento de análise
+            
+        Returns:
+            Dicionário com padrões identificados
+        """
+        return self._analyze_with_terms(text, self.sleep_terms)
+    
+    def analyze_dream_patterns_strict(self, text: Union[str, AnalysisDocument]) -> Dict:
+        """
+        Analisa padrões de sonhos no texto usando modo estrito (apenas termos muito específicos).
+        
+        Args:
+            text: Texto ou documento de análise
+            
+        Returns:
+            Dicionário com padrões identificados
+        """
+        return self._analyze_with_terms(text, self.strict_terms)
+    
+    def _analyze_with_terms(self, text: Union[str, AnalysisDocument],
+                            terms_dict: Dict[str, List[str]]) -> Dict:
+        """
+        Executa todas as etapas sobre um único documento processado.
+        
+        Args:
+            text: Texto ou documento de análise
+            terms_dict: Léxico usado na extração de termos
             
         Returns:
             Dicionário com padrões identificados
         """
+        # Processa o texto com spaCy uma única vez para todas as etapas
+        document = self.document(text)
+        
         # Extrai termos relacionados ao sono
-        sleep_terms = self.extract_sleep_related_terms(text)
+        sleep_terms = self._extract_terms_with_list(document.text, terms_dict)
         
-        # Analisa coocorrência
-        cooccurrence = self.analyze_cooccurrence(text)
+        # Analisa coocorrência (matriz esparsa + top-k vizinhos)
+        cooccurrence_matrix = self.cooccurrence_matrix(document)
+        cooccurrence = cooccurrence_matrix.top_k(self.cooccurrence_top_k)
         
         # Calcula similaridade semântica
-        similarity = self.calculate_semantic_similarity(text)
+        similarity = self.calculate_semantic_similarity(document)
         
         # Classifica contextos
         all_contexts = []
@@ -492,82 +494,121 @@ class TraditionalNLPAnalyzer:
         return {
             'sleep_terms': sleep_terms,
             'cooccurrence': cooccurrence,
+            'cooccurrence_matrix': cooccurrence_matrix,
             'similarity': similarity,
             'classified_contexts': classified_contexts,
             'total_contexts': len(classified_contexts),
             'categories_found': list(sleep_terms.keys())
         }
     
-    def analyze_dream_patterns_strict(self, text: str) -> Dict:
+    def _extract_terms_with_list(self, text: Union[str, AnalysisDocument],
+                                 terms_dict: Dict[str, List[str]]) -> Dict[str, List[Dict]]:
         """
-        Analisa padrões de sonhos no texto usando modo estrito (apenas termos muito específicos).
+        Extrai termos usando uma lista específica de termos.
+        
+        Args:
+            text: Texto (ou documento de análise) para analisar
+            terms_dict: Dicionário com termos por categoria
+            
+        Returns:
+            Dicionário com termos encontrados
+        """
+        if isinstance(text, AnalysisDocument):
+            text = text.text
+        
+        if self.matcher_backend == 'regex':
+            return self._extract_terms_regex(text, terms_dict)
+        if self.matcher_backend == 'index':
+            return self._extract_terms_index(text, terms_dict)
+        
+        results = self._extract_terms_automaton(text, terms_dict)
+        
+        if self.matcher_backend == 'compare':
+            legacy = self._extract_terms_regex(text, terms_dict)
+            if legacy != results:
+                logger.warning(
+                    "Divergência entre backends de léxico: automaton=%s regex=%s",
+                    {k: len(v) for k, v in results.items()},
+                    {k: len(v) for k, v in legacy.items()}
+                )
+            else:
+                logger.info("Backends de léxico produziram resultados idênticos.")
+        
+        return results
+    
+    def _get_matcher(self, terms_dict: Dict[str, List[str]]) -> LexiconMatcher:
+        """Retorna o autômato compilado para o léxico (construído uma única vez)."""
+        key = LexiconMatcher.key_for(terms_dict)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            matcher = LexiconMatcher(terms_dict)
+            self._matchers[key] = matcher
+        return matcher
+    
+    def _extract_terms_automaton(self, text: str, terms_dict: Dict[str, List[str]]) -> Dict[str, List[Dict]]:
+        """
+        Extrai termos em uma única passada usando o autômato do léxico.
         
         Args:
             text: Texto para analisar
+            terms_dict: Dicionário com termos por categoria
             
         Returns:
-            Dicionário com padrões identificados
+            Dicionário com termos encontrados
         """
-        # Termos muito específicos para modo estrito
-        strict_terms = {
-            'onírico': [
-                'sonho', 'sonhos', 'sonhar', 'sonhando', 'sonhava', 'sonhei', 'sonharia',
-                'pesadelo', 'pesadelos', 'pesadelar', 'pesadelando', 'pesadelava',
-                'dormir', 'dormindo', 'dormia', 'dormiu', 'adormecer', 'adormecendo', 'adormecia',
-                'despertar', 'despertando', 'despertava', 'despertou',
-                'repouso', 'repousar', 'repousando', 'repousava',
-                'descanso', 'descansar', 'descansando', 'descansava',
-                'sonolência', 'sonolento', 'soneca', 'sonecar'
-            ],
-            'profético': [
-                'visão', 'visões', 'profecia', 'profécias', 'profetizar', 'profetizando',
-                'revelação', 'revelações', 'revelar', 'revelando', 'revelava',
-                'aparição', 'aparições', 'aparecer', 'aparecendo', 'aparecia',
-                'vaticínio', 'vaticínios', 'vaticinar', 'vaticinando', 'vaticinava',
-                'presságio', 'presságios', 'pressagiar', 'pressagiando', 'pressagiava'
-            ],
-            'alegórico': [
-                'sombra', 'sombras', 'fantasia', 'fantasias', 'ilusão', 'ilusões',
-                'metáfora', 'metáforas', 'símbolo', 'símbolos', 'alegoria', 'alegorias'
-            ],
-            'divino': [
-                'glória', 'glorioso', 'divino', 'divinos', 'celestial', 'celestiais',
-                'milagre', 'milagres', 'milagroso', 'sagrado', 'sagrados', 'santo', 'santos'
-            ],
-            'ilusório': [
-                'ilusão', 'ilusões', 'quimera', 'quimeras', 'miragem', 'miragens',
-                'falsa', 'falso', 'falsos', 'falsas'
+        text_lower = text.lower()
+        grouped = self._get_matcher(terms_dict).find_grouped(text_lower)
+        stanza_index = get_stanza_index(text)
+        
+        results = {}
+        for category, spans in grouped.items():
+            results[category] = [
+                self._build_term_record(text, text_lower[start:end], start, end, category, stanza_index)
+                for start, end in spans
             ]
-        }
-        
-        # Extrai apenas termos estritos
-        sleep_terms = self._extract_terms_with_list(text, strict_terms)
-        
-        # Analisa coocorrência
-        cooccurrence = self.analyze_cooccurrence(text)
-        
-        # Calcula similaridade semântica
-        similarity = self.calculate_semantic_similarity(text)
+        return results
+    
+    def _extract_terms_index(self, text: str, terms_dict: Dict[str, List[str]]) -> Dict[str, List[Dict]]:
+        """
+        Extrai termos pelo índice posicional do documento (prefixos do vocabulário).
         
-        # Classifica contextos
-        all_contexts = []
-        for category, contexts in sleep_terms.items():
-            all_contexts.extend(contexts)
+        Mesmos resultados e ordem do autômato: por categoria, as ocorrências de
+        cada termo da lista em ordem de posição.
         
-        classified_contexts = self.classify_dream_contexts(all_contexts)
+        Args:
+            text: Texto para analisar
+            terms_dict: Dicionário com termos por categoria
+            
+        Returns:
+            Dicionário com termos encontrados
+        """
+        index = get_corpus_index(text)
+        stanza_index = get_stanza_index(text)
+        text_lower = None
         
-        return {
-            'sleep_terms': sleep_terms,
-            'cooccurrence': cooccurrence,
-            'similarity': similarity,
-            'classified_contexts': classified_contexts,
-            'total_contexts': len(classified_contexts),
-            'categories_found': list(sleep_terms.keys())
-        }
+        results = {}
+        for category, terms in terms_dict.items():
+            spans = []
+            for term in terms:
+                if not term:
+                    continue
+                if re.fullmatch(r'\w+', term):
+                    spans.extend(index.spans(index.form_ids(term, 'prefix')))
+                else:
+                    # Termos com caracteres fora de \w não são palavras do índice
+                    text_lower = text_lower if text_lower is not None else text.lower()
+                    pattern = re.compile(rf'\b{re.escape(term)}\w*\b', re.IGNORECASE)
+                    spans.extend(match.span() for match in pattern.finditer(text_lower))
+            if spans:
+                results[category] = [
+                    self._build_term_record(text, text[start:end].lower(), start, end, category, stanza_index)
+                    for start, end in spans
+                ]
+        return results
     
-    def _extract_terms_with_list(self, text: str, terms_dict: Dict[str, List[str]]) -> Dict[str, List[Dict]]:
+    def _extract_terms_regex(self, text: str, terms_dict: Dict[str, List[str]]) -> Dict[str, List[Dict]]:
         """
-        Extrai termos usando uma lista específica de termos.
+        Extrai termos com uma regex por termo (backend legado, usado para comparação).
         
         Args:
             text: Texto para analisar
@@ -578,33 +619,55 @@ class TraditionalNLPAnalyzer:
         """
         results = defaultdict(list)
         text_lower = text.lower()
+        stanza_index = get_stanza_index(text)
         
         for category, terms in terms_dict.items():
             for term in terms:
                 # Captura o termo exato e possíveis flexões
                 pattern = re.compile(rf'\b{re.escape(term)}\w*\b', re.IGNORECASE)
                 for match in pattern.finditer(text_lower):
-                    # Extrai contexto (100 caracteres antes e depois)
-                    start = max(0, match.start() - 100)
-                    end = min(len(text), match.end() + 100)
-                    context = text[start:end].strip()
-                    
-                    # Identifica estrofe se possível
-                    stanza = self._extract_stanza_number(text, match.start())
-                    
-                    results[category].append({
-                        'term': match.group(0),
-                        'context': context,
-                        'text': context,
-                        'excerpt': context,
-                        'position': match.start(),
-                        'stanza': stanza,
-                        'category': category
-                    })
+                    results[category].append(
+                        self._build_term_record(text, match.group(0), match.start(), match.end(),
+                                                category, stanza_index)
+                    )
         
         return dict(results)
+    
+    def _build_term_record(self, text: str, term: str, start: int, end: int, category: str,
+                           stanza_index: StanzaIndex) -> Dict:
+        """
+        Monta o registro de uma ocorrência de termo.
+        
+        Args:
+            text: Texto completo
+            term: Forma encontrada no texto
+            start: Posição inicial da ocorrência
+            end: Posição final da ocorrência
+            category: Categoria do termo
+            stanza_index: Índice de estrofes do texto
+            
+        Returns:
+            Dicionário com termo, contexto e estrofe
+        """
+        # Extrai contexto (100 caracteres antes e depois para contexto mais rico)
+        context_start = max(0, start - 100)
+        context_end = min(len(text), end + 100)
+        context = text[context_start:context_end].strip()
+        
+        # Identifica estrofe se possível
+        stanza = stanza_index.stanza_at(start)
+        
+        return {
+            'term': term,
+            'context': context,
+            'text': context,  # Adiciona campo 'text' para compatibilidade
+            'excerpt': context,  # Adiciona campo 'excerpt' para compatibilidade
+            'position': start,
+            'stanza': stanza,
+            'category': category
+        }
 
 def create_traditional_analyzer() -> TraditionalNLPAnalyzer:
-    """Cria instância do analisador NLP tradicional."""
-    return TraditionalNLPAnalyzer()
+    """Retorna o analisador NLP tradicional compartilhado pelo processo."""
+    return get_model_registry().get_shared('traditional_analyzer', TraditionalNLPAnalyzer)
 
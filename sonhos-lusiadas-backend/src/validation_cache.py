@@ -0,0 +1,256 @@
+"""
+Módulo de Cache de Validações
+Projeto: Sonho em Os Lusíadas - Uma Análise Quantitativa e Qualitativa
+
+Este módulo guarda em disco (SQLite) as respostas do Gemini, para que trechos
+já validados não sejam enviados de novo à API:
+
+- Chave SHA-256 de (contexto normalizado, classificação proposta, modelo,
+  versão do prompt)
+- Expiração por idade (TTL) e limite de entradas (despejo LRU)
+- Contadores de acertos/faltas expostos para monitoramento
+
+Conexões SQLite não podem atravessar um fork(): cada processo abre a sua
+(o processo filho descarta a herdada e reabre na primeira consulta).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import weakref
+import unicodedata
+import logging
+from typing import Any, Dict, Optional
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join('cache', 'validation', 'gemini.sqlite3')
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 100000
+# Inserções entre verificações do limite de entradas (no máximo 10% do limite)
+EVICTION_CHECK_INTERVAL = 100
+
+# Caches do processo, reiniciados no filho após um fork()
+_instances = weakref.WeakSet()
+
+
+def normalize_context(context: str) -> str:
+    """Normaliza um contexto (Unicode NFC e espaços colapsados) para a chave."""
+    return ' '.join(unicodedata.normalize('NFC', context or '').split())
+
+
+def make_validation_key(context: str, classification: str, model: str, prompt_version: str) -> str:
+    """
+    Calcula a chave de uma validação.
+
+    Args:
+        context: Trecho validado
+        classification: Classificação proposta
+        model: Modelo do Gemini
+        prompt_version: Versão do prompt de validação
+
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    payload = json.dumps([normalize_context(context), classification, model, prompt_version],
+                         ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ValidationCache:
+    """Cache persistente (SQLite) de respostas de validação."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 ttl_seconds: float = DEFAULT_TTL_DAYS * 86400,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            path: Arquivo do banco SQLite
+            ttl_seconds: Idade máxima de uma entrada (0 desativa a expiração)
+            max_entries: Número máximo de entradas retidas
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0, 'evictions': 0}
+        self._puts_since_check = 0
+        self._check_interval = max(1, min(EVICTION_CHECK_INTERVAL, max_entries // 10))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._pid = os.getpid()
+        self._conn = self._connect()
+        _instances.add(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre a conexão do processo atual e garante o esquema."""
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS validations ('
+            ' key TEXT PRIMARY KEY,'
+            ' model TEXT NOT NULL,'
+            ' prompt_version TEXT NOT NULL,'
+            ' result TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_validations_accessed ON validations (accessed_at)')
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão do processo atual (reaberta se o objeto veio de outro processo; com lock)."""
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._conn = self._connect()
+        return self._conn
+
+    def _after_fork(self) -> None:
+        """Descarta no filho o lock e a conexão herdados do processo pai."""
+        self._lock = threading.Lock()
+        # A conexão herdada não é fechada: fechá-la no filho afetaria o pai
+        self._conn = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca uma validação.
+
+        Args:
+            key: Chave (make_validation_key)
+
+        Returns:
+            Resposta analisada do Gemini ou None (ausente ou expirada)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT result, created_at FROM validations WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            result, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._connection().execute('DELETE FROM validations WHERE key = ?', (key,))
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._connection().execute('UPDATE validations SET accessed_at = ? WHERE key = ?', (now, key))
+            self._stats['hits'] += 1
+        try:
+            return json.loads(result)
+        except json.JSONDecodeError:
+            return None
+
+    def put(self, key: str, result: Dict[str, Any], model: str, prompt_version: str) -> None:
+        """
+        Armazena uma validação.
+
+        Args:
+            key: Chave (make_validation_key)
+            result: Resposta analisada do Gemini
+            model: Modelo do Gemini
+            prompt_version: Versão do prompt de validação
+        """
+        now = time.time()
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            try:
+                self._connection().execute(
+                    'INSERT OR REPLACE INTO validations (key, model, prompt_version, result, created_at, accessed_at)'
+                    ' VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, model, prompt_version, payload, now, now)
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Falha ao gravar validação em cache: {e}")
+                return
+            self._stats['stores'] += 1
+            self._puts_since_check += 1
+            if self._puts_since_check >= self._check_interval:
+                self._puts_since_check = 0
+                self._evict()
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._connection().execute('DELETE FROM validations')
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores e ocupação do cache.
+
+        Returns:
+            Dicionário com acertos, faltas, despejos e tamanho
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = self._connection().execute('SELECT COUNT(*) FROM validations').fetchone()[0]
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['path'] = self.path
+        return stats
+
+    def _evict(self) -> None:
+        """Remove entradas expiradas e as menos usadas acima do limite (com lock)."""
+        if self.ttl_seconds:
+            cursor = self._connection().execute('DELETE FROM validations WHERE created_at < ?',
+                                        (time.time() - self.ttl_seconds,))
+            self._stats['expired'] += max(cursor.rowcount, 0)
+        count = self._connection().execute('SELECT COUNT(*) FROM validations').fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._connection().execute(
+                'DELETE FROM validations WHERE key IN '
+                '(SELECT key FROM validations ORDER BY accessed_at LIMIT ?)', (excess,)
+            )
+            self._stats['evictions'] += excess
+
+
+def _reset_after_fork() -> None:
+    global _validation_cache_lock
+    _validation_cache_lock = threading.Lock()
+    for cache in list(_instances):
+        cache._after_fork()
+
+
+_validation_cache: Optional[ValidationCache] = None
+_validation_cache_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_validation_cache() -> Optional[ValidationCache]:
+    """
+    Retorna o cache de validações do processo (None se desativado).
+
+    Configuração via VALIDATION_CACHE_ENABLED, VALIDATION_CACHE_PATH,
+    VALIDATION_CACHE_TTL_DAYS e VALIDATION_CACHE_MAX_ENTRIES.
+    """
+    global _validation_cache
+    if os.getenv('VALIDATION_CACHE_ENABLED', 'True').lower() != 'true':
+        return None
+    if _validation_cache is None:
+        with _validation_cache_lock:
+            if _validation_cache is None:
+                try:
+                    _validation_cache = ValidationCache(
+                        path=os.getenv('VALIDATION_CACHE_PATH', DEFAULT_CACHE_PATH),
+                        ttl_seconds=float(os.getenv('VALIDATION_CACHE_TTL_DAYS', DEFAULT_TTL_DAYS)) * 86400,
+                        max_entries=int(os.getenv('VALIDATION_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+                    )
+                    logger.info(f"Cache de validações inicializado ({_validation_cache.path})")
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"Cache de validações indisponível: {e}")
+                    return None
+    return _validation_cache